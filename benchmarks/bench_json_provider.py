@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark de la sérialisation JSON de la liste /api/feuille-heures :
+fournisseur de la bibliothèque standard contre orjson.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from planning_pro.json_provider import PlanningJSONProvider, orjson
+from planning_pro.models import FeuilleDHeures, JourTravaille
+
+FEUILLES = 36  # Trois ans de feuilles mensuelles
+REPETITIONS = 50
+
+
+def generer_feuilles(nombre):
+    """Feuilles de 22 jours à deux créneaux, comme la base de production"""
+    feuilles = []
+    for index in range(nombre):
+        annee, mois = 2023 + index // 12, index % 12 + 1
+        jours = []
+        for jour_num in range(1, 23):
+            jour = JourTravaille(date=f"{annee}-{mois:02d}-{jour_num:02d}")
+            jour.ajouter_creneau("08:30", "12:15")
+            jour.ajouter_creneau("13:15", "18:00")
+            jours.append(jour)
+        feuilles.append(
+            FeuilleDHeures(
+                mois=mois,
+                annee=annee,
+                jours_travailles=jours,
+                taux_horaire=12.5,
+                user_id=1,
+                id=index + 1,
+            )
+        )
+    return feuilles
+
+
+def mesurer(provider, payload):
+    provider.response(payload)
+    debut = time.perf_counter()
+    for _ in range(REPETITIONS):
+        response = provider.response(payload)
+    return (time.perf_counter() - debut) / REPETITIONS * 1000, response.get_data()
+
+
+def main():
+    app = Flask(__name__)
+    feuilles = generer_feuilles(FEUILLES)
+    dicts = [feuille.to_dict() for feuille in feuilles]
+
+    standard = DefaultJSONProvider(app)
+    rapide = PlanningJSONProvider(app)
+
+    with app.app_context():
+        duree_std, corps_std = mesurer(standard, dicts)
+        duree_rapide, corps_rapide = mesurer(rapide, dicts)
+        duree_objets, corps_objets = mesurer(rapide, feuilles)
+
+    identiques = (
+        json.loads(corps_std) == json.loads(corps_rapide) == json.loads(corps_objets)
+    )
+    print(f"📊 {FEUILLES} feuilles, {len(corps_std) / 1024:.0f} Kio de JSON")
+    print(f"  orjson disponible      : {'oui' if orjson else 'non'}")
+    print(f"  json (stdlib)          : {duree_std:7.2f} ms")
+    print(f"  PlanningJSONProvider   : {duree_rapide:7.2f} ms")
+    print(f"  Modèles via __json__   : {duree_objets:7.2f} ms (to_dict compris)")
+    print(f"  Accélération           : {duree_std / duree_rapide:7.1f}x")
+    print(f"  Contenus identiques    : {identiques}")
+    return 0 if identiques else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
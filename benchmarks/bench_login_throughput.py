@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark du débit de connexion sous charge concurrente : vérification bcrypt
+dans le thread de la requête contre le pool de hachage borné.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from planning_pro.password_hashing import PasswordHasher, PasswordHashingSaturated
+
+ROUNDS = 10  # Coût réduit pour garder un benchmark court
+CONNEXIONS = 64  # Connexions simultanées (threads de requête)
+PASSWORD = "motdepasse123"
+
+
+def verification_directe(password_hash):
+    return bcrypt.checkpw(PASSWORD.encode("utf-8"), password_hash.encode("utf-8"))
+
+
+def mesurer(nom, connexion):
+    """Lance CONNEXIONS connexions en parallèle et affiche le débit"""
+    rejets = 0
+    debut = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONNEXIONS) as requetes:
+        futures = [requetes.submit(connexion) for _ in range(CONNEXIONS)]
+        for future in futures:
+            try:
+                future.result()
+            except PasswordHashingSaturated:
+                rejets += 1
+    duree = time.perf_counter() - debut
+    acceptees = CONNEXIONS - rejets
+    print(
+        f"  {nom:<28} {acceptees / duree:7.1f} connexions/s"
+        f"  ({acceptees} acceptées, {rejets} rejetées en 503, {duree:.2f} s)"
+    )
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    password_hash = bcrypt.hashpw(
+        PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=ROUNDS)
+    ).decode("utf-8")
+
+    print(f"📊 {CONNEXIONS} connexions simultanées, bcrypt coût {ROUNDS}, {cpus} CPU")
+    mesurer("Thread de requête", lambda: verification_directe(password_hash))
+
+    pool = PasswordHasher(rounds=ROUNDS, max_workers=cpus, max_pending=CONNEXIONS)
+    mesurer("Pool borné", lambda: pool.check(PASSWORD, password_hash))
+
+    sature = PasswordHasher(rounds=ROUNDS, max_workers=cpus, max_pending=cpus)
+    mesurer("Pool saturé (file = CPU)", lambda: sature.check(PASSWORD, password_hash))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+"""
+Micro-benchmark du générateur PDF : coût par document de la préparation
+(styles de tableaux, libellés de mois, dates en français) avant et après
+leur précalcul à l'import, puis temps CPU total d'un document.
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from reportlab.lib import colors
+from reportlab.platypus import TableStyle
+
+from planning_pro.models import FeuilleDHeures, JourTravaille
+from planning_pro.pdf_generator import (
+    MOIS_NOMS,
+    STYLE_TABLE_DEDUCTIONS,
+    STYLE_TABLE_HEURES,
+    STYLE_TABLE_INFOS,
+    STYLE_TABLE_JOURS,
+    STYLE_TABLE_SEMAINES,
+    format_date_french,
+    pdf_generator,
+)
+
+ITERATIONS = 2000
+DOCUMENTS = 100
+
+
+def creer_feuille_data():
+    """Feuille de 28 jours avec deux créneaux par jour"""
+    jours = []
+    for jour_num in range(1, 29):
+        jour = JourTravaille(date=f"2025-03-{jour_num:02d}")
+        jour.ajouter_creneau("09:00", "12:00")
+        jour.ajouter_creneau("13:00", "17:30")
+        jours.append(jour)
+    feuille = FeuilleDHeures(
+        mois=3, annee=2025, jours_travailles=jours, taux_horaire=15.0, user_id=1
+    )
+    return feuille.to_dict()
+
+
+def ancienne_date_french(date_str):
+    """Version d'origine : listes et datetime reconstruits à chaque appel"""
+    jours = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
+    mois = ["", "janvier", "février", "mars", "avril", "mai", "juin", "juillet"]
+    mois += ["août", "septembre", "octobre", "novembre", "décembre"]
+    annee, mois_num, jour_num = (int(p) for p in date_str.split("-"))
+    date = datetime(annee, mois_num, jour_num)
+    return f"{jours[date.weekday()]} {jour_num} {mois[mois_num]} {annee}"
+
+
+def preparation_ancienne(dates):
+    """Objets reconstruits à chaque document avant le précalcul"""
+    mois_noms = ["", "Janvier", "Février", "Mars", "Avril", "Mai", "Juin"]
+    mois_noms += ["Juillet", "Août", "Septembre", "Octobre", "Novembre", "Décembre"]
+    styles = [
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("FONTSIZE", (0, 0), (-1, -1), 10),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ]
+        )
+        for _ in range(3 + len(dates) // 15)
+    ]
+    libelles = [ancienne_date_french(d) for d in dates]
+    return mois_noms, styles, libelles
+
+
+def preparation_precalculee(dates):
+    """Objets partagés, construits une fois à l'import"""
+    styles = [
+        STYLE_TABLE_INFOS,
+        STYLE_TABLE_JOURS,
+        STYLE_TABLE_SEMAINES,
+        STYLE_TABLE_HEURES,
+        STYLE_TABLE_DEDUCTIONS,
+    ]
+    libelles = [format_date_french(d) for d in dates]
+    return MOIS_NOMS, styles, libelles
+
+
+def mesurer(fonction, *args, iterations):
+    debut = time.process_time()
+    for _ in range(iterations):
+        fonction(*args)
+    return (time.process_time() - debut) / iterations * 1e6
+
+
+def main():
+    feuille_data = creer_feuille_data()
+    dates = [jour["date"] for jour in feuille_data["jours_travailles"]]
+
+    ancienne = mesurer(preparation_ancienne, dates, iterations=ITERATIONS)
+    precalculee = mesurer(preparation_precalculee, dates, iterations=ITERATIONS)
+
+    pdf_generator.generer_pdf_feuille(feuille_data)  # Échauffement
+    document = mesurer(
+        pdf_generator.generer_pdf_feuille, feuille_data, iterations=DOCUMENTS
+    )
+
+    print(f"📊 Préparation par document ({len(dates)} jours)")
+    print(f"  Reconstruite à chaque appel : {ancienne:8.1f} µs")
+    print(f"  Précalculée à l'import      : {precalculee:8.1f} µs")
+    print(f"  Gain                        : {ancienne - precalculee:8.1f} µs/document")
+    print(f"📄 Document complet           : {document / 1000:8.2f} ms CPU")
+
+
+if __name__ == "__main__":
+    main()
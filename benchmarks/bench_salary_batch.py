@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark du calcul de salaire : boucle scalaire sur calculate_salary
+contre calculate_salary_batch (vectorisé avec numpy).
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from planning_pro.salary_calculator import BATCH_COLUMNS, np, salary_calculator
+
+LIGNES = 50_000  # Semaines à calculer (ex. 1000 salariés sur un an)
+CONTRATS = [20, 25, 30, 35, 39, 28]
+
+
+def generer_lignes(nombre):
+    """Génère des semaines aléatoires (heures au quart d'heure)"""
+    random.seed(42)
+    heures = [random.randint(0, 240) / 4 for _ in range(nombre)]
+    contrats = [random.choice(CONTRATS) for _ in range(nombre)]
+    taux = [random.choice([11.88, 12.5, 15.0]) for _ in range(nombre)]
+    return heures, contrats, taux
+
+
+def main():
+    heures, contrats, taux = generer_lignes(LIGNES)
+
+    debut = time.perf_counter()
+    scalaires = [
+        salary_calculator.calculate_salary(h, c, t)
+        for h, c, t in zip(heures, contrats, taux)
+    ]
+    duree_scalaire = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    batch = salary_calculator.calculate_salary_batch(heures, contrats, taux)
+    duree_batch = time.perf_counter() - debut
+
+    ecarts = sum(
+        1
+        for i, ligne in enumerate(scalaires)
+        for colonne in BATCH_COLUMNS
+        if batch[colonne][i] != ligne.get(colonne, 0)
+    )
+
+    print(f"📊 {LIGNES} semaines, numpy {'disponible' if np else 'absent'}")
+    print(f"  Boucle scalaire : {duree_scalaire * 1000:8.1f} ms")
+    print(f"  Calcul par lot  : {duree_batch * 1000:8.1f} ms")
+    print(f"  Accélération    : {duree_scalaire / duree_batch:8.1f}x")
+    print(f"  Écarts          : {ecarts}")
+    return 0 if ecarts == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark de concurrence SQLite : 4 workers (comme gunicorn) lisent et
+écrivent la même base, avec le profil PRAGMA "default" puis "production".
+"""
+
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from planning_pro.database import DatabaseManager, build_pragmas
+
+WORKERS = 4
+DUREE_SECONDES = 3.0
+ECRIVAINS = 1  # Nombre de workers qui écrivent, les autres lisent
+
+
+def worker(db_path, profile, ecrivain, resultats):
+    """Boucle de lectures ou d'écritures pendant DUREE_SECONDES"""
+    manager = DatabaseManager(db_path, pragmas=build_pragmas(profile))
+    operations = 0
+    verrous = 0
+    fin = time.perf_counter() + DUREE_SECONDES
+
+    while time.perf_counter() < fin:
+        try:
+            if ecrivain:
+                with manager.transaction() as uow:
+                    uow.executemany(
+                        "INSERT INTO jours_travailles (feuille_heures_id, date) VALUES (?, ?)",
+                        [(1, f"2025-01-{jour:02d}") for jour in range(1, 31)],
+                    )
+            else:
+                manager.execute_query(
+                    """SELECT j.id, j.date, c.heure_debut, c.heure_fin
+                       FROM jours_travailles j
+                       LEFT JOIN creneaux_feuille c ON c.jour_travaille_id = j.id
+                       WHERE j.feuille_heures_id = ? ORDER BY j.id DESC LIMIT 200""",
+                    (1,),
+                )
+            operations += 1
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            verrous += 1
+
+    resultats.put((ecrivain, operations, verrous))
+
+
+def bench_profile(profile):
+    """Lance les workers sur une base neuve et agrège leurs résultats"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        DatabaseManager(db_path, pragmas=build_pragmas(profile))
+
+        resultats = multiprocessing.Queue()
+        processus = [
+            multiprocessing.Process(
+                target=worker, args=(db_path, profile, i < ECRIVAINS, resultats)
+            )
+            for i in range(WORKERS)
+        ]
+        for p in processus:
+            p.start()
+        lignes = [resultats.get() for _ in processus]
+        for p in processus:
+            p.join()
+
+    ecritures = sum(ops for ecrivain, ops, _ in lignes if ecrivain)
+    lectures = sum(ops for ecrivain, ops, _ in lignes if not ecrivain)
+    verrous = sum(v for _, _, v in lignes)
+    print(
+        f"{profile:<12} lectures/s: {lectures / DUREE_SECONDES:>9.0f}  "
+        f"écritures/s: {ecritures / DUREE_SECONDES:>7.0f}  "
+        f"'database is locked': {verrous}"
+    )
+
+
+if __name__ == "__main__":
+    print(f"{WORKERS} workers ({ECRIVAINS} écrivain), {DUREE_SECONDES}s par profil")
+    for profile in ("default", "production"):
+        bench_profile(profile)
@@ -42,6 +42,7 @@ raw_env = [
     'SECURITY_HEADERS=true',
     'SESSION_COOKIE_SECURE=false',  # Mettre à true avec HTTPS
     'FORCE_HTTPS=false',  # Mettre à true en production avec HTTPS
+    'RATELIMIT_BACKEND=sqlite',  # Limites partagées entre tous les workers
 ]
 
 # Gestion des signaux
@@ -8,6 +8,8 @@ from flask import (
     jsonify,
     current_app,
     send_file,
+    Response,
+    stream_with_context,
 )
 from flask_login import (
     LoginManager,
@@ -22,8 +24,22 @@ from flask_talisman import Talisman
 import os
 import logging
 import traceback
+import io
+import time
+import hashlib
 from datetime import datetime
-from .models import Planning, FeuilleDHeures, User
+import bcrypt
+import click
+from .models import (
+    Planning,
+    FeuilleDHeures,
+    User,
+    decoder_curseur,
+    encoder_curseur,
+    suppressions_depuis,
+    version_courante,
+    version_regles_salaire,
+)
 from .database import db_manager
 from .config import Config
 from .security import (
@@ -31,7 +47,22 @@ from .security import (
     log_security_event,
     rate_limit,
 )
-from .pdf_generator import pdf_generator
+from .pdf_generator import MOIS_NOMS, pdf_generator
+from .password_hashing import PasswordHashingSaturated, password_hasher
+from .pdf_cache import pdf_cache
+from .pdf_jobs import pdf_jobs
+from .pdf_export import (
+    FORMATS_EXPORT,
+    MAX_FEUILLES_EXPORT,
+    MAX_FEUILLES_FUSION,
+    flux_pdf_fusionne,
+    flux_zip,
+    fusion_disponible,
+    rendre_pdfs,
+)
+from .timesheet_export import FORMATS_FLUX, TYPES_MIME, flux_export
+from .json_provider import PlanningJSONProvider
+from .compression import register_compression, variantes_etag
 
 # Chemin vers le répertoire racine du projet
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -40,6 +71,9 @@ STATIC_DIR = os.path.join(BASE_DIR, "static")
 
 app = Flask(__name__, template_folder=TEMPLATE_DIR, static_folder=STATIC_DIR)
 app.config.from_object(Config)
+app.json = PlanningJSONProvider(app, fast=Config.JSON_FAST_ENCODER)
+if Config.COMPRESSION_ENABLED:
+    register_compression(app, Config.COMPRESSION_MIN_SIZE, Config.COMPRESSION_MIMETYPES)
 
 # Configuration du logging
 logging.basicConfig(
@@ -135,6 +169,48 @@ def handle_not_found(error):
     )
 
 
+@app.errorhandler(429)
+def handle_too_many_requests(error):
+    """Gestion des erreurs 429 - Too Many Requests"""
+    if request.is_json:
+        response = jsonify(
+            {
+                "error": "Trop de requêtes, réessayez plus tard",
+                "retry_after": error.retry_after,
+            }
+        )
+    else:
+        flash("Trop de requêtes, veuillez réessayer plus tard", "error")
+        response = current_app.make_response(
+            render_template(
+                "error.html", error_code=429, error_message="Trop de requêtes"
+            )
+        )
+    response.status_code = 429
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+
+@app.errorhandler(PasswordHashingSaturated)
+def handle_password_hashing_saturated(error):
+    """Pool de hachage saturé : 503 immédiat plutôt qu'une file d'attente"""
+    log_security_event(
+        "HTTP_503", "Password hashing pool saturated", ip_address=request.remote_addr
+    )
+    if request.is_json:
+        response = jsonify({"error": "Service surchargé, réessayez dans un instant"})
+    else:
+        flash("Service surchargé, veuillez réessayer dans un instant", "error")
+        response = current_app.make_response(
+            render_template(
+                "error.html", error_code=503, error_message="Service surchargé"
+            )
+        )
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+
 @app.errorhandler(500)
 def handle_internal_error(error):
     """Gestion des erreurs 500 - Internal Server Error"""
@@ -194,7 +270,7 @@ def handle_unexpected_error(error):
 @login_manager.user_loader
 def load_user(user_id):
     try:
-        return User.get_by_id(int(user_id))
+        return User.get_cached(int(user_id))
     except (ValueError, TypeError):
         return None
 
@@ -449,20 +525,13 @@ def reset_password(token):
 @app.route("/")
 @login_required
 def index():
-    # Récupérer les plannings récents pour l'utilisateur connecté
-    plannings = Planning.get_by_user(current_user.id)
-    feuilles = FeuilleDHeures.get_by_user(current_user.id)
-
-    # Statistiques rapides
-    total_plannings = len(plannings)
-    total_feuilles = len(feuilles)
-
+    # Seuls les 5 éléments récents sont chargés, les totaux viennent d'un COUNT
     return render_template(
         "index.html",
-        plannings=plannings[:5],  # 5 plannings récents
-        feuilles=feuilles[:5],  # 5 feuilles récentes
-        total_plannings=total_plannings,
-        total_feuilles=total_feuilles,
+        plannings=Planning.get_by_user(current_user.id, limit=5),
+        feuilles=FeuilleDHeures.summaries_by_user(current_user.id, limit=5),
+        total_plannings=Planning.count_by_user(current_user.id),
+        total_feuilles=FeuilleDHeures.count_by_user(current_user.id),
     )
 
 
@@ -652,13 +721,100 @@ def delete_feuille_heures(feuille_id):
         flash("Feuille d'heures non trouvée", "error")
         return redirect(url_for("feuille_heures"))
 
-    # Supprimer la feuille d'heures de la base de données
-    db_manager.execute_delete("DELETE FROM feuilles_heures WHERE id = ?", (feuille_id,))
+    # Supprimer la feuille d'heures (jours, créneaux et PDF en cache compris)
+    feuille.delete()
 
     flash("Feuille d'heures supprimée avec succès", "success")
     return redirect(url_for("feuille_heures"))
 
 
+# Taille maximale d'une page des listes de l'API
+LIMITE_PAGE_MAX = 100
+
+
+def _parametres_pagination():
+    """Lit ``limit`` et ``cursor`` de la requête, lève ValueError si invalides
+
+    Sans ``limit``, la liste complète est retournée (compatibilité).
+    """
+    limit = request.args.get("limit", type=int)
+    cursor = request.args.get("cursor") or None
+    if "limit" in request.args and (limit is None or not 1 <= limit <= LIMITE_PAGE_MAX):
+        raise ValueError(f"limit doit être compris entre 1 et {LIMITE_PAGE_MAX}")
+    if cursor:
+        decoder_curseur(cursor)
+    return limit, cursor
+
+
+# Vues disponibles pour les listes : complète (défaut) ou résumée
+VUES_LISTE = ("full", "summary")
+
+
+def _parametres_vue(modele):
+    """Lit ``view`` et ``fields`` de la requête, lève ValueError si invalides
+
+    ``fields`` sélectionne des champs de premier niveau. Si tous les champs
+    demandés font partie de la vue résumée, celle-ci est utilisée même sans
+    ``view=summary`` : le détail n'est alors pas calculé.
+    """
+    view = request.args.get("view", "full")
+    if view not in VUES_LISTE:
+        raise ValueError(f"view doit valoir {' ou '.join(VUES_LISTE)}")
+    fields = {f.strip() for f in request.args.get("fields", "").split(",") if f.strip()}
+
+    if fields and fields <= set(modele.CHAMPS_RESUME):
+        view = "summary"
+    elif view == "summary" and fields:
+        inconnus = ", ".join(sorted(fields - set(modele.CHAMPS_RESUME)))
+        raise ValueError(f"Champs absents de la vue résumée : {inconnus}")
+    return view, fields
+
+
+def _liste_paginee(elements, limit, fields):
+    """Réponse JSON d'une page ; le curseur suivant est dans ``X-Next-Cursor``
+
+    ``elements`` contient des dictionnaires ou des modèles, sérialisés
+    directement par le fournisseur JSON.
+    """
+    curseur_suivant = None
+    if limit is not None and len(elements) == limit:
+        dernier = elements[-1]
+        if not isinstance(dernier, dict):
+            dernier = {"annee": dernier.annee, "mois": dernier.mois}
+        curseur_suivant = encoder_curseur(dernier["annee"], dernier["mois"])
+    if fields:
+        dicts = (e if isinstance(e, dict) else e.to_dict() for e in elements)
+        elements = [{k: v for k, v in d.items() if k in fields} for d in dicts]
+
+    response = jsonify(elements)
+    if curseur_suivant:
+        response.headers["X-Next-Cursor"] = curseur_suivant
+    return response
+
+
+def _reponse_conditionnelle(empreinte, construire):
+    """GET conditionnel : 304 si le client a déjà la représentation courante
+
+    L'ETag combine la version des données, celle des règles de
+    salaire et l'URL (vue, champs, page). S'il correspond à ``If-None-Match``
+    (y compris sous sa variante compressée), ``construire`` n'est pas appelé :
+    aucun modèle n'est chargé.
+    """
+    cle = "|".join((empreinte, version_regles_salaire(), request.full_path))
+    etag = hashlib.sha256(cle.encode("utf-8")).hexdigest()[:32]
+    for variante in variantes_etag(etag):
+        if variante in request.if_none_match:
+            response = app.response_class(status=304)
+            response.set_etag(variante)
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+    response = construire()
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
 # API endpoints pour l'interface JavaScript
 @app.route("/api/planning", methods=["GET", "POST"])
 @login_required
@@ -666,9 +822,23 @@ def delete_feuille_heures(feuille_id):
 def api_planning():
 
     if request.method == "GET":
-        # Récupérer tous les plannings de l'utilisateur
-        plannings = Planning.get_by_user(current_user.id)
-        return jsonify([p.to_dict() for p in plannings])
+        # Plannings de l'utilisateur, paginés si ``limit`` est fourni
+        try:
+            limit, cursor = _parametres_pagination()
+            view, fields = _parametres_vue(Planning)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        def construire():
+            plannings = Planning.get_by_user(
+                current_user.id, limit=limit, cursor=cursor
+            )
+            if view == "summary":
+                plannings = [p.to_summary() for p in plannings]
+            return _liste_paginee(plannings, limit, fields)
+
+        empreinte = Planning.fingerprint_by_user(current_user.id) or ""
+        return _reponse_conditionnelle(empreinte, construire)
 
     elif request.method == "POST":
         # Créer un nouveau planning
@@ -705,7 +875,7 @@ def api_planning():
                 f"Planning created for {data['mois']}/{data['annee']}",
                 current_user.id,
             )
-            return jsonify({"success": True, "data": planning.to_dict()}), 201
+            return jsonify({"success": True, "data": planning}), 201
         except Exception as e:
             log_security_event(
                 "API_PLANNING_ERROR",
@@ -728,6 +898,14 @@ def api_planning():
 @rate_limit(max_requests=200, window_seconds=3600)
 def api_planning_detail(planning_id):
 
+    if request.method == "GET":
+        # Empreinte lue avant tout chargement ; None si absent ou non autorisé
+        empreinte = Planning.fingerprint(planning_id, current_user.id)
+        if empreinte is not None:
+            return _reponse_conditionnelle(
+                empreinte, lambda: jsonify(Planning.get_by_id(planning_id))
+            )
+
     planning = Planning.get_by_id(planning_id)
     if not planning or planning.user_id != current_user.id:
         log_security_event(
@@ -738,7 +916,7 @@ def api_planning_detail(planning_id):
         return jsonify({"error": "Planning non trouvé"}), 404
 
     if request.method == "GET":
-        return jsonify(planning.to_dict())
+        return jsonify(planning)
 
     elif request.method == "PUT":
         try:
@@ -775,7 +953,7 @@ def api_planning_detail(planning_id):
                 f"Planning {planning_id} updated",
                 current_user.id,
             )
-            return jsonify({"success": True, "data": planning.to_dict()})
+            return jsonify({"success": True, "data": planning})
         except Exception as e:
             log_security_event(
                 "API_PLANNING_ERROR",
@@ -833,7 +1011,7 @@ def api_planning_convert(planning_id):
             f"Planning {planning_id} converted to feuille",
             current_user.id,
         )
-        return jsonify({"success": True, "data": feuille.to_dict()})
+        return jsonify({"success": True, "data": feuille})
     except Exception as e:
         log_security_event(
             "API_CONVERT_ERROR",
@@ -848,8 +1026,97 @@ def api_planning_convert(planning_id):
 @rate_limit(max_requests=200, window_seconds=3600)
 def api_feuille_heures():
 
-    feuilles = FeuilleDHeures.get_by_user(current_user.id)
-    return jsonify([f.to_dict() for f in feuilles])
+    try:
+        limit, cursor = _parametres_pagination()
+        view, fields = _parametres_vue(FeuilleDHeures)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def construire():
+        if view == "summary":
+            # Lecture des agrégats persistés, sans chargement des jours
+            elements = FeuilleDHeures.summaries_by_user(
+                current_user.id, limit=limit, cursor=cursor
+            )
+        else:
+            elements = FeuilleDHeures.get_by_user(
+                current_user.id, limit=limit, cursor=cursor
+            )
+        return _liste_paginee(elements, limit, fields)
+
+    empreinte = FeuilleDHeures.fingerprint_by_user(current_user.id) or ""
+    return _reponse_conditionnelle(empreinte, construire)
+
+
+# Types synchronisés par /api/sync (noms des tables versionnées)
+TYPES_SYNC = ("plannings", "feuilles_heures")
+
+
+@app.route("/api/sync", methods=["GET"])
+@login_required
+@rate_limit(max_requests=300, window_seconds=3600)
+def api_sync():
+    """Changements depuis la version ``since`` (synchronisation incrémentale)
+
+    Créations, modifications et suppressions par version croissante, au plus
+    ``limit`` tous types confondus. Le client rappelle l'API avec ``since``
+    égal à ``version`` tant que ``has_more`` est vrai.
+    """
+    since = request.args.get("since", type=int) if "since" in request.args else 0
+    limit = request.args.get("limit", LIMITE_PAGE_MAX, type=int)
+    view = request.args.get("view", "full")
+    types = {
+        t.strip()
+        for t in request.args.get("types", ",".join(TYPES_SYNC)).split(",")
+        if t.strip()
+    }
+    if since is None or since < 0:
+        return jsonify({"error": "since doit être un entier positif"}), 400
+    if limit is None or not 1 <= limit <= LIMITE_PAGE_MAX:
+        erreur = f"limit doit être compris entre 1 et {LIMITE_PAGE_MAX}"
+        return jsonify({"error": erreur}), 400
+    if view not in VUES_LISTE:
+        return jsonify({"error": f"view doit valoir {' ou '.join(VUES_LISTE)}"}), 400
+    if not types or not types <= set(TYPES_SYNC):
+        return jsonify({"error": f"types parmi {', '.join(TYPES_SYNC)}"}), 400
+
+    # Lue avant les changements : une écriture concurrente aura une version
+    # supérieure et sera transmise au prochain appel
+    version = version_courante()
+
+    # (version, clé de réponse, élément). Chaque source est lue jusqu'à
+    # ``limit + 1`` éléments : un élément de plus que la page indique la suite
+    elements = []
+    lecture = limit + 1
+    if "plannings" in types:
+        for planning in Planning.changed_since(current_user.id, since, lecture):
+            element = planning.to_summary() if view == "summary" else planning
+            elements.append((planning.version, "plannings", element))
+    if "feuilles_heures" in types:
+        feuilles = FeuilleDHeures.changed_since(
+            current_user.id, since, lecture, summary=view == "summary"
+        )
+        for feuille in feuilles:
+            if view == "summary":
+                elements.append((feuille["version"], "feuilles_heures", feuille))
+            else:
+                elements.append((feuille.version, "feuilles_heures", feuille))
+    for suppression in suppressions_depuis(current_user.id, since, lecture, types):
+        elements.append((suppression["version"], "deleted", suppression))
+
+    # Les ``limit`` premiers éléments fusionnés forment la page : aucun
+    # élément de version inférieure ne peut manquer dans une source
+    elements.sort(key=lambda e: e[0])
+    has_more = len(elements) > limit
+    elements = elements[:limit]
+    if has_more:
+        version = elements[-1][0]
+
+    reponse = {"version": version, "has_more": has_more, "deleted": []}
+    reponse.update((t, []) for t in sorted(types))
+    for _, cle, element in elements:
+        reponse[cle].append(element)
+    return jsonify(reponse)
 
 
 @app.route("/api/contracts", methods=["GET"])
@@ -868,6 +1135,14 @@ def api_contracts():
 @rate_limit(max_requests=200, window_seconds=3600)
 def api_feuille_heures_detail(feuille_id):
 
+    if request.method == "GET":
+        # Empreinte lue avant tout chargement ; None si absente ou non autorisée
+        empreinte = FeuilleDHeures.fingerprint(feuille_id, current_user.id)
+        if empreinte is not None:
+            return _reponse_conditionnelle(
+                empreinte, lambda: jsonify(FeuilleDHeures.get_by_id(feuille_id))
+            )
+
     feuille = FeuilleDHeures.get_by_id(feuille_id)
     if not feuille or feuille.user_id != current_user.id:
         log_security_event(
@@ -878,13 +1153,11 @@ def api_feuille_heures_detail(feuille_id):
         return jsonify({"error": "Feuille d'heures non trouvée"}), 404
 
     if request.method == "GET":
-        return jsonify(feuille.to_dict())
+        return jsonify(feuille)
 
     elif request.method == "DELETE":
         try:
-            db_manager.execute_delete(
-                "DELETE FROM feuilles_heures WHERE id = ?", (feuille_id,)
-            )
+            feuille.delete()
             log_security_event(
                 "API_FEUILLE_SUCCESS", f"Feuille {feuille_id} deleted", current_user.id
             )
@@ -903,6 +1176,11 @@ def api_feuille_heures_detail(feuille_id):
             )
 
 
+def _nom_fichier_pdf(mois, annee):
+    """Nom du fichier PDF téléchargé pour une feuille d'heures"""
+    return f"feuille_heures_{MOIS_NOMS[mois]}_{annee}.pdf"
+
+
 @app.route("/api/feuille-heures/<int:feuille_id>/pdf", methods=["GET"])
 @login_required
 @rate_limit(max_requests=50, window_seconds=3600)
@@ -922,14 +1200,22 @@ def api_feuille_heures_pdf(feuille_id):
         # Convertir la feuille en dictionnaire
         feuille_data = feuille.to_dict()
 
-        # Générer le PDF
-        pdf_buffer = pdf_generator.generer_pdf_feuille(feuille_data)
+        # L'empreinte du contenu sert de clé de cache et d'ETag
+        cache_key = pdf_cache.compute_key(feuille_data)
+        if cache_key in request.if_none_match:
+            response = current_app.response_class(status=304)
+            response.set_etag(cache_key)
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+        # Générer le PDF s'il n'est pas déjà en cache
+        pdf_bytes = pdf_cache.get(feuille_id, cache_key)
+        if pdf_bytes is None:
+            pdf_bytes = pdf_generator.generer_pdf_feuille(feuille_data).getvalue()
+            pdf_cache.put(feuille_id, cache_key, pdf_bytes)
 
         # Nom du fichier
-        mois_noms = ['', 'Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
-                    'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre']
-        mois_nom = mois_noms[feuille.mois]
-        filename = f"feuille_heures_{mois_nom}_{feuille.annee}.pdf"
+        filename = _nom_fichier_pdf(feuille.mois, feuille.annee)
 
         # Log de succès
         log_security_event(
@@ -939,12 +1225,15 @@ def api_feuille_heures_pdf(feuille_id):
         )
 
         # Retourner le fichier PDF
-        return send_file(
-            pdf_buffer,
+        response = send_file(
+            io.BytesIO(pdf_bytes),
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=filename
+            download_name=filename,
+            etag=cache_key,
         )
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
 
     except Exception as e:
         # Log de l'erreur
@@ -957,5 +1246,277 @@ def api_feuille_heures_pdf(feuille_id):
         return jsonify({"error": f"Erreur lors de la génération du PDF: {str(e)}"}), 500
 
 
+@app.route("/api/feuille-heures/export", methods=["GET"])
+@login_required
+@rate_limit(max_requests=10, window_seconds=3600)
+def api_feuille_heures_export():
+    """Export groupé des feuilles d'une année (ou d'une liste d'IDs) en ZIP ou PDF"""
+    format_export = request.args.get("format", "zip").lower()
+    if format_export not in FORMATS_EXPORT:
+        return jsonify({"error": "Format invalide (zip ou pdf)"}), 400
+    if format_export == "pdf" and not fusion_disponible():
+        return (
+            jsonify(
+                {
+                    "error": "La fusion PDF nécessite pypdf, utilisez format=zip",
+                }
+            ),
+            400,
+        )
+
+    try:
+        annee = request.args.get("annee", type=int)
+        ids = {
+            int(feuille_id)
+            for feuille_id in request.args.get("ids", "").split(",")
+            if feuille_id.strip()
+        }
+    except ValueError:
+        return jsonify({"error": "Paramètre ids invalide"}), 400
+    if not annee and not ids:
+        return jsonify({"error": "Paramètre annee ou ids requis"}), 400
+
+    if len(ids) > MAX_FEUILLES_EXPORT:
+        return (
+            jsonify({"error": f"Export limité à {MAX_FEUILLES_EXPORT} feuilles"}),
+            400,
+        )
+
+    # Uniquement les feuilles de l'utilisateur connecté, comptées avant lecture
+    total = FeuilleDHeures.count_selection(current_user.id, annee, ids)
+    if not total:
+        return jsonify({"error": "Aucune feuille d'heures à exporter"}), 404
+    if total > MAX_FEUILLES_EXPORT:
+        return (
+            jsonify({"error": f"Export limité à {MAX_FEUILLES_EXPORT} feuilles"}),
+            400,
+        )
+    if format_export == "pdf" and total > MAX_FEUILLES_FUSION:
+        erreur = f"PDF fusionné limité à {MAX_FEUILLES_FUSION} feuilles"
+        return jsonify({"error": f"{erreur}, utilisez format=zip"}), 413
+
+    # Les en-têtes suffisent pour nommer les fichiers, les jours sont chargés
+    # par lots au rythme du rendu
+    rows = FeuilleDHeures.select_rows(current_user.id, annee, ids)
+    noms = [_nom_fichier_pdf(row["mois"], row["annee"]) for row in rows]
+    pdfs = rendre_pdfs(
+        (
+            (feuille.id, feuille.to_dict())
+            for feuille in FeuilleDHeures.iter_from_rows(rows)
+        ),
+        pdf_jobs.executor(),
+        fenetre=pdf_jobs.max_workers * 2,
+    )
+
+    log_security_event(
+        "PDF_EXPORT",
+        f"Bulk {format_export} export of {len(rows)} feuilles",
+        current_user.id,
+    )
+
+    nom_export = f"feuilles_heures_{annee or 'selection'}.{format_export}"
+    if format_export == "zip":
+        corps, mimetype = flux_zip(zip(noms, pdfs)), "application/zip"
+    else:
+        corps, mimetype = flux_pdf_fusionne(pdfs), "application/pdf"
+
+    return Response(
+        stream_with_context(corps),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={nom_export}"},
+    )
+
+
+@app.route("/api/feuille-heures/stream", methods=["GET"])
+@login_required
+@rate_limit(max_requests=10, window_seconds=3600)
+def api_feuille_heures_stream():
+    """Export comptable en flux (NDJSON ou CSV) des feuilles et créneaux
+
+    ``scope=all`` exporte tous les utilisateurs et est réservé aux comptes
+    listés dans ``EXPORT_ADMIN_EMAILS``.
+    """
+    format_export = request.args.get("format", "ndjson").lower()
+    if format_export not in FORMATS_FLUX:
+        return jsonify({"error": "Format invalide (ndjson ou csv)"}), 400
+    annee = request.args.get("annee", type=int)
+
+    user_id = current_user.id
+    if request.args.get("scope") == "all":
+        if current_user.email not in Config.EXPORT_ADMIN_EMAILS:
+            log_security_event(
+                "EXPORT_UNAUTHORIZED", "All-users export denied", current_user.id
+            )
+            return jsonify({"error": "Export de tous les utilisateurs refusé"}), 403
+        user_id = None
+
+    portee = "all" if user_id is None else "own"
+    log_security_event(
+        "DATA_EXPORT",
+        f"Streaming {format_export} export (scope={portee})",
+        current_user.id,
+    )
+
+    nom_export = f"feuilles_heures_{annee or 'toutes'}.{format_export}"
+    return Response(
+        stream_with_context(
+            flux_export(format_export, db_manager, user_id=user_id, annee=annee)
+        ),
+        mimetype=TYPES_MIME[format_export],
+        headers={"Content-Disposition": f"attachment; filename={nom_export}"},
+    )
+
+
+@app.route("/api/feuille-heures/<int:feuille_id>/pdf/jobs", methods=["POST"])
+@login_required
+@rate_limit(max_requests=50, window_seconds=3600)
+def api_feuille_heures_pdf_job(feuille_id):
+    """Met en file le rendu PDF d'une feuille d'heures (mode asynchrone)"""
+    feuille = FeuilleDHeures.get_by_id(feuille_id)
+    if not feuille or feuille.user_id != current_user.id:
+        log_security_event(
+            "PDF_UNAUTHORIZED",
+            f"Unauthorized PDF job for feuille {feuille_id}",
+            current_user.id,
+        )
+        return jsonify({"error": "Feuille d'heures non trouvée"}), 404
+
+    try:
+        job = pdf_jobs.enqueue(
+            feuille_id,
+            current_user.id,
+            feuille.to_dict(),
+            _nom_fichier_pdf(feuille.mois, feuille.annee),
+        )
+    except Exception as e:
+        current_app.logger.error(f"Erreur mise en file PDF: {str(e)}")
+        return jsonify({"error": "Erreur lors de la mise en file du PDF"}), 500
+
+    response = jsonify(_job_payload(job))
+    response.status_code = 202
+    response.headers["Location"] = url_for("api_pdf_job_status", job_id=job["id"])
+    return response
+
+
+def _job_payload(job):
+    """Représentation JSON d'une tâche de rendu PDF"""
+    return {
+        "job_id": job["id"],
+        "feuille_id": job["feuille_id"],
+        "status": job["status"],
+        "error": job["error"],
+        "render_ms": job["render_ms"],
+        "created_at": job["created_at"],
+        "finished_at": job["finished_at"],
+        "status_url": url_for("api_pdf_job_status", job_id=job["id"]),
+        "download_url": url_for("api_pdf_job_download", job_id=job["id"]),
+    }
+
+
+def _get_owned_job(job_id):
+    job = pdf_jobs.get(job_id)
+    if not job or job["user_id"] != current_user.id:
+        return None
+    return job
+
+
+@app.route("/api/pdf-jobs/<job_id>", methods=["GET"])
+@login_required
+def api_pdf_job_status(job_id):
+    """État d'une tâche de rendu PDF"""
+    job = _get_owned_job(job_id)
+    if not job:
+        return jsonify({"error": "Tâche non trouvée"}), 404
+    return jsonify(_job_payload(job))
+
+
+@app.route("/api/pdf-jobs/<job_id>/download", methods=["GET"])
+@login_required
+def api_pdf_job_download(job_id):
+    """Télécharge le PDF d'une tâche terminée"""
+    job = _get_owned_job(job_id)
+    if not job:
+        return jsonify({"error": "Tâche non trouvée"}), 404
+
+    if job["status"] == "error":
+        # Le message d'erreur du rendu est dans le champ "error"
+        return jsonify(_job_payload(job)), 500
+    if job["status"] != "done":
+        # Pas encore prêt : le client réessaie plus tard
+        response = jsonify(_job_payload(job))
+        response.status_code = 202
+        response.headers["Retry-After"] = "1"
+        return response
+
+    path = pdf_jobs.output_path(job["id"])
+    if not os.path.exists(path):
+        return jsonify({"error": "PDF expiré, relancez la génération"}), 410
+
+    return send_file(
+        os.path.abspath(path),
+        mimetype="application/pdf",
+        as_attachment=True,
+        download_name=job["filename"],
+    )
+
+
+@app.route("/api/pdf-jobs/metrics", methods=["GET"])
+@login_required
+def api_pdf_job_metrics():
+    """Profondeur de la file et durées de rendu
+
+    Les métriques portent sur tous les utilisateurs : elles sont réservées
+    aux comptes listés dans ``EXPORT_ADMIN_EMAILS``.
+    """
+    if current_user.email not in Config.EXPORT_ADMIN_EMAILS:
+        log_security_event(
+            "PDF_METRICS_UNAUTHORIZED", "PDF job metrics denied", current_user.id
+        )
+        return jsonify({"error": "Accès refusé"}), 403
+    return jsonify(pdf_jobs.metrics())
+
+
+@app.cli.command("password-costs")
+@click.option(
+    "--mesurer",
+    is_flag=True,
+    help="Mesure la durée d'une vérification pour chaque coût autour de la cible",
+)
+def password_costs_command(mesurer):
+    """Répartition des coûts bcrypt des mots de passe enregistrés"""
+    distribution = User.password_cost_distribution()
+    total = sum(distribution.values())
+    click.echo(f"Coût cible (BCRYPT_ROUNDS) : {password_hasher.rounds}")
+    click.echo(f"Utilisateurs : {total}")
+    for cost in sorted(distribution, key=lambda c: (c is None, c or 0)):
+        libelle = "inconnu" if cost is None else str(cost)
+        marque = " (cible)" if cost == password_hasher.rounds else ""
+        nombre = distribution[cost]
+        click.echo(f"  coût {libelle:>7} : {nombre:6d} ({nombre / total:.0%}){marque}")
+
+    if mesurer:
+        # Durée d'une connexion réussie selon le coût, pour choisir la cible
+        couts = {c for c in distribution if c is not None}
+        couts.update(range(password_hasher.rounds - 2, password_hasher.rounds + 3))
+        click.echo("Durée d'une vérification :")
+        for cost in sorted(c for c in couts if 4 <= c <= 31):
+            password_hash = bcrypt.hashpw(b"mesure", bcrypt.gensalt(rounds=cost))
+            debut = time.perf_counter()
+            bcrypt.checkpw(b"mesure", password_hash)
+            duree_ms = (time.perf_counter() - debut) * 1000
+            click.echo(f"  coût {cost:>7} : {duree_ms:8.1f} ms")
+
+
+@app.cli.command("refresh-aggregates")
+@click.option("--user-id", type=int, default=None, help="Limite à un utilisateur")
+@click.option("--annee", type=int, default=None, help="Limite à une année")
+def refresh_aggregates_command(user_id, annee):
+    """Recalcule et persiste les agrégats périmés (après un changement de règles)"""
+    debut = time.perf_counter()
+    total = FeuilleDHeures.refresh_aggregates(user_id=user_id, annee=annee)
+    duree = time.perf_counter() - debut
+    click.echo(f"Feuilles recalculées : {total} ({duree:.1f} s)")
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,83 @@
+"""
+Compression des réponses (brotli si installé, sinon gzip)
+
+Appliquée après chaque requête aux réponses textuelles dépassant un seuil.
+Les réponses en flux et les fichiers (PDF, exports) ne sont pas concernés.
+Un ETag fort reçoit le suffixe de l'encodage (``"etag-br"``) : chaque
+représentation compressée a son propre validateur.
+"""
+
+import gzip
+from typing import Iterable, List, Optional
+
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli est optionnel (extra "perf")
+    brotli = None
+
+# Encodages par ordre de préférence
+ENCODAGES = ("br", "gzip")
+
+NIVEAU_GZIP = 6
+QUALITE_BROTLI = 5  # Bon compromis débit / taux pour des réponses dynamiques
+
+
+def encodages_disponibles() -> List[str]:
+    return [e for e in ENCODAGES if e != "br" or brotli is not None]
+
+
+def variantes_etag(etag: str) -> List[str]:
+    """ETag d'origine et ses variantes compressées"""
+    return [etag] + [f"{etag}-{encodage}" for encodage in ENCODAGES]
+
+
+def choisir_encodage(accept_encoding) -> Optional[str]:
+    """Premier encodage disponible accepté par le client"""
+    for encodage in encodages_disponibles():
+        if accept_encoding[encodage] > 0:
+            return encodage
+    return None
+
+
+def compresser(data: bytes, encodage: str) -> bytes:
+    if encodage == "br":
+        return brotli.compress(data, quality=QUALITE_BROTLI)
+    return gzip.compress(data, compresslevel=NIVEAU_GZIP)
+
+
+def register_compression(app: Flask, min_size: int, mimetypes: Iterable[str]) -> None:
+    """Installe la compression des réponses sur l'application"""
+    mimetypes = frozenset(mimetypes)
+
+    @app.after_request
+    def compresser_reponse(response: Response) -> Response:
+        if response.status_code == 304:
+            # Même en-tête Vary que la réponse 200 validée par le cache
+            response.vary.add("Accept-Encoding")
+            return response
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in mimetypes
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encodage = choisir_encodage(request.accept_encodings)
+        if encodage is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        response.set_data(compresser(data, encodage))
+        response.headers["Content-Encoding"] = encodage
+        etag, faible = response.get_etag()
+        if etag and not faible:
+            response.set_etag(f"{etag}-{encodage}")
+        return response
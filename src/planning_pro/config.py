@@ -21,6 +21,12 @@ def load_env_file(env_file=".env"):
                     os.environ.setdefault(key, value)
 
 
+def entier_optionnel(nom):
+    """Entier lu dans l'environnement, None si la variable est absente ou vide"""
+    valeur = os.environ.get(nom, "").strip()
+    return int(valeur) if valeur else None
+
+
 # Charger le fichier .env s'il existe
 load_env_file()
 
@@ -59,6 +65,26 @@ class Config:
 
     # Configuration de la base de données
     DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///data/planning.db")
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+    DB_POOL_MAX_USES = int(os.environ.get("DB_POOL_MAX_USES", "1000"))
+    # Profil de PRAGMA SQLite : "production" (WAL, synchronous=NORMAL, ...)
+    # ou "default" (réglages SQLite d'origine). Les valeurs ci-dessous
+    # surchargent celles du profil lorsqu'elles sont définies (0 compris).
+    SQLITE_PRAGMA_PROFILE = os.environ.get("SQLITE_PRAGMA_PROFILE", "production")
+    SQLITE_BUSY_TIMEOUT_MS = entier_optionnel("SQLITE_BUSY_TIMEOUT_MS")
+    SQLITE_CACHE_SIZE = entier_optionnel("SQLITE_CACHE_SIZE")
+    SQLITE_MMAP_SIZE = entier_optionnel("SQLITE_MMAP_SIZE")
+
+    # Cache disque des PDF générés (0 pour le désactiver)
+    PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR", "data/pdf_cache")
+    PDF_CACHE_MAX_BYTES = int(
+        os.environ.get("PDF_CACHE_MAX_BYTES", str(100 * 1024 * 1024))
+    )
+
+    # File de rendu PDF en arrière-plan (processus dédiés)
+    PDF_JOBS_DIR = os.environ.get("PDF_JOBS_DIR", "data/pdf_jobs")
+    PDF_JOB_WORKERS = int(os.environ.get("PDF_JOB_WORKERS", "2"))
+    PDF_JOB_RETENTION_HOURS = int(os.environ.get("PDF_JOB_RETENTION_HOURS", "24"))
 
     # Configuration CSRF
     WTF_CSRF_TIME_LIMIT = int(os.environ.get("CSRF_TIME_LIMIT", "3600"))  # 1 heure
@@ -86,6 +112,61 @@ class Config:
         "1",
     ]
 
+    # Hachage des mots de passe : coût bcrypt et taille du pool de calcul
+    BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+    BCRYPT_MAX_WORKERS = int(os.environ.get("BCRYPT_MAX_WORKERS", "4"))
+    BCRYPT_MAX_PENDING = int(os.environ.get("BCRYPT_MAX_PENDING", "16"))
+
+    # Cache des utilisateurs chargés par Flask-Login (0 pour le désactiver)
+    USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", "30"))
+    USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "1024"))
+
+    # Limitation de débit : "memory" (un seul processus) ou "sqlite"
+    # (partagé entre les workers gunicorn)
+    RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "true").lower() in [
+        "true",
+        "on",
+        "1",
+    ]
+    RATELIMIT_BACKEND = os.environ.get("RATELIMIT_BACKEND", "memory")
+    RATELIMIT_STORAGE_PATH = os.environ.get(
+        "RATELIMIT_STORAGE_PATH", "data/ratelimit.db"
+    )
+
+    # Sérialisation JSON des réponses avec orjson s'il est installé
+    JSON_FAST_ENCODER = os.environ.get("JSON_FAST_ENCODER", "true").lower() in [
+        "true",
+        "on",
+        "1",
+    ]
+
+    # Compression gzip/brotli des réponses de données au-delà d'un seuil
+    # (octets). text/html n'est pas compressé par défaut : les pages contenant
+    # le jeton CSRF seraient exposées à BREACH. L'ajouter à la liste est un
+    # choix explicite.
+    COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "true").lower() in [
+        "true",
+        "on",
+        "1",
+    ]
+    COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_MIMETYPES = [
+        mimetype.strip()
+        for mimetype in os.environ.get(
+            "COMPRESSION_MIMETYPES",
+            "application/json,text/csv,application/x-ndjson",
+        ).split(",")
+        if mimetype.strip()
+    ]
+
+    # Comptes autorisés à exporter les feuilles de tous les utilisateurs et à
+    # consulter les métriques de la file PDF (emails séparés par des virgules)
+    EXPORT_ADMIN_EMAILS = [
+        email.strip().lower()
+        for email in os.environ.get("EXPORT_ADMIN_EMAILS", "").split(",")
+        if email.strip()
+    ]
+
     # Jours feries francais (a adapter selon vos besoins)
     JOURS_FERIES = [
         "01-01",  # Jour de l'an
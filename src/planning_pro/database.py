@@ -1,32 +1,431 @@
 import sqlite3
 import os
-from typing import List
+import queue
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from contextlib import contextmanager
 
+from .config import Config
+
+
+# Profils de PRAGMA appliqués à chaque nouvelle connexion
+PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Réglages par défaut de SQLite (journal DELETE, synchronous FULL)
+    "default": {},
+    # Lecteurs et écrivain concurrents entre workers gunicorn
+    "production": {
+        "busy_timeout": 5000,  # ms d'attente avant "database is locked"
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -20000,  # Valeur négative = taille en Kio (~20 Mo)
+        "mmap_size": 134217728,  # 128 Mo
+        "temp_store": "MEMORY",
+    },
+}
+
+
+# Agrégats dénormalisés des feuilles d'heures, maintenus par FeuilleDHeures.save()
+# (ajoutés par migration aux bases existantes)
+FEUILLE_AGGREGATE_COLUMNS: Dict[str, str] = {
+    "total_heures": "REAL",
+    "semaines_heures": "TEXT",  # JSON : heures de chaque semaine
+    "salaire_brut_total": "REAL",
+    "salaire_net": "REAL",
+    "heures_par_tranche": "TEXT",  # JSON : heures normales, complémentaires, sup.
+    "agregats_version": "TEXT",  # Version des règles de calcul utilisées
+}
+
+
+# Versions de ligne des plannings et feuilles, tirées de la séquence globale
+# change_sequence (ajoutées par migration aux bases existantes)
+ROW_VERSION_COLUMNS: Dict[str, str] = {
+    "version": "INTEGER NOT NULL DEFAULT 0",
+    "updated_at": "TEXT",  # Horodatage UTC ISO 8601 de la dernière modification
+}
+
+# Tables versionnées, synchronisées par /api/sync
+ROW_VERSIONED_TABLES = ("plannings", "feuilles_heures")
+
+# Horodatage UTC courant, calculé par SQLite
+UTC_NOW_SQL = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+# Tables enfants dont chaque écriture hors des modèles incrémente la version de
+# la ligne parente : table -> (table parente, ID parent exprimé à partir de la
+# ligne {row})
+VERSIONED_CHILD_TABLES: Dict[str, tuple] = {
+    "jours_travail": ("plannings", "{row}.planning_id"),
+    "creneaux_travail": (
+        "plannings",
+        "(SELECT planning_id FROM jours_travail WHERE id = {row}.jour_travail_id)",
+    ),
+    "jours_travailles": ("feuilles_heures", "{row}.feuille_heures_id"),
+    "creneaux_feuille": (
+        "feuilles_heures",
+        "(SELECT feuille_heures_id FROM jours_travailles"
+        " WHERE id = {row}.jour_travaille_id)",
+    ),
+}
+
+
+def add_missing_columns(cursor, table: str, columns: Dict[str, str]) -> List[str]:
+    """Ajoute à une table existante les colonnes absentes, retourne leurs noms"""
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    added = []
+    for name, definition in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+            added.append(name)
+    return added
+
+
+def add_row_versions(cursor, table: str) -> None:
+    """Ajoute les colonnes de version à une table et numérote ses lignes existantes"""
+    if "version" in add_missing_columns(cursor, table, ROW_VERSION_COLUMNS):
+        cursor.execute(
+            f"""UPDATE {table} SET updated_at = created_at,
+                   version = id + (SELECT version FROM change_sequence)"""
+        )
+        cursor.execute(
+            f"""UPDATE change_sequence SET version = MAX(version,
+                   (SELECT COALESCE(MAX(version), 0) FROM {table}))"""
+        )
+
+
+def create_version_triggers(cursor) -> None:
+    """Crée (ou recrée) les triggers de version sur les tables enfants
+
+    Une insertion, modification ou suppression de jour ou de créneau faite
+    hors des modèles incrémente la séquence et reporte sa valeur sur le
+    planning ou la feuille parente. Les sauvegardes des modèles suspendent
+    ces triggers (``UnitOfWork.pause_version_triggers``) et versionnent la
+    ligne parente une seule fois au commit.
+    """
+    for table, (parent, parent_id) in VERSIONED_CHILD_TABLES.items():
+        for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            name = f"trg_{table}_{event.lower()}_version"
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(
+                f"""CREATE TRIGGER {name}
+                    AFTER {event} ON {table}
+                    WHEN (SELECT triggers_paused FROM change_sequence) = 0
+                    BEGIN
+                        UPDATE change_sequence SET version = version + 1;
+                        UPDATE {parent}
+                        SET version = (SELECT version FROM change_sequence),
+                            updated_at = {UTC_NOW_SQL}
+                        WHERE id = {parent_id.format(row=row)};
+                    END"""
+            )
+
+
+def create_tombstone_triggers(cursor) -> None:
+    """Enregistre dans deleted_rows chaque suppression de planning ou de feuille
+
+    La pierre tombale reçoit une version de la séquence globale : la
+    synchronisation incrémentale transmet les suppressions comme les
+    modifications.
+    """
+    for table in ROW_VERSIONED_TABLES:
+        cursor.execute(
+            f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_delete_tombstone
+                AFTER DELETE ON {table}
+                BEGIN
+                    UPDATE change_sequence SET version = version + 1;
+                    INSERT INTO deleted_rows
+                        (version, table_name, row_id, user_id, deleted_at)
+                    VALUES ((SELECT version FROM change_sequence), '{table}',
+                            OLD.id, OLD.user_id, {UTC_NOW_SQL});
+                END"""
+        )
+
+
+def build_pragmas(profile: str, **overrides: Any) -> Dict[str, Any]:
+    """Construit la liste des PRAGMA d'un profil, avec surcharges éventuelles
+
+    Une surcharge à None conserve la valeur du profil ; 0 est appliqué.
+    """
+    if profile not in PRAGMA_PROFILES:
+        raise ValueError(f"Profil PRAGMA SQLite inconnu: {profile}")
+
+    pragmas = dict(PRAGMA_PROFILES[profile])
+    pragmas.update(
+        {name: value for name, value in overrides.items() if value is not None}
+    )
+    return pragmas
+
+
+class ConnectionPool:
+    """Pool de connexions SQLite réutilisables
+
+    Les connexions inactives sont conservées dans une pile (LIFO) bornée à
+    ``pool_size``. Chaque connexion est vérifiée avant d'être prêtée et
+    recyclée après ``max_uses`` emprunts. Le pool est propre à chaque
+    processus : après un fork (workers gunicorn), les connexions héritées
+    du parent sont abandonnées.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = 5,
+        max_uses: int = 1000,
+        pragmas: Optional[Dict[str, Any]] = None,
+    ):
+        self.db_path = db_path
+        self.pragmas = pragmas or {}
+        self.pool_size = max(0, pool_size)
+        self.max_uses = max(1, max_uses)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._uses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.stats = {"opened": 0, "reused": 0, "recycled": 0, "discarded": 0}
+
+    def _open(self) -> sqlite3.Connection:
+        """Ouvre une nouvelle connexion"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        with self._lock:
+            self._uses[id(conn)] = 0
+            self.stats["opened"] += 1
+        return conn
+
+    def _close(self, conn: sqlite3.Connection, stat: str):
+        """Ferme une connexion et comptabilise la raison"""
+        with self._lock:
+            self._uses.pop(id(conn), None)
+            self.stats[stat] += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _check_fork(self):
+        """Abandonne les connexions héritées d'un processus parent"""
+        if self._pid != os.getpid():
+            with self._lock:
+                self._pid = os.getpid()
+                self._idle = queue.LifoQueue()
+                self._uses.clear()
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        """Vérifie qu'une connexion est encore utilisable"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self) -> sqlite3.Connection:
+        """Emprunte une connexion au pool (ou en ouvre une nouvelle)"""
+        self._check_fork()
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+                break
+
+            if self._is_healthy(conn):
+                with self._lock:
+                    self.stats["reused"] += 1
+                break
+            self._close(conn, "discarded")
+
+        with self._lock:
+            self._uses[id(conn)] = self._uses.get(id(conn), 0) + 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Rend une connexion au pool"""
+        if self._pid != os.getpid():
+            return
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._close(conn, "discarded")
+            return
+
+        if self._uses.get(id(conn), 0) >= self.max_uses:
+            self._close(conn, "recycled")
+        elif self._idle.qsize() >= self.pool_size:
+            self._close(conn, "discarded")
+        else:
+            self._idle.put(conn)
+
+    def close_all(self):
+        """Ferme toutes les connexions inactives"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(conn, "discarded")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Retourne les compteurs de connexions ouvertes / réutilisées"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["idle"] = self._idle.qsize()
+        return stats
+
+
+class UnitOfWork:
+    """Unité de travail : regroupe plusieurs écritures dans une transaction
+
+    Obtenue via ``DatabaseManager.transaction()``. Toutes les requêtes
+    partagent la même connexion et sont validées en un seul commit, ou
+    annulées ensemble en cas d'erreur.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.rows_written = 0
+        # (table, id) -> (version, updated_at) attribués au commit
+        self.row_versions: Dict[Tuple[str, int], Tuple[int, str]] = {}
+        self._tracked_rows: Dict[Tuple[str, int], None] = {}
+        self._pause_requested = False
+        self._triggers_paused = False
+
+    def _before_write(self) -> None:
+        # La suspension n'est écrite qu'avant la première écriture réelle :
+        # une unité de travail sans écriture reste sans effet
+        if self._pause_requested and not self._triggers_paused:
+            self.cursor.execute("UPDATE change_sequence SET triggers_paused = 1")
+            self._triggers_paused = True
+
+    def query(self, query: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """Exécute une requête SELECT dans la transaction"""
+        self.cursor.execute(query, params)
+        return self.cursor.fetchall()
+
+    def execute(self, query: str, params: tuple = ()) -> int:
+        """Exécute une écriture et retourne le nombre de lignes affectées"""
+        self._before_write()
+        self.cursor.execute(query, params)
+        self.rows_written += max(0, self.cursor.rowcount)
+        return self.cursor.rowcount
+
+    def executemany(self, query: str, seq_of_params: Iterable[tuple]) -> int:
+        """Exécute une écriture pour chaque jeu de paramètres"""
+        self._before_write()
+        self.cursor.executemany(query, seq_of_params)
+        self.rows_written += max(0, self.cursor.rowcount)
+        return self.cursor.rowcount
+
+    def insert(self, query: str, params: tuple = ()) -> int:
+        """Exécute un INSERT et retourne l'ID du nouvel enregistrement"""
+        self.execute(query, params)
+        row_id = self.cursor.lastrowid
+        if row_id is None:
+            raise sqlite3.OperationalError("Aucune ligne insérée")
+        return row_id
+
+    def next_version(self) -> int:
+        """Incrémente la séquence globale des changements et retourne sa valeur
+
+        Écriture de service, non comptée dans ``rows_written``.
+        """
+        self.cursor.execute("UPDATE change_sequence SET version = version + 1")
+        return self.query("SELECT version FROM change_sequence")[0]["version"]
+
+    def pause_version_triggers(self) -> None:
+        """Suspend les triggers de version des tables enfants jusqu'au commit
+
+        La suspension est écrite dans la transaction : les autres connexions
+        ne la voient jamais, et elle est levée avant le commit.
+        """
+        self._pause_requested = True
+
+    def track_version(self, table: str, row_id: int) -> None:
+        """Attribue une nouvelle version à la ligne au commit (une seule fois)
+
+        Suspend aussi les triggers de version : les écritures des jours et
+        créneaux de la ligne ne la versionnent pas une seconde fois.
+        """
+        self._tracked_rows[(table, row_id)] = None
+        self.pause_version_triggers()
+
+    def apply_versions(self) -> None:
+        """Versionne les lignes suivies et lève la suspension des triggers
+
+        Appelée par ``DatabaseManager.transaction()`` avant le commit. Chaque
+        ligne reçoit sa propre version de la séquence ; l'écriture est
+        comptée dans ``rows_written``.
+        """
+        for table, row_id in self._tracked_rows:
+            self.execute(
+                f"UPDATE {table} SET version = ?, updated_at = {UTC_NOW_SQL}"
+                " WHERE id = ?",
+                (self.next_version(), row_id),
+            )
+            row = self.query(
+                f"SELECT version, updated_at FROM {table} WHERE id = ?", (row_id,)
+            )
+            if row:
+                self.row_versions[(table, row_id)] = (
+                    row[0]["version"],
+                    row[0]["updated_at"],
+                )
+        self._tracked_rows.clear()
+        if self._triggers_paused:
+            self.cursor.execute("UPDATE change_sequence SET triggers_paused = 0")
+            self._triggers_paused = False
+
 
 class DatabaseManager:
     """Gestionnaire de base de données SQLite pour l'application"""
 
-    def __init__(self, db_path: str = "data/planning.db"):
+    def __init__(
+        self,
+        db_path: str = "data/planning.db",
+        pool_size: int = 5,
+        pool_max_uses: int = 1000,
+        pragmas: Optional[Dict[str, Any]] = None,
+    ):
         self.db_path = db_path
+        self.pool = ConnectionPool(db_path, pool_size, pool_max_uses, pragmas)
         self.ensure_data_directory()
         self.init_database()
 
     def ensure_data_directory(self):
         """Assure que le répertoire data existe"""
         data_dir = os.path.dirname(self.db_path)
-        if not os.path.exists(data_dir):
+        if data_dir and not os.path.exists(data_dir):
             os.makedirs(data_dir)
 
     @contextmanager
     def get_connection(self):
-        """Context manager pour les connexions à la base de données"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
+        """Context manager pour emprunter une connexion au pool"""
+        conn = self.pool.acquire()
         try:
             yield conn
         finally:
-            conn.close()
+            self.pool.release(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[UnitOfWork]:
+        """Context manager ouvrant une transaction (un seul commit)"""
+        with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            uow = UnitOfWork(conn)
+            try:
+                yield uow
+                uow.apply_versions()
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Retourne les statistiques du pool de connexions"""
+        return self.pool.get_stats()
 
     def init_database(self):
         """Initialise la base de données avec les tables nécessaires"""
@@ -50,6 +449,26 @@ class DatabaseManager:
             """
             )
 
+            # Séquence globale des changements (une seule ligne) : source des
+            # versions de ligne des plannings et feuilles
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS change_sequence (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL,
+                    triggers_paused INTEGER NOT NULL DEFAULT 0
+                )
+            """
+            )
+            add_missing_columns(
+                cursor,
+                "change_sequence",
+                {"triggers_paused": "INTEGER NOT NULL DEFAULT 0"},
+            )
+            cursor.execute(
+                "INSERT OR IGNORE INTO change_sequence (id, version) VALUES (1, 0)"
+            )
+
             # Table plannings
             cursor.execute(
                 """
@@ -66,6 +485,7 @@ class DatabaseManager:
                 )
             """
             )
+            add_row_versions(cursor, "plannings")
 
             # Table jours_travail (pour les plannings)
             cursor.execute(
@@ -108,6 +528,8 @@ class DatabaseManager:
                 )
             """
             )
+            add_missing_columns(cursor, "feuilles_heures", FEUILLE_AGGREGATE_COLUMNS)
+            add_row_versions(cursor, "feuilles_heures")
 
             # Table jours_travailles (pour les feuilles d'heures)
             cursor.execute(
@@ -134,6 +556,43 @@ class DatabaseManager:
             """
             )
 
+            # Table pdf_jobs (file de rendu PDF en arrière-plan)
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pdf_jobs (
+                    id TEXT PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    feuille_id INTEGER NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    payload TEXT NOT NULL,
+                    error TEXT,
+                    worker_pid INTEGER,
+                    render_ms REAL,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            """
+            )
+
+            # Table deleted_rows (pierres tombales des suppressions)
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS deleted_rows (
+                    version INTEGER PRIMARY KEY,
+                    table_name TEXT NOT NULL,
+                    row_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    deleted_at TEXT NOT NULL
+                )
+            """
+            )
+
+            create_version_triggers(cursor)
+            create_tombstone_triggers(cursor)
+
             # Index pour améliorer les performances
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)")
             cursor.execute(
@@ -142,6 +601,23 @@ class DatabaseManager:
             cursor.execute(
                 "CREATE INDEX IF NOT EXISTS idx_feuilles_user_date ON feuilles_heures(user_id, mois, annee)"
             )
+            # Pagination par clé : parcours ordonné (annee, mois) par utilisateur
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_plannings_user_periode ON plannings(user_id, annee, mois)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_feuilles_user_periode ON feuilles_heures(user_id, annee, mois)"
+            )
+            # Validation des ETag et synchronisation : (nombre, version max)
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_plannings_user_version ON plannings(user_id, version)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_feuilles_user_version ON feuilles_heures(user_id, version)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_deleted_rows_user_version ON deleted_rows(user_id, version)"
+            )
             cursor.execute(
                 "CREATE INDEX IF NOT EXISTS idx_jours_travail_planning ON jours_travail(planning_id)"
             )
@@ -154,6 +630,12 @@ class DatabaseManager:
             cursor.execute(
                 "CREATE INDEX IF NOT EXISTS idx_creneaux_feuille_jour ON creneaux_feuille(jour_travaille_id)"
             )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_pdf_jobs_status ON pdf_jobs(status)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_pdf_jobs_feuille ON pdf_jobs(user_id, feuille_id, cache_key)"
+            )
 
             conn.commit()
 
@@ -190,4 +672,13 @@ class DatabaseManager:
 
 
 # Instance globale du gestionnaire de base de données
-db_manager = DatabaseManager()
+db_manager = DatabaseManager(
+    pool_size=Config.DB_POOL_SIZE,
+    pool_max_uses=Config.DB_POOL_MAX_USES,
+    pragmas=build_pragmas(
+        Config.SQLITE_PRAGMA_PROFILE,
+        busy_timeout=Config.SQLITE_BUSY_TIMEOUT_MS,
+        cache_size=Config.SQLITE_CACHE_SIZE,
+        mmap_size=Config.SQLITE_MMAP_SIZE,
+    ),
+)
@@ -0,0 +1,76 @@
+"""
+Fournisseur JSON de l'application Flask
+
+Utilise orjson lorsqu'il est installé (extra ``perf``), sinon le module
+``json`` de la bibliothèque standard, avec la même sortie : clés triées,
+dates au format HTTP comme Flask. Les objets exposant ``__json__`` (modèles)
+peuvent être passés directement à ``jsonify``.
+"""
+
+from typing import Any, Type, cast
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+
+    _ORJSON_DISPONIBLE = True
+except ImportError:  # pragma: no cover - orjson est optionnel (extra "perf")
+    _ORJSON_DISPONIBLE = False
+
+
+def _default(obj: Any) -> Any:
+    """Types non natifs : modèles (``__json__``) puis types gérés par Flask"""
+    serialiser = getattr(obj, "__json__", None)
+    if serialiser is not None:
+        return serialiser()
+    return DefaultJSONProvider.default(obj)
+
+
+class PlanningJSONProvider(DefaultJSONProvider):
+    """Sérialisation rapide avec repli transparent sur la bibliothèque standard"""
+
+    default = staticmethod(_default)
+    ensure_ascii = False  # Même sortie UTF-8 qu'orjson
+
+    def __init__(self, app, fast: bool = True):
+        super().__init__(app)
+        self.fast = fast and _ORJSON_DISPONIBLE
+
+    def _options(self, indent: bool = False) -> int:
+        # Dates passées à _default pour conserver le format HTTP de Flask
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def _dumps_rapide(self, obj: Any, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._options(indent))
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if self.fast and not kwargs:
+            try:
+                return self._dumps_rapide(obj).decode("utf-8")
+            except TypeError:
+                # Valeur hors des limites d'orjson (entier > 64 bits...)
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if not self.fast:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            # Octets envoyés tels quels, sans passage par une chaîne Python
+            corps = self._dumps_rapide(obj, indent) + b"\n"
+        except TypeError:
+            return super().response(*args, **kwargs)
+        # L'application est une Flask (et non l'App « sansio ») : sa classe de
+        # réponse accepte un corps en octets
+        response_class = cast(Type[Response], self._app.response_class)
+        return response_class(corps, mimetype=self.mimetype)
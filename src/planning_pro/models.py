@@ -1,11 +1,374 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-import bcrypt
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple
+import hashlib
+import json
 import secrets
+import threading
+import time
 from flask_login import UserMixin
 
-from .database import db_manager
+from .config import Config
+from .database import FEUILLE_AGGREGATE_COLUMNS, ROW_VERSIONED_TABLES, db_manager
 from .net_salary_calculator import net_salary_calculator
+from .password_hashing import PasswordHashingSaturated, hash_cost, password_hasher
+from .pdf_cache import pdf_cache
+
+# Nombre maximal d'identifiants par clause IN (limite de variables SQLite)
+TAILLE_LOT_SQL = 500
+
+
+def _par_lots(ids: List[int], taille: int = TAILLE_LOT_SQL):
+    """Découpe une liste d'identifiants en lots pour les clauses IN"""
+    for i in range(0, len(ids), taille):
+        yield ids[i : i + taille]
+
+
+def encoder_curseur(annee: int, mois: int) -> str:
+    """Curseur de pagination ``annee-mois`` (unique par utilisateur)"""
+    return f"{annee:04d}-{mois:02d}"
+
+
+def decoder_curseur(curseur: str) -> Tuple[int, int]:
+    """Décode un curseur ``annee-mois``, lève ValueError s'il est invalide
+
+    Le message ne reprend ni le curseur ni l'erreur de conversion : il est
+    renvoyé tel quel au client.
+    """
+    annee_txt, _, mois_txt = curseur.partition("-")
+    try:
+        annee, mois = int(annee_txt), int(mois_txt)
+    except ValueError:
+        raise ValueError("curseur invalide") from None
+    if not 1 <= mois <= 12:
+        raise ValueError("curseur invalide")
+    return annee, mois
+
+
+def _pagination(limit: Optional[int], cursor: Optional[str]) -> tuple:
+    """Clause de pagination par clé (du plus récent au plus ancien)
+
+    Parcourt l'index ``(user_id, annee, mois)`` à partir du curseur : le coût
+    d'une page ne dépend pas de sa position, contrairement à ``OFFSET``.
+    """
+    clause = ""
+    params: List[Any] = []
+    if cursor:
+        clause += " AND (annee, mois) < (?, ?)"
+        params.extend(decoder_curseur(cursor))
+    clause += " ORDER BY annee DESC, mois DESC"
+    if limit is not None:
+        clause += " LIMIT ?"
+        params.append(limit)
+    return clause, tuple(params)
+
+
+def _version_ligne(table: str, row_id: int, user_id: int) -> Optional[str]:
+    """Version d'une ligne de l'utilisateur (None si elle n'existe pas)"""
+    rows = db_manager.execute_query(
+        f"SELECT version FROM {table} WHERE id = ? AND user_id = ?", (row_id, user_id)
+    )
+    return str(rows[0]["version"]) if rows else None
+
+
+def _version_liste(table: str, user_id: int) -> Optional[str]:
+    """Nombre de lignes et version maximale de l'utilisateur (None si aucune)
+
+    Toute création ou modification augmente la version maximale et toute
+    suppression diminue le nombre : la paire change à chaque écriture.
+    """
+    rows = db_manager.execute_query(
+        f"SELECT COUNT(*) AS nombre, MAX(version) AS version FROM {table}"
+        " WHERE user_id = ?",
+        (user_id,),
+    )
+    if not rows[0]["nombre"]:
+        return None
+    return f"{rows[0]['nombre']}-{rows[0]['version']}"
+
+
+def version_courante() -> int:
+    """Dernière valeur de la séquence globale des changements"""
+    return db_manager.execute_query("SELECT version FROM change_sequence")[0]["version"]
+
+
+def _lignes_modifiees(table: str, user_id: int, since: int, limit: int) -> list:
+    """Lignes de l'utilisateur de version > ``since``, par version croissante"""
+    return db_manager.execute_query(
+        f"SELECT * FROM {table} WHERE user_id = ? AND version > ?"
+        " ORDER BY version LIMIT ?",
+        (user_id, since, limit),
+    )
+
+
+def suppressions_depuis(
+    user_id: int, since: int, limit: int, tables: Iterable[str] = ROW_VERSIONED_TABLES
+) -> List[Dict]:
+    """Suppressions (pierres tombales) de l'utilisateur de version > ``since``"""
+    tables = tuple(tables)
+    rows = db_manager.execute_query(
+        f"""SELECT version, table_name, row_id, deleted_at FROM deleted_rows
+            WHERE user_id = ? AND version > ?
+              AND table_name IN ({",".join("?" * len(tables))})
+            ORDER BY version LIMIT ?""",
+        (user_id, since, *tables, limit),
+    )
+    return [
+        {
+            "table": row["table_name"],
+            "id": row["row_id"],
+            "version": row["version"],
+            "deleted_at": row["deleted_at"],
+        }
+        for row in rows
+    ]
+
+
+def _inserer_jours(
+    uow, tables: Dict[str, str], parent_id: int, jours: List[tuple]
+) -> int:
+    """Insère en masse des jours et leurs créneaux dans une transaction
+
+    ``jours`` est une liste de tuples ``(date, [(heure_debut, heure_fin), ...])``.
+    Les jours sont insérés avec ``executemany`` puis leurs IDs relus dans
+    l'ordre d'insertion pour rattacher les créneaux. Retourne le nombre de
+    lignes insérées.
+    """
+    if not jours:
+        return 0
+
+    insertions = uow.executemany(
+        f"INSERT INTO {tables['jours']} ({tables['parent']}, date) VALUES (?, ?)",
+        [(parent_id, date) for date, _ in jours],
+    )
+    jours_ids = [
+        row["id"]
+        for row in uow.query(
+            f"SELECT id FROM {tables['jours']} WHERE {tables['parent']} = ? "
+            f"ORDER BY id DESC LIMIT ?",
+            (parent_id, len(jours)),
+        )
+    ][::-1]
+
+    creneaux = [
+        (jour_id, heure_debut, heure_fin)
+        for jour_id, (_, creneaux_jour) in zip(jours_ids, jours)
+        for heure_debut, heure_fin in creneaux_jour
+    ]
+    if creneaux:
+        insertions += uow.executemany(
+            f"INSERT INTO {tables['creneaux']} ({tables['jour']}, heure_debut, "
+            "heure_fin) VALUES (?, ?, ?)",
+            creneaux,
+        )
+    return insertions
+
+
+def _synchroniser_jours(
+    uow, tables: Dict[str, str], parent_id: int, jours: List[tuple]
+) -> Dict[str, int]:
+    """Écrit uniquement la différence entre les jours en base et ``jours``
+
+    L'état courant est relu dans la transaction, puis les jours sont appariés
+    par date (et rang pour une même date) et leurs créneaux par position :
+    seuls les créneaux modifiés sont mis à jour, les nouveaux insérés et les
+    disparus supprimés. Retourne le nombre de lignes écrites par opération.
+    """
+    rows = uow.query(
+        f"""SELECT j.id AS jour_id, j.date, c.id AS creneau_id,
+                  c.heure_debut, c.heure_fin
+           FROM {tables['jours']} j
+           LEFT JOIN {tables['creneaux']} c ON c.{tables['jour']} = j.id
+           WHERE j.{tables['parent']} = ?
+           ORDER BY j.id, c.id""",
+        (parent_id,),
+    )
+
+    # (date, rang) -> (jour_id, [(creneau_id, heure_debut, heure_fin), ...])
+    existants: Dict[tuple, tuple] = {}
+    rangs: Dict[str, int] = {}
+    jour_courant_id = None
+    creneaux_existants: List[tuple] = []
+    for row in rows:
+        if row["jour_id"] != jour_courant_id:
+            jour_courant_id = row["jour_id"]
+            rang = rangs.get(row["date"], 0)
+            rangs[row["date"]] = rang + 1
+            creneaux_existants = []
+            existants[(row["date"], rang)] = (jour_courant_id, creneaux_existants)
+        if row["creneau_id"] is not None:
+            creneaux_existants.append(
+                (row["creneau_id"], row["heure_debut"], row["heure_fin"])
+            )
+
+    nouveaux_jours = []
+    creneaux_modifies = []
+    creneaux_ajoutes = []
+    creneaux_supprimes = []
+    rangs = {}
+    for date, creneaux in jours:
+        rang = rangs.get(date, 0)
+        rangs[date] = rang + 1
+        existant = existants.pop((date, rang), None)
+        if existant is None:
+            nouveaux_jours.append((date, creneaux))
+            continue
+
+        jour_id, creneaux_existants = existant
+        for (creneau_id, debut, fin), creneau in zip(creneaux_existants, creneaux):
+            if (debut, fin) != tuple(creneau):
+                creneaux_modifies.append((creneau[0], creneau[1], creneau_id))
+        for debut, fin in creneaux[len(creneaux_existants) :]:
+            creneaux_ajoutes.append((jour_id, debut, fin))
+        for creneau_id, _, _ in creneaux_existants[len(creneaux) :]:
+            creneaux_supprimes.append((creneau_id,))
+
+    # Les jours restants n'existent plus dans le modèle
+    jours_supprimes = [(jour_id,) for jour_id, _ in existants.values()]
+
+    stats = {"insertions": 0, "mises_a_jour": 0, "suppressions": 0}
+    if jours_supprimes:
+        stats["suppressions"] += uow.executemany(
+            f"DELETE FROM {tables['creneaux']} WHERE {tables['jour']} = ?",
+            jours_supprimes,
+        )
+        stats["suppressions"] += uow.executemany(
+            f"DELETE FROM {tables['jours']} WHERE id = ?", jours_supprimes
+        )
+    if creneaux_supprimes:
+        stats["suppressions"] += uow.executemany(
+            f"DELETE FROM {tables['creneaux']} WHERE id = ?", creneaux_supprimes
+        )
+    if creneaux_modifies:
+        stats["mises_a_jour"] += uow.executemany(
+            f"UPDATE {tables['creneaux']} SET heure_debut = ?, heure_fin = ? "
+            "WHERE id = ?",
+            creneaux_modifies,
+        )
+    if creneaux_ajoutes:
+        stats["insertions"] += uow.executemany(
+            f"INSERT INTO {tables['creneaux']} ({tables['jour']}, heure_debut, "
+            "heure_fin) VALUES (?, ?, ?)",
+            creneaux_ajoutes,
+        )
+    stats["insertions"] += _inserer_jours(uow, tables, parent_id, nouveaux_jours)
+    return stats
+
+
+TABLES_PLANNING = {
+    "jours": "jours_travail",
+    "parent": "planning_id",
+    "creneaux": "creneaux_travail",
+    "jour": "jour_travail_id",
+}
+
+TABLES_FEUILLE = {
+    "jours": "jours_travailles",
+    "parent": "feuille_heures_id",
+    "creneaux": "creneaux_feuille",
+    "jour": "jour_travaille_id",
+}
+
+# Colonnes d'agrégats des feuilles, dans l'ordre de FeuilleDHeures._agregats()
+COLONNES_AGREGATS = tuple(FEUILLE_AGGREGATE_COLUMNS)
+
+# À incrémenter lorsque le contenu des agrégats persistés change
+FORMAT_AGREGATS = "1"
+
+# Feuilles rechargées par lot lors du recalcul des agrégats
+TAILLE_LOT_AGREGATS = 50
+
+
+def _json_compact(valeur: Any) -> str:
+    """Sérialisation JSON déterministe des agrégats"""
+    return json.dumps(valeur, sort_keys=True, separators=(",", ":"))
+
+
+@lru_cache(maxsize=1)
+def version_regles_salaire() -> str:
+    """Empreinte des règles de calcul (contrats, cotisations, barème d'impôt)
+
+    Les agrégats persistés avec une autre version sont recalculés.
+    L'empreinte porte sur les définitions du code (``SALARY_CONFIG``), pas
+    sur les contrats enregistrés à l'exécution dans un seul worker : tous
+    les workers calculent la même version. Elle est calculée une seule fois.
+    """
+    from .salary_calculator import SALARY_CONFIG
+
+    regles = [
+        FORMAT_AGREGATS,
+        SALARY_CONFIG,
+        net_salary_calculator.cotisations_salarie,
+        net_salary_calculator.tranches_impot,
+    ]
+    payload = json.dumps(regles, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class IdentityCache:
+    """Cache LRU à durée de vie courte, indexé par identifiant
+
+    Local à chaque processus : les autres workers gunicorn voient une
+    modification au plus ``ttl`` secondes plus tard.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+
+# Cache des utilisateurs chargés à chaque requête par Flask-Login
+user_cache = IdentityCache(maxsize=Config.USER_CACHE_SIZE, ttl=Config.USER_CACHE_TTL)
 
 
 class User(UserMixin):
@@ -30,16 +393,46 @@ class User(UserMixin):
         self.reset_token_expiry: Optional[str] = None
 
     def _hash_password(self, password: str) -> str:
-        """Hache le mot de passe avec bcrypt"""
-        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        """Hache le mot de passe avec bcrypt (pool de hachage borné)"""
+        return password_hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
-        """Vérifie si le mot de passe est correct"""
+        """Vérifie si le mot de passe est correct
+
+        Après une vérification réussie, un hachage calculé avec un autre coût
+        que ``BCRYPT_ROUNDS`` est recalculé et enregistré : le coût peut être
+        ajusté sans réinitialiser les mots de passe.
+        """
         if not self.password_hash:
             return False
-        return bcrypt.checkpw(
-            password.encode("utf-8"), self.password_hash.encode("utf-8")
+        if not password_hasher.check(password, self.password_hash):
+            return False
+        if self.id and password_hasher.needs_rehash(self.password_hash):
+            self._rehash_password(password)
+        return True
+
+    def _rehash_password(self, password: str) -> None:
+        """Recalcule le hachage au coût cible (au mieux, sans bloquer la connexion)"""
+        try:
+            nouveau_hash = self._hash_password(password)
+        except PasswordHashingSaturated:
+            # Pool saturé : le recalcul aura lieu à une prochaine connexion
+            return
+        db_manager.execute_update(
+            "UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?",
+            (nouveau_hash, self.id, self.password_hash),
         )
+        self.password_hash = nouveau_hash
+        user_cache.invalidate(self.id)
+
+    @staticmethod
+    def password_cost_distribution() -> Dict[Optional[int], int]:
+        """Nombre d'utilisateurs par coût bcrypt (None : hachage non reconnu)"""
+        distribution: Dict[Optional[int], int] = {}
+        for row in db_manager.execute_query("SELECT password_hash FROM users"):
+            cost = hash_cost(row["password_hash"])
+            distribution[cost] = distribution.get(cost, 0) + 1
+        return distribution
 
     def get_id(self):
         """Requis par Flask-Login"""
@@ -63,6 +456,7 @@ class User(UserMixin):
                     self.id,
                 ),
             )
+            user_cache.invalidate(self.id)
         else:
             # Création
             self.id = db_manager.execute_insert(
@@ -111,6 +505,25 @@ class User(UserMixin):
             return cls.from_row(rows[0])
         return None
 
+    @classmethod
+    def get_cached(cls, user_id: int) -> Optional["User"]:
+        """Trouve un utilisateur par ID en passant par le cache d'identité
+
+        Le cache conserve la ligne de base de données : chaque appel retourne
+        un nouvel objet, les modifications non sauvegardées ne fuient pas
+        d'une requête à l'autre.
+        """
+        row = user_cache.get(user_id)
+        if row is None:
+            rows = db_manager.execute_query(
+                "SELECT * FROM users WHERE id = ?", (user_id,)
+            )
+            if not rows:
+                return None
+            row = dict(rows[0])
+            user_cache.set(user_id, row)
+        return cls.from_row(row)
+
     @classmethod
     def from_row(cls, row) -> "User":
         """Crée un utilisateur à partir d'une ligne de base de données"""
@@ -176,24 +589,73 @@ class User(UserMixin):
         return f"<User {self.email}>"
 
 
+MINUTES_PAR_JOUR = 24 * 60
+
+
+def minutes_depuis_minuit(heure: str) -> int:
+    """Convertit une heure "HH:MM" en minutes depuis minuit"""
+    heures, separateur, minutes = heure.partition(":")
+    if (
+        separateur
+        and heures.isascii()
+        and heures.isdigit()
+        and minutes.isascii()
+        and minutes.isdigit()
+        and len(heures) <= 2
+        and len(minutes) <= 2
+    ):
+        h, m = int(heures), int(minutes)
+        if h < 24 and m < 60:
+            return h * 60 + m
+    raise ValueError(f"Heure invalide: {heure}")
+
+
 class CreneauTravail:
-    """Créneau de travail avec heures de début et fin"""
+    """Créneau de travail avec heures de début et fin
+
+    Les heures sont converties une seule fois en minutes depuis minuit, la
+    durée est ensuite calculée en arithmétique entière.
+    """
+
+    __slots__ = ("_heure_debut", "_heure_fin", "debut_minutes", "fin_minutes")
 
     def __init__(self, heure_debut: str, heure_fin: str):
         self.heure_debut = heure_debut
         self.heure_fin = heure_fin
 
-    def calculer_heures(self, date: str) -> float:
-        """Calcule le nombre d'heures pour ce créneau"""
-        debut = datetime.strptime(f"{date} {self.heure_debut}", "%Y-%m-%d %H:%M")
-        fin = datetime.strptime(f"{date} {self.heure_fin}", "%Y-%m-%d %H:%M")
+    @property
+    def heure_debut(self) -> str:
+        return self._heure_debut
+
+    @heure_debut.setter
+    def heure_debut(self, valeur: str):
+        self.debut_minutes = minutes_depuis_minuit(valeur)
+        self._heure_debut = valeur
 
+    @property
+    def heure_fin(self) -> str:
+        return self._heure_fin
+
+    @heure_fin.setter
+    def heure_fin(self, valeur: str):
+        self.fin_minutes = minutes_depuis_minuit(valeur)
+        self._heure_fin = valeur
+
+    def duree_minutes(self) -> int:
+        """Calcule la durée du créneau en minutes"""
+        fin = self.fin_minutes
         # Gérer le cas où le créneau se termine le lendemain (ex: 23:00 - 02:00)
-        if fin <= debut:
-            fin += timedelta(days=1)
+        if fin <= self.debut_minutes:
+            fin += MINUTES_PAR_JOUR
+        return fin - self.debut_minutes
+
+    def calculer_heures(self, date: Optional[str] = None) -> float:
+        """Calcule le nombre d'heures pour ce créneau
 
-        duree = fin - debut
-        return max(0, duree.total_seconds() / 3600)
+        ``date`` n'intervient plus dans le calcul et reste accepté pour
+        compatibilité.
+        """
+        return self.duree_minutes() / 60
 
     def to_dict(self) -> Dict:
         return {"heure_debut": self.heure_debut, "heure_fin": self.heure_fin}
@@ -202,6 +664,8 @@ class CreneauTravail:
 class JourTravaille:
     """Jour de travail avec créneaux horaires"""
 
+    __slots__ = ("date", "creneaux")
+
     def __init__(self, date: str, creneaux: Optional[List[CreneauTravail]] = None):
         self.date = date
         self.creneaux = creneaux if creneaux else []
@@ -210,24 +674,40 @@ class JourTravaille:
         """Ajoute un créneau de travail à la journée"""
         self.creneaux.append(CreneauTravail(heure_debut, heure_fin))
 
+    def duree_minutes(self) -> int:
+        """Calcule le nombre total de minutes travaillées dans la journée"""
+        return sum(creneau.duree_minutes() for creneau in self.creneaux)
+
     def calculer_heures(self) -> float:
         """Calcule le nombre total d'heures travaillées dans la journée"""
-        total = 0.0
-        for creneau in self.creneaux:
-            total += creneau.calculer_heures(self.date)
-        return total
+        return self.duree_minutes() / 60
 
-    def to_dict(self) -> Dict:
+    def to_dict(self, minutes: Optional[int] = None) -> Dict:
+        """Sérialise le jour ; ``minutes`` évite de recalculer la durée"""
+        if minutes is None:
+            minutes = self.duree_minutes()
         return {
             "date": self.date,
             "creneaux": [creneau.to_dict() for creneau in self.creneaux],
-            "heures": self.calculer_heures(),
+            "heures": minutes / 60,
         }
 
 
 class Planning:
     """Planning de travail avec stockage SQLite"""
 
+    # Champs de la vue résumée des listes (``?view=summary``)
+    CHAMPS_RESUME = (
+        "id",
+        "version",
+        "mois",
+        "annee",
+        "taux_horaire",
+        "heures_contractuelles",
+        "nb_jours",
+        "nb_creneaux",
+    )
+
     def __init__(
         self,
         mois: int,
@@ -246,54 +726,73 @@ class Planning:
         self.user_id = user_id
         self.heures_contractuelles = heures_contractuelles
         self.created_at = datetime.now().isoformat()
+        # Version de ligne et date de modification (attribuées par la base)
+        self.version = 0
+        self.updated_at: Optional[str] = None
+        # En-tête tel qu'en base (None tant que l'objet n'a pas été chargé)
+        self._entete_persiste: Optional[tuple] = None
+        self.statistiques_sauvegarde: Dict[str, int] = {}
+
+    def _entete(self) -> tuple:
+        """Valeurs d'en-tête persistées dans la table plannings"""
+        return (self.mois, self.annee, self.taux_horaire, self.heures_contractuelles)
 
     def save(self):
-        """Sauvegarde le planning en base de données"""
-        if self.id:
-            # Mise à jour
-            db_manager.execute_update(
-                """UPDATE plannings SET mois = ?, annee = ?, taux_horaire = ?, 
-                   heures_contractuelles = ? WHERE id = ?""",
-                (
-                    self.mois,
-                    self.annee,
-                    self.taux_horaire,
-                    self.heures_contractuelles,
-                    self.id,
-                ),
-            )
-            # Supprimer les anciens jours de travail
-            db_manager.execute_delete(
-                "DELETE FROM jours_travail WHERE planning_id = ?", (self.id,)
-            )
-        else:
-            # Création
-            self.id = db_manager.execute_insert(
-                """INSERT INTO plannings (mois, annee, taux_horaire, user_id, 
-                   heures_contractuelles, created_at) VALUES (?, ?, ?, ?, ?, ?)""",
-                (
-                    self.mois,
-                    self.annee,
-                    self.taux_horaire,
-                    self.user_id,
-                    self.heures_contractuelles,
-                    self.created_at,
-                ),
+        """Sauvegarde le planning en base de données (une seule transaction)
+
+        Seules les lignes modifiées depuis l'état en base sont écrites ; le
+        détail est disponible dans ``statistiques_sauvegarde``.
+        """
+        jours = [
+            (
+                jour["date"],
+                [
+                    (creneau["heure_debut"], creneau["heure_fin"])
+                    for creneau in jour.get("creneaux", [])
+                ],
             )
+            for jour in self.jours_travail
+        ]
+
+        with db_manager.transaction() as uow:
+            # Version de la ligne attribuée une seule fois au commit, quel que
+            # soit le nombre de jours et créneaux écrits
+            uow.pause_version_triggers()
+            if self.id:
+                # Mise à jour de l'en-tête uniquement s'il a changé
+                if self._entete() != self._entete_persiste:
+                    uow.execute(
+                        """UPDATE plannings SET mois = ?, annee = ?, taux_horaire = ?, 
+                           heures_contractuelles = ? WHERE id = ?""",
+                        self._entete() + (self.id,),
+                    )
+            else:
+                # Création
+                self.id = uow.insert(
+                    """INSERT INTO plannings (mois, annee, taux_horaire, user_id, 
+                       heures_contractuelles, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (
+                        self.mois,
+                        self.annee,
+                        self.taux_horaire,
+                        self.user_id,
+                        self.heures_contractuelles,
+                        self.created_at,
+                    ),
+                )
 
-        # Sauvegarder les jours de travail
-        for jour in self.jours_travail:
-            jour_id = db_manager.execute_insert(
-                "INSERT INTO jours_travail (planning_id, date) VALUES (?, ?)",
-                (self.id, jour["date"]),
-            )
+            # Sauvegarder la différence sur les jours de travail et créneaux
+            stats = _synchroniser_jours(uow, TABLES_PLANNING, self.id, jours)
+            if uow.rows_written:
+                uow.track_version("plannings", self.id)
 
-            # Sauvegarder les créneaux
-            for creneau in jour.get("creneaux", []):
-                db_manager.execute_insert(
-                    "INSERT INTO creneaux_travail (jour_travail_id, heure_debut, heure_fin) VALUES (?, ?, ?)",
-                    (jour_id, creneau["heure_debut"], creneau["heure_fin"]),
-                )
+        self.version, self.updated_at = uow.row_versions.get(
+            ("plannings", self.id), (self.version, self.updated_at)
+        )
+        stats["lignes_ecrites"] = uow.rows_written
+        self.statistiques_sauvegarde = stats
+        self._entete_persiste = self._entete()
 
     def to_dict(self) -> Dict:
         return {
@@ -305,6 +804,27 @@ class Planning:
             "user_id": self.user_id,
             "heures_contractuelles": self.heures_contractuelles,
             "created_at": self.created_at,
+            "version": self.version,
+            "updated_at": self.updated_at,
+        }
+
+    def __json__(self) -> Dict:
+        """Sérialisation directe par le fournisseur JSON de l'application"""
+        return self.to_dict()
+
+    def to_summary(self) -> Dict:
+        """Vue résumée : en-tête et nombre de jours et de créneaux"""
+        return {
+            "id": self.id,
+            "version": self.version,
+            "mois": self.mois,
+            "annee": self.annee,
+            "taux_horaire": self.taux_horaire,
+            "heures_contractuelles": self.heures_contractuelles,
+            "nb_jours": len(self.jours_travail),
+            "nb_creneaux": sum(
+                len(jour.get("creneaux", [])) for jour in self.jours_travail
+            ),
         }
 
     @classmethod
@@ -313,16 +833,46 @@ class Planning:
         rows = db_manager.execute_query(
             "SELECT * FROM plannings ORDER BY annee DESC, mois DESC"
         )
-        return [cls.from_row(row) for row in rows]
+        return cls.from_rows(rows)
 
     @classmethod
-    def get_by_user(cls, user_id: int) -> List["Planning"]:
-        """Récupère tous les plannings d'un utilisateur"""
+    def get_by_user(
+        cls, user_id: int, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> List["Planning"]:
+        """Récupère les plannings d'un utilisateur, du plus récent au plus ancien
+
+        Args:
+            limit: Nombre maximal de plannings (tous si None)
+            cursor: Curseur ``annee-mois`` du dernier planning déjà reçu
+        """
+        clause, params = _pagination(limit, cursor)
         rows = db_manager.execute_query(
-            "SELECT * FROM plannings WHERE user_id = ? ORDER BY annee DESC, mois DESC",
-            (user_id,),
+            f"SELECT * FROM plannings WHERE user_id = ?{clause}", (user_id, *params)
         )
-        return [cls.from_row(row) for row in rows]
+        return cls.from_rows(rows)
+
+    @classmethod
+    def fingerprint(cls, planning_id: int, user_id: int) -> Optional[str]:
+        """Empreinte d'un planning de l'utilisateur (None s'il n'existe pas)"""
+        return _version_ligne("plannings", planning_id, user_id)
+
+    @classmethod
+    def fingerprint_by_user(cls, user_id: int) -> Optional[str]:
+        """Empreinte de tous les plannings d'un utilisateur (None s'il n'en a pas)"""
+        return _version_liste("plannings", user_id)
+
+    @classmethod
+    def changed_since(cls, user_id: int, since: int, limit: int) -> List["Planning"]:
+        """Plannings modifiés après la version ``since``, au plus ``limit``"""
+        return cls.from_rows(_lignes_modifiees("plannings", user_id, since, limit))
+
+    @classmethod
+    def count_by_user(cls, user_id: int) -> int:
+        """Nombre de plannings d'un utilisateur (sans chargement des jours)"""
+        rows = db_manager.execute_query(
+            "SELECT COUNT(*) AS total FROM plannings WHERE user_id = ?", (user_id,)
+        )
+        return rows[0]["total"]
 
     @classmethod
     def get_by_id(cls, planning_id: int) -> Optional["Planning"]:
@@ -337,38 +887,66 @@ class Planning:
     @classmethod
     def from_row(cls, row) -> "Planning":
         """Crée un planning à partir d'une ligne de base de données"""
-        # Récupérer les jours de travail
-        jours_rows = db_manager.execute_query(
-            "SELECT * FROM jours_travail WHERE planning_id = ?", (row["id"],)
-        )
+        return cls.from_rows([row])[0]
 
-        jours_travail = []
-        for jour_row in jours_rows:
-            # Récupérer les créneaux pour ce jour
-            creneaux_rows = db_manager.execute_query(
-                "SELECT * FROM creneaux_travail WHERE jour_travail_id = ?",
-                (jour_row["id"],),
+    @classmethod
+    def from_rows(cls, rows) -> List["Planning"]:
+        """Crée des plannings à partir de lignes de base de données
+
+        Les jours et créneaux de tous les plannings sont chargés par lots
+        avec une seule requête JOIN par lot, au lieu d'une requête par jour.
+        Les jours sont triés par date (puis ordre d'insertion) : la sauvegarde
+        différentielle ajoute les nouveaux jours en fin de table, l'ordre
+        d'insertion ne reflète donc plus l'ordre de saisie.
+        """
+        ids = [row["id"] for row in rows]
+        jours_par_planning: Dict[int, List[Dict]] = {
+            planning_id: [] for planning_id in ids
+        }
+
+        for lot in _par_lots(ids):
+            placeholders = ",".join("?" * len(lot))
+            jours_rows = db_manager.execute_query(
+                f"""SELECT j.id AS jour_id, j.planning_id, j.date,
+                          c.heure_debut, c.heure_fin
+                   FROM jours_travail j
+                   LEFT JOIN creneaux_travail c ON c.jour_travail_id = j.id
+                   WHERE j.planning_id IN ({placeholders})
+                   ORDER BY j.planning_id, j.date, j.id, c.id""",
+                tuple(lot),
             )
 
-            creneaux = [
-                {
-                    "heure_debut": creneau["heure_debut"],
-                    "heure_fin": creneau["heure_fin"],
-                }
-                for creneau in creneaux_rows
-            ]
-
-            jours_travail.append({"date": jour_row["date"], "creneaux": creneaux})
-
-        return cls(
-            id=row["id"],
-            mois=row["mois"],
-            annee=row["annee"],
-            jours_travail=jours_travail,
-            taux_horaire=row["taux_horaire"],
-            user_id=row["user_id"],
-            heures_contractuelles=row["heures_contractuelles"],
-        )
+            jour_courant_id = None
+            jour: Dict = {}
+            for jour_row in jours_rows:
+                if jour_row["jour_id"] != jour_courant_id:
+                    jour_courant_id = jour_row["jour_id"]
+                    jour = {"date": jour_row["date"], "creneaux": []}
+                    jours_par_planning[jour_row["planning_id"]].append(jour)
+
+                if jour_row["heure_debut"] is not None:
+                    jour["creneaux"].append(
+                        {
+                            "heure_debut": jour_row["heure_debut"],
+                            "heure_fin": jour_row["heure_fin"],
+                        }
+                    )
+
+        plannings = []
+        for row in rows:
+            planning = cls(
+                id=row["id"],
+                mois=row["mois"],
+                annee=row["annee"],
+                jours_travail=jours_par_planning[row["id"]],
+                taux_horaire=row["taux_horaire"],
+                user_id=row["user_id"],
+                heures_contractuelles=row["heures_contractuelles"],
+            )
+            planning._entete_persiste = planning._entete()
+            planning.version, planning.updated_at = row["version"], row["updated_at"]
+            plannings.append(planning)
+        return plannings
 
     def to_feuille_heures(self) -> "FeuilleDHeures":
         """Convertit le planning en feuille d'heures"""
@@ -411,6 +989,19 @@ class Planning:
 class FeuilleDHeures:
     """Feuille d'heures avec stockage SQLite"""
 
+    # Champs de la vue résumée des listes (``?view=summary``)
+    CHAMPS_RESUME = (
+        "id",
+        "version",
+        "mois",
+        "annee",
+        "taux_horaire",
+        "heures_contractuelles",
+        "total_heures",
+        "salaire_brut_total",
+        "salaire_net",
+    )
+
     def __init__(
         self,
         mois: int,
@@ -429,10 +1020,48 @@ class FeuilleDHeures:
         self.user_id = user_id
         self.heures_contractuelles = heures_contractuelles
         self.created_at = datetime.now().isoformat()
+        # Version de ligne et date de modification (attribuées par la base)
+        self.version = 0
+        self.updated_at: Optional[str] = None
+        # Valeurs dérivées mises en cache (voir _derives)
+        self._cache_derives: Optional[Dict] = None
+        self._agregats_persistes: Optional[tuple] = None
+        # En-tête tel qu'en base (None tant que l'objet n'a pas été chargé)
+        self._entete_persiste: Optional[tuple] = None
+        self.statistiques_sauvegarde: Dict[str, int] = {}
+
+    def _derives(self) -> Dict:
+        """Retourne les valeurs dérivées de la feuille, calculées une seule fois
+
+        La clé du cache reprend le taux, le contrat, les dates et les minutes
+        de chaque jour (arithmétique entière) : toute modification des jours,
+        des créneaux ou des paramètres invalide le cache. Le salaire et le net
+        sont calculés à la première demande puis conservés.
+        """
+        minutes_par_jour = tuple(jour.duree_minutes() for jour in self.jours_travailles)
+        cle = (
+            self.taux_horaire,
+            self.heures_contractuelles,
+            tuple(jour.date for jour in self.jours_travailles),
+            minutes_par_jour,
+        )
+
+        cache = self._cache_derives
+        if cache is None or cache["cle"] != cle:
+            cache = {
+                "cle": cle,
+                "minutes_par_jour": minutes_par_jour,
+                "total_heures": sum(minutes_par_jour) / 60,
+                "semaines": self._calculer_semaines(minutes_par_jour),
+                "salaire": None,
+                "salaire_net": None,
+            }
+            self._cache_derives = cache
+        return cache
 
     def calculer_total_heures(self) -> float:
         """Calcule le total des heures travaillées"""
-        return sum(jour.calculer_heures() for jour in self.jours_travailles)
+        return self._derives()["total_heures"]
 
     def calculer_heures_supplementaires(self) -> Dict:
         """Calcule les heures supplémentaires (méthode legacy)"""
@@ -450,17 +1079,37 @@ class FeuilleDHeures:
         }
 
     def calculer_salaire(self) -> Dict:
-        """Calcule le salaire brut estimé avec le système hebdomadaire correct"""
-        from .salary_calculator import salary_calculator
+        """Calcule le salaire brut estimé avec le système hebdomadaire correct
+
+        Le résultat est mis en cache : il ne doit pas être modifié.
+        """
+        derives = self._derives()
+        if derives["salaire"] is None:
+            derives["salaire"] = self._calculer_salaire(
+                derives["semaines"], derives["total_heures"]
+            )
+        return derives["salaire"]
+
+    def calculer_salaire_net(self) -> Dict:
+        """Calcule le salaire net estimé (mis en cache avec le salaire brut)"""
+        derives = self._derives()
+        if derives["salaire_net"] is None:
+            derives["salaire_net"] = net_salary_calculator.calculer_salaire_net(
+                self.calculer_salaire()["salaire_brut_total"]
+            )
+        return derives["salaire_net"]
 
-        # Calculer le salaire semaine par semaine
-        semaines_heures = self._regrouper_par_semaine()
+    def _calculer_salaire(
+        self, semaines_heures: List[float], total_heures: float
+    ) -> Dict:
+        """Calcule le salaire semaine par semaine"""
+        from .salary_calculator import salary_calculator
 
         # Initialiser les totaux
         result = {
             "contrat": f"{self.heures_contractuelles}h",
             "heures_contractuelles": self.heures_contractuelles,
-            "total_heures": self.calculer_total_heures(),
+            "total_heures": total_heures,
             "taux_horaire": self.taux_horaire,
             "heures_normales": 0,
             "heures_complementaires": 0,
@@ -542,20 +1191,22 @@ class FeuilleDHeures:
 
     def _regrouper_par_semaine(self) -> List[float]:
         """Regroupe les jours travaillés par semaine (lundi à dimanche)"""
+        return self._derives()["semaines"]
+
+    def _calculer_semaines(self, minutes_par_jour: tuple) -> List[float]:
+        """Calcule les heures par semaine à partir des minutes de chaque jour"""
         from datetime import datetime, timedelta
 
         if not self.jours_travailles:
             return []
 
-        # Créer un dictionnaire des heures par date
-        heures_par_date = {}
-        for jour in self.jours_travailles:
-            date_str = jour.date
-            heures = jour.calculer_heures()
-            heures_par_date[date_str] = heures
+        # Créer un dictionnaire des minutes par date
+        minutes_par_date = {}
+        for jour, minutes in zip(self.jours_travailles, minutes_par_jour):
+            minutes_par_date[jour.date] = minutes
 
         # Trouver la première et dernière date
-        dates = sorted(heures_par_date.keys())
+        dates = sorted(minutes_par_date.keys())
         if not dates:
             return []
 
@@ -571,110 +1222,389 @@ class FeuilleDHeures:
         date_courante = debut_semaine
 
         while date_courante <= derniere_date:
-            heures_semaine: float = 0.0
+            minutes_semaine = 0
 
-            # Calculer les heures pour les 7 jours de la semaine
+            # Calculer les minutes pour les 7 jours de la semaine
             for jour_num in range(7):
                 date_jour = date_courante + timedelta(days=jour_num)
                 date_str = date_jour.strftime("%Y-%m-%d")
 
-                if date_str in heures_par_date:
-                    heures_semaine += heures_par_date[date_str]
+                if date_str in minutes_par_date:
+                    minutes_semaine += minutes_par_date[date_str]
 
-            if heures_semaine > 0:  # Ne garder que les semaines avec des heures
-                semaines_heures.append(heures_semaine)
+            if minutes_semaine > 0:  # Ne garder que les semaines avec des heures
+                semaines_heures.append(minutes_semaine / 60)
 
             # Passer à la semaine suivante
             date_courante += timedelta(days=7)
 
         return semaines_heures
 
-    def save(self):
-        """Sauvegarde la feuille d'heures en base de données"""
-        if self.id:
-            # Mise à jour
-            db_manager.execute_update(
-                """UPDATE feuilles_heures SET mois = ?, annee = ?, taux_horaire = ?, 
-                   heures_contractuelles = ? WHERE id = ?""",
-                (
-                    self.mois,
-                    self.annee,
-                    self.taux_horaire,
-                    self.heures_contractuelles,
-                    self.id,
-                ),
-            )
-            # Supprimer les anciens jours travaillés
-            db_manager.execute_delete(
-                "DELETE FROM jours_travailles WHERE feuille_heures_id = ?", (self.id,)
+    def _entete(self) -> tuple:
+        """Valeurs d'en-tête persistées dans la table feuilles_heures"""
+        return (self.mois, self.annee, self.taux_horaire, self.heures_contractuelles)
+
+    def _agregats(self) -> tuple:
+        """Valeurs des colonnes d'agrégats, dans l'ordre de COLONNES_AGREGATS"""
+        salaire = self.calculer_salaire()
+
+        # Heures supplémentaires du mois cumulées par taux de majoration
+        supplementaires: Dict[str, float] = {}
+        for sup in salaire["heures_supplementaires"]:
+            majoration = str(sup["majoration"])
+            supplementaires[majoration] = (
+                supplementaires.get(majoration, 0) + sup["heures"]
             )
-        else:
-            # Création
-            self.id = db_manager.execute_insert(
-                """INSERT INTO feuilles_heures (mois, annee, taux_horaire, user_id, 
-                   heures_contractuelles, created_at) VALUES (?, ?, ?, ?, ?, ?)""",
-                (
-                    self.mois,
-                    self.annee,
-                    self.taux_horaire,
-                    self.user_id,
-                    self.heures_contractuelles,
-                    self.created_at,
-                ),
+
+        tranches = {
+            "normales": salaire["heures_normales"],
+            "complementaires": salaire["heures_complementaires"],
+            "complementaires_majorees": salaire["heures_complementaires_majorees"],
+            "supplementaires": supplementaires,
+        }
+        return (
+            self.calculer_total_heures(),
+            _json_compact(self._derives()["semaines"]),
+            salaire["salaire_brut_total"],
+            self.calculer_salaire_net()["salaire_net_final"],
+            _json_compact(tranches),
+            version_regles_salaire(),
+        )
+
+    def _ecrire_agregats(self, uow, agregats: tuple) -> None:
+        """Met à jour les colonnes d'agrégats si elles ont changé
+
+        Si les montants eux-mêmes changent (et pas seulement la version des
+        règles), la feuille reçoit une nouvelle version au commit pour que
+        /api/sync transmette les totaux corrigés.
+        """
+        if agregats == self._agregats_persistes:
+            return
+        affectations = ", ".join(f"{colonne} = ?" for colonne in COLONNES_AGREGATS)
+        uow.execute(
+            f"UPDATE feuilles_heures SET {affectations} WHERE id = ?",
+            agregats + (self.id,),
+        )
+        # Le dernier agrégat est la version des règles de calcul
+        if self._agregats_persistes is None or (
+            agregats[:-1] != self._agregats_persistes[:-1]
+        ):
+            uow.track_version("feuilles_heures", self.id)
+
+    def _reprendre_version(self, uow) -> None:
+        """Reprend la version attribuée à la feuille au commit de ``uow``"""
+        self.version, self.updated_at = uow.row_versions.get(
+            ("feuilles_heures", self.id), (self.version, self.updated_at)
+        )
+
+    def save(self):
+        """Sauvegarde la feuille d'heures en base de données (une seule transaction)
+
+        Seules les lignes modifiées depuis l'état en base sont écrites ; le
+        détail est disponible dans ``statistiques_sauvegarde``. Les agrégats
+        (heures, salaires) sont recalculés et persistés avec la feuille.
+        """
+        jours = [
+            (
+                jour.date,
+                [(creneau.heure_debut, creneau.heure_fin) for creneau in jour.creneaux],
             )
+            for jour in self.jours_travailles
+        ]
+        agregats = self._agregats()
+
+        with db_manager.transaction() as uow:
+            # Version de la ligne attribuée une seule fois au commit, quel que
+            # soit le nombre de jours et créneaux écrits
+            uow.pause_version_triggers()
+            if self.id:
+                # Mise à jour de l'en-tête uniquement s'il a changé
+                if self._entete() != self._entete_persiste:
+                    uow.execute(
+                        """UPDATE feuilles_heures SET mois = ?, annee = ?, taux_horaire = ?, 
+                           heures_contractuelles = ? WHERE id = ?""",
+                        self._entete() + (self.id,),
+                    )
+            else:
+                # Création
+                self.id = uow.insert(
+                    """INSERT INTO feuilles_heures (mois, annee, taux_horaire, user_id, 
+                       heures_contractuelles, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (
+                        self.mois,
+                        self.annee,
+                        self.taux_horaire,
+                        self.user_id,
+                        self.heures_contractuelles,
+                        self.created_at,
+                    ),
+                )
 
-        # Sauvegarder les jours travaillés
-        for jour in self.jours_travailles:
-            jour_id = db_manager.execute_insert(
-                "INSERT INTO jours_travailles (feuille_heures_id, date) VALUES (?, ?)",
-                (self.id, jour.date),
+            # Sauvegarder la différence sur les jours travaillés et créneaux
+            stats = _synchroniser_jours(uow, TABLES_FEUILLE, self.id, jours)
+            self._ecrire_agregats(uow, agregats)
+            if uow.rows_written:
+                uow.track_version("feuilles_heures", self.id)
+
+        self._reprendre_version(uow)
+        stats["lignes_ecrites"] = uow.rows_written
+        self.statistiques_sauvegarde = stats
+        self._entete_persiste = self._entete()
+        self._agregats_persistes = agregats
+        if uow.rows_written:
+            pdf_cache.invalidate(self.id)
+
+    def delete(self):
+        """Supprime la feuille d'heures, ses jours et ses créneaux"""
+        if not self.id:
+            return
+
+        with db_manager.transaction() as uow:
+            # La feuille est supprimée : inutile de versionner ses jours
+            uow.pause_version_triggers()
+            uow.execute(
+                """DELETE FROM creneaux_feuille WHERE jour_travaille_id IN
+                   (SELECT id FROM jours_travailles WHERE feuille_heures_id = ?)""",
+                (self.id,),
+            )
+            uow.execute(
+                "DELETE FROM jours_travailles WHERE feuille_heures_id = ?", (self.id,)
             )
+            uow.execute("DELETE FROM feuilles_heures WHERE id = ?", (self.id,))
 
-            # Sauvegarder les créneaux
-            for creneau in jour.creneaux:
-                db_manager.execute_insert(
-                    "INSERT INTO creneaux_feuille (jour_travaille_id, heure_debut, heure_fin) VALUES (?, ?, ?)",
-                    (jour_id, creneau.heure_debut, creneau.heure_fin),
-                )
+        pdf_cache.invalidate(self.id)
+        self.id = None
+        self._entete_persiste = None
+        self._agregats_persistes = None
 
     def to_dict(self) -> Dict:
+        derives = self._derives()
         calcul_salaire = self.calculer_salaire()
 
         # Calcul du salaire net
-        salaire_net_info = net_salary_calculator.calculer_salaire_net(
-            calcul_salaire["salaire_brut_total"]
-        )
+        salaire_net_info = self.calculer_salaire_net()
 
         return {
             "id": self.id,
             "mois": self.mois,
             "annee": self.annee,
-            "jours_travailles": [jour.to_dict() for jour in self.jours_travailles],
+            "jours_travailles": [
+                jour.to_dict(minutes)
+                for jour, minutes in zip(
+                    self.jours_travailles, derives["minutes_par_jour"]
+                )
+            ],
             "taux_horaire": self.taux_horaire,
             "user_id": self.user_id,
             "heures_contractuelles": self.heures_contractuelles,
             "created_at": self.created_at,
-            "total_heures": self.calculer_total_heures(),
+            "version": self.version,
+            "updated_at": self.updated_at,
+            "total_heures": derives["total_heures"],
             "calcul_salaire": calcul_salaire,
             "salaire_net": salaire_net_info,
         }
 
+    def __json__(self) -> Dict:
+        """Sérialisation directe par le fournisseur JSON de l'application"""
+        return self.to_dict()
+
+    def to_summary(self) -> Dict:
+        """Vue résumée : en-tête, total d'heures, salaires brut et net"""
+        return {
+            "id": self.id,
+            "version": self.version,
+            "mois": self.mois,
+            "annee": self.annee,
+            "taux_horaire": self.taux_horaire,
+            "heures_contractuelles": self.heures_contractuelles,
+            "total_heures": self.calculer_total_heures(),
+            "salaire_brut_total": self.calculer_salaire()["salaire_brut_total"],
+            "salaire_net": self.calculer_salaire_net()["salaire_net_final"],
+        }
+
     @classmethod
     def get_all(cls) -> List["FeuilleDHeures"]:
         """Récupère toutes les feuilles d'heures"""
         rows = db_manager.execute_query(
             "SELECT * FROM feuilles_heures ORDER BY annee DESC, mois DESC"
         )
-        return [cls.from_row(row) for row in rows]
+        return cls.from_rows(rows)
+
+    @classmethod
+    def get_by_user(
+        cls, user_id: int, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> List["FeuilleDHeures"]:
+        """Récupère les feuilles d'heures d'un utilisateur, plus récentes d'abord
+
+        Args:
+            limit: Nombre maximal de feuilles (toutes si None)
+            cursor: Curseur ``annee-mois`` de la dernière feuille déjà reçue
+        """
+        clause, params = _pagination(limit, cursor)
+        rows = db_manager.execute_query(
+            f"SELECT * FROM feuilles_heures WHERE user_id = ?{clause}",
+            (user_id, *params),
+        )
+        return cls.from_rows(rows)
+
+    @staticmethod
+    def _clause_selection(
+        user_id: int, annee: Optional[int], ids: Iterable[int]
+    ) -> Tuple[str, List[Any]]:
+        """Clause WHERE des feuilles d'un utilisateur, par année et/ou par IDs"""
+        clauses: List[str] = ["user_id = ?"]
+        params: List[Any] = [user_id]
+        if annee:
+            clauses.append("annee = ?")
+            params.append(annee)
+        ids = list(ids)
+        if ids:
+            clauses.append(f"id IN ({','.join('?' * len(ids))})")
+            params.extend(ids)
+        return " AND ".join(clauses), params
 
     @classmethod
-    def get_by_user(cls, user_id: int) -> List["FeuilleDHeures"]:
-        """Récupère toutes les feuilles d'heures d'un utilisateur"""
+    def count_selection(
+        cls, user_id: int, annee: Optional[int] = None, ids: Iterable[int] = ()
+    ) -> int:
+        """Nombre de feuilles d'un utilisateur pour une année et/ou des IDs"""
+        clause, params = cls._clause_selection(user_id, annee, ids)
         rows = db_manager.execute_query(
-            "SELECT * FROM feuilles_heures WHERE user_id = ? ORDER BY annee DESC, mois DESC",
+            f"SELECT COUNT(*) FROM feuilles_heures WHERE {clause}", tuple(params)
+        )
+        return rows[0][0]
+
+    @classmethod
+    def select_rows(
+        cls, user_id: int, annee: Optional[int] = None, ids: Iterable[int] = ()
+    ) -> List[Any]:
+        """En-têtes des feuilles sélectionnées, par ordre chronologique
+
+        Seules les lignes de ``feuilles_heures`` sont lues : les jours sont
+        chargés ensuite par ``iter_from_rows``.
+        """
+        clause, params = cls._clause_selection(user_id, annee, ids)
+        return db_manager.execute_query(
+            f"SELECT * FROM feuilles_heures WHERE {clause} ORDER BY annee, mois",
+            tuple(params),
+        )
+
+    @classmethod
+    def iter_from_rows(cls, rows) -> Iterator["FeuilleDHeures"]:
+        """Comme ``from_rows``, mais chargé par lots au fil de l'itération"""
+        for debut in range(0, len(rows), TAILLE_LOT_AGREGATS):
+            yield from cls.from_rows(rows[debut : debut + TAILLE_LOT_AGREGATS])
+
+    @classmethod
+    def summaries_by_user(
+        cls, user_id: int, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> List[Dict]:
+        """Vues résumées des feuilles d'un utilisateur, lues dans les agrégats
+
+        Les jours et créneaux ne sont chargés que pour les feuilles dont les
+        agrégats sont absents ou calculés avec d'autres règles : leurs valeurs
+        sont recalculées pour la réponse, sans écriture en base.
+        """
+        clause, params = _pagination(limit, cursor)
+        rows = db_manager.execute_query(
+            f"SELECT * FROM feuilles_heures WHERE user_id = ?{clause}",
+            (user_id, *params),
+        )
+        return cls.summaries_from_rows(rows)
+
+    @classmethod
+    def summaries_from_rows(cls, rows) -> List[Dict]:
+        """Vues résumées de lignes feuilles_heures, agrégats périmés recalculés
+
+        Lecture seule : les agrégats périmés sont persistés (avec une nouvelle
+        version) par la sauvegarde de la feuille ou par ``refresh_aggregates``
+        (commande ``flask refresh-aggregates``).
+        """
+        version = version_regles_salaire()
+        perimees = cls.from_rows(
+            [row for row in rows if row["agregats_version"] != version]
+        )
+        resumes = {feuille.id: feuille.to_summary() for feuille in perimees}
+
+        return [
+            resumes.get(row["id"]) or {champ: row[champ] for champ in cls.CHAMPS_RESUME}
+            for row in rows
+        ]
+
+    @classmethod
+    def refresh_aggregates(
+        cls, user_id: Optional[int] = None, annee: Optional[int] = None
+    ) -> int:
+        """Recalcule les agrégats absents ou périmés, retourne le nombre de feuilles
+
+        À lancer après un changement des règles de calcul. Les feuilles sont
+        chargées par lots pour borner la mémoire ; celles dont les montants
+        changent reçoivent une nouvelle version, transmise par /api/sync.
+        """
+        conditions: List[str] = ["agregats_version IS NOT ?"]
+        params: List[Any] = [version_regles_salaire()]
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        if annee is not None:
+            conditions.append("annee = ?")
+            params.append(annee)
+        ids = [
+            row["id"]
+            for row in db_manager.execute_query(
+                f"SELECT id FROM feuilles_heures WHERE {' AND '.join(conditions)}",
+                tuple(params),
+            )
+        ]
+
+        for lot in _par_lots(ids, TAILLE_LOT_AGREGATS):
+            placeholders = ",".join("?" * len(lot))
+            feuilles = cls.from_rows(
+                db_manager.execute_query(
+                    f"SELECT * FROM feuilles_heures WHERE id IN ({placeholders})",
+                    tuple(lot),
+                )
+            )
+            with db_manager.transaction() as uow:
+                for feuille in feuilles:
+                    feuille._ecrire_agregats(uow, feuille._agregats())
+        return len(ids)
+
+    @classmethod
+    def fingerprint(cls, feuille_id: int, user_id: int) -> Optional[str]:
+        """Empreinte d'une feuille de l'utilisateur (None si elle n'existe pas)
+
+        Version de la ligne : les valeurs dérivées (heures, salaires) dépendent
+        en outre des règles de ``version_regles_salaire``.
+        """
+        return _version_ligne("feuilles_heures", feuille_id, user_id)
+
+    @classmethod
+    def fingerprint_by_user(cls, user_id: int) -> Optional[str]:
+        """Empreinte de toutes les feuilles d'un utilisateur (None s'il n'en a pas)"""
+        return _version_liste("feuilles_heures", user_id)
+
+    @classmethod
+    def changed_since(
+        cls, user_id: int, since: int, limit: int, summary: bool = False
+    ) -> List:
+        """Feuilles modifiées après la version ``since``, au plus ``limit``
+
+        Avec ``summary``, retourne les vues résumées lues dans les agrégats.
+        """
+        rows = _lignes_modifiees("feuilles_heures", user_id, since, limit)
+        return cls.summaries_from_rows(rows) if summary else cls.from_rows(rows)
+
+    @classmethod
+    def count_by_user(cls, user_id: int) -> int:
+        """Nombre de feuilles d'un utilisateur (sans chargement des jours)"""
+        rows = db_manager.execute_query(
+            "SELECT COUNT(*) AS total FROM feuilles_heures WHERE user_id = ?",
             (user_id,),
         )
-        return [cls.from_row(row) for row in rows]
+        return rows[0]["total"]
 
     @classmethod
     def get_by_id(cls, feuille_id: int) -> Optional["FeuilleDHeures"]:
@@ -702,32 +1632,57 @@ class FeuilleDHeures:
     @classmethod
     def from_row(cls, row) -> "FeuilleDHeures":
         """Crée une feuille d'heures à partir d'une ligne de base de données"""
-        # Récupérer les jours travaillés
-        jours_rows = db_manager.execute_query(
-            "SELECT * FROM jours_travailles WHERE feuille_heures_id = ?", (row["id"],)
-        )
+        return cls.from_rows([row])[0]
 
-        jours_travailles = []
-        for jour_row in jours_rows:
-            jour = JourTravaille(date=jour_row["date"])
+    @classmethod
+    def from_rows(cls, rows) -> List["FeuilleDHeures"]:
+        """Crée des feuilles d'heures à partir de lignes de base de données
+
+        Les jours travaillés et leurs créneaux sont chargés par lots avec une
+        seule requête JOIN par lot, au lieu d'une requête par jour. Les jours
+        sont triés par date, comme pour les plannings.
+        """
+        ids = [row["id"] for row in rows]
+        jours_par_feuille: Dict[int, List[JourTravaille]] = {
+            feuille_id: [] for feuille_id in ids
+        }
 
-            # Récupérer les créneaux pour ce jour
-            creneaux_rows = db_manager.execute_query(
-                "SELECT * FROM creneaux_feuille WHERE jour_travaille_id = ?",
-                (jour_row["id"],),
+        for lot in _par_lots(ids):
+            placeholders = ",".join("?" * len(lot))
+            jours_rows = db_manager.execute_query(
+                f"""SELECT j.id AS jour_id, j.feuille_heures_id, j.date,
+                          c.heure_debut, c.heure_fin
+                   FROM jours_travailles j
+                   LEFT JOIN creneaux_feuille c ON c.jour_travaille_id = j.id
+                   WHERE j.feuille_heures_id IN ({placeholders})
+                   ORDER BY j.feuille_heures_id, j.date, j.id, c.id""",
+                tuple(lot),
             )
 
-            for creneau in creneaux_rows:
-                jour.ajouter_creneau(creneau["heure_debut"], creneau["heure_fin"])
-
-            jours_travailles.append(jour)
-
-        return cls(
-            id=row["id"],
-            mois=row["mois"],
-            annee=row["annee"],
-            jours_travailles=jours_travailles,
-            taux_horaire=row["taux_horaire"],
-            user_id=row["user_id"],
-            heures_contractuelles=row["heures_contractuelles"],
-        )
+            jour_courant_id = None
+            jour = None
+            for jour_row in jours_rows:
+                if jour_row["jour_id"] != jour_courant_id:
+                    jour_courant_id = jour_row["jour_id"]
+                    jour = JourTravaille(date=jour_row["date"])
+                    jours_par_feuille[jour_row["feuille_heures_id"]].append(jour)
+
+                if jour is not None and jour_row["heure_debut"] is not None:
+                    jour.ajouter_creneau(jour_row["heure_debut"], jour_row["heure_fin"])
+
+        feuilles = []
+        for row in rows:
+            feuille = cls(
+                id=row["id"],
+                mois=row["mois"],
+                annee=row["annee"],
+                jours_travailles=jours_par_feuille[row["id"]],
+                taux_horaire=row["taux_horaire"],
+                user_id=row["user_id"],
+                heures_contractuelles=row["heures_contractuelles"],
+            )
+            feuille._entete_persiste = feuille._entete()
+            feuille.version, feuille.updated_at = row["version"], row["updated_at"]
+            feuille._agregats_persistes = tuple(row[c] for c in COLONNES_AGREGATS)
+            feuilles.append(feuille)
+        return feuilles
@@ -0,0 +1,108 @@
+"""
+Hachage des mots de passe dans un pool de threads borné
+
+bcrypt libère le GIL pendant le calcul : les hachages et vérifications
+s'exécutent en parallèle dans un pool dédié, sans bloquer les autres
+threads du worker. Le nombre de calculs en cours ou en attente est borné ;
+au-delà, ``PasswordHashingSaturated`` est levée immédiatement (réponse 503)
+au lieu de laisser les requêtes s'accumuler. Un calcul qui dépasse le délai
+d'attente produit la même erreur.
+"""
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+import bcrypt
+
+from .config import Config
+
+# Préfixe d'un hachage bcrypt : $2a$, $2b$ ou $2y$ suivi du coût sur 2 chiffres
+_BCRYPT_PREFIX = re.compile(r"^\$2[aby]?\$(\d{2})\$")
+
+
+def hash_cost(password_hash: Optional[str]) -> Optional[int]:
+    """Coût bcrypt d'un hachage, ou None s'il n'est pas reconnu"""
+    match = _BCRYPT_PREFIX.match(password_hash or "")
+    return int(match.group(1)) if match else None
+
+
+class PasswordHashingSaturated(RuntimeError):
+    """Le pool de hachage est saturé, la requête doit être retentée"""
+
+
+class PasswordHasher:
+    """Hachage et vérification bcrypt avec contre-pression"""
+
+    def __init__(
+        self,
+        rounds: int = 12,
+        max_workers: int = 4,
+        max_pending: int = 16,
+        timeout: Optional[float] = 10.0,
+    ):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.rejected = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Créé à la première utilisation dans chaque worker gunicorn
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fonction: Callable[..., Any], *args: Any) -> Any:
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordHashingSaturated("Trop de calculs de mot de passe en cours")
+
+        try:
+            future = self._get_executor().submit(fonction, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError as e:
+            # Le calcul continue dans le pool et libère son créneau à la fin
+            self.rejected += 1
+            raise PasswordHashingSaturated(
+                "Délai de calcul du mot de passe dépassé"
+            ) from e
+
+    def hash(self, password: str) -> str:
+        """Hache un mot de passe avec le coût configuré"""
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run(bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Indique si un hachage a été calculé avec un autre coût que la cible"""
+        return hash_cost(password_hash) != self.rounds
+
+    def check(self, password: str, password_hash: str) -> bool:
+        """Vérifie un mot de passe contre son hachage"""
+        return self._run(
+            bcrypt.checkpw, password.encode("utf-8"), password_hash.encode("utf-8")
+        )
+
+
+# Instance globale du hacheur
+password_hasher = PasswordHasher(
+    rounds=Config.BCRYPT_ROUNDS,
+    max_workers=Config.BCRYPT_MAX_WORKERS,
+    max_pending=Config.BCRYPT_MAX_PENDING,
+)
@@ -0,0 +1,145 @@
+"""
+Cache disque des PDF de feuilles d'heures
+
+Les PDF sont adressés par le contenu : la clé est une empreinte SHA-256 de
+``FeuilleDHeures.to_dict()`` (sans ``created_at``) et de la version de mise en
+page. Les fichiers sont partagés par tous les workers gunicorn et évincés du
+moins récemment utilisé au plus récent lorsque la taille totale dépasse
+``max_bytes``.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+from .config import Config
+
+# À incrémenter lorsque la mise en page du PDF change
+PDF_LAYOUT_VERSION = "1"
+
+# Champs sans influence sur le document généré
+CHAMPS_IGNORES = ("created_at",)
+
+
+class PDFCache:
+    """Cache LRU sur disque, borné en taille, des PDF générés"""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def compute_key(feuille_data: Dict[str, Any]) -> str:
+        """Empreinte du contenu d'une feuille, utilisée comme clé et comme ETag"""
+        contenu = {k: v for k, v in feuille_data.items() if k not in CHAMPS_IGNORES}
+        payload = json.dumps(
+            [PDF_LAYOUT_VERSION, contenu],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, feuille_id: int, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{feuille_id}-{key}.pdf")
+
+    def get(self, feuille_id: int, key: str) -> Optional[bytes]:
+        """Retourne le PDF en cache, ou None s'il est absent"""
+        if not self.enabled:
+            return None
+
+        path = self._path(feuille_id, key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # Marque l'entrée comme récemment utilisée
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return data
+
+    def put(self, feuille_id: int, key: str, data: bytes) -> None:
+        """Enregistre un PDF puis évince les entrées les plus anciennes"""
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Écriture atomique : les autres workers ne voient jamais de fichier partiel
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(feuille_id, key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._evict()
+
+    def invalidate(self, feuille_id: int) -> int:
+        """Supprime toutes les versions en cache d'une feuille"""
+        prefixe = f"{feuille_id}-"
+        supprimes = 0
+        for entry in self._entries():
+            if entry.name.startswith(prefixe):
+                supprimes += self._remove(entry.path)
+        return supprimes
+
+    def clear(self) -> None:
+        """Vide entièrement le cache"""
+        for entry in self._entries():
+            self._remove(entry.path)
+
+    def _entries(self):
+        try:
+            return [
+                entry
+                for entry in os.scandir(self.cache_dir)
+                if entry.is_file() and entry.name.endswith(".pdf")
+            ]
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:
+            # Déjà supprimé par un autre worker
+            return 0
+
+    def _evict(self) -> None:
+        """Évince les entrées les moins récemment utilisées au-delà de max_bytes"""
+        with self._lock:
+            entries = []
+            for entry in self._entries():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if self._remove(path):
+                    self.stats["evictions"] += 1
+                total -= size
+
+
+# Instance globale du cache
+pdf_cache = PDFCache(Config.PDF_CACHE_DIR, Config.PDF_CACHE_MAX_BYTES)
@@ -0,0 +1,157 @@
+"""
+Export groupé des feuilles d'heures (archive ZIP ou PDF fusionné)
+
+Les PDF sont rendus en parallèle dans le pool de processus de ``pdf_jobs``
+avec un nombre borné de rendus en vol, puis écrits au fil de l'eau dans la
+réponse : la mémoire utilisée ne dépend pas du nombre de feuilles exportées.
+Les PDF déjà présents dans le cache disque ne sont pas rendus de nouveau.
+"""
+
+import io
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .pdf_cache import PDFCache, pdf_cache
+from .pdf_generator import generer_pdf_octets
+
+try:
+    from pypdf import PdfReader, PdfWriter
+
+    _PYPDF_DISPONIBLE = True
+except ImportError:  # pragma: no cover - pypdf est optionnel (extra "export")
+    _PYPDF_DISPONIBLE = False
+
+FORMATS_EXPORT = ("zip", "pdf")
+
+# Nombre maximal de feuilles par export
+MAX_FEUILLES_EXPORT = 240
+
+# Nombre maximal de feuilles fusionnées en un PDF : toutes les pages restent
+# en mémoire jusqu'à l'écriture, au-delà l'export se fait en ZIP
+MAX_FEUILLES_FUSION = 24
+
+# Taille des morceaux envoyés au client
+TAILLE_MORCEAU = 64 * 1024
+
+
+def fusion_disponible() -> bool:
+    """La fusion en un seul PDF nécessite pypdf"""
+    return _PYPDF_DISPONIBLE
+
+
+class _FluxSortie(io.RawIOBase):
+    """Fichier en écriture seule, non positionnable, vidé à la demande
+
+    ``zipfile`` détecte l'absence de ``seek`` et écrit des descripteurs de
+    données : l'archive peut ainsi être envoyée pendant sa construction.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._morceaux: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._morceaux.append(bytes(data))
+        return len(data)
+
+    def vider(self) -> bytes:
+        data = b"".join(self._morceaux)
+        self._morceaux.clear()
+        return data
+
+
+def rendre_pdfs(
+    elements: Iterable[Tuple[int, Dict[str, Any]]],
+    executor: Executor,
+    fenetre: int = 4,
+    cache: Optional[PDFCache] = None,
+) -> Iterator[bytes]:
+    """
+    Rend des feuilles en parallèle et produit leurs PDF dans l'ordre d'entrée
+
+    Args:
+        elements: Couples ``(feuille_id, feuille.to_dict())``
+        executor: Pool de processus de rendu
+        fenetre: Nombre maximal de rendus en vol (borne la mémoire)
+        cache: Cache disque consulté avant le rendu et alimenté ensuite
+    """
+    cache = cache if cache is not None else pdf_cache
+    en_vol: deque = deque()
+
+    def soumettre(feuille_id: int, feuille_data: Dict[str, Any]):
+        cle = cache.compute_key(feuille_data)
+        pdf = cache.get(feuille_id, cle)
+        if pdf is not None:
+            future: Future = Future()
+            future.set_result(pdf)
+            en_vol.append((feuille_id, cle, future, False))
+        else:
+            future = executor.submit(generer_pdf_octets, feuille_data)
+            en_vol.append((feuille_id, cle, future, True))
+
+    def suivant() -> bytes:
+        feuille_id, cle, future, rendu = en_vol.popleft()
+        pdf = future.result()
+        if rendu:
+            cache.put(feuille_id, cle, pdf)
+        return pdf
+
+    try:
+        for feuille_id, feuille_data in elements:
+            soumettre(feuille_id, feuille_data)
+            if len(en_vol) >= fenetre:
+                yield suivant()
+        while en_vol:
+            yield suivant()
+    finally:
+        # Client déconnecté ou erreur : inutile de terminer les autres rendus
+        for _, _, future, _ in en_vol:
+            future.cancel()
+
+
+def flux_zip(fichiers: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """Construit une archive ZIP au fil de l'eau à partir de (nom, contenu)"""
+    sortie = _FluxSortie()
+    # Les PDF sont déjà compressés : stockage sans recompression
+    with zipfile.ZipFile(sortie, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for nom, contenu in fichiers:
+            archive.writestr(nom, contenu)
+            yield sortie.vider()
+    yield sortie.vider()
+
+
+def flux_pdf_fusionne(
+    pdfs: Iterable[bytes], max_feuilles: int = MAX_FEUILLES_FUSION
+) -> Iterator[bytes]:
+    """
+    Fusionne des PDF en un seul document
+
+    Contrairement au ZIP, le document fusionné ne peut être écrit qu'une fois
+    toutes les pages ajoutées : seules les pages sont conservées, puis le
+    résultat est envoyé par morceaux depuis un fichier temporaire. La mémoire
+    dépend donc du nombre de feuilles, borné par ``max_feuilles``.
+    """
+    if not fusion_disponible():
+        raise RuntimeError("pypdf n'est pas installé")
+
+    writer = PdfWriter()
+    for nombre, pdf in enumerate(pdfs, start=1):
+        if nombre > max_feuilles:
+            raise ValueError(f"Fusion limitée à {max_feuilles} feuilles")
+        writer.append(PdfReader(io.BytesIO(pdf)))
+
+    with tempfile.TemporaryFile() as fichier:
+        writer.write(fichier)
+        writer.close()
+        fichier.seek(0)
+        while True:
+            morceau = fichier.read(TAILLE_MORCEAU)
+            if not morceau:
+                break
+            yield morceau
@@ -9,41 +9,131 @@ from reportlab.lib.units import mm
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.platypus.tableofcontents import SimpleIndex
 from reportlab.lib.enums import TA_CENTER
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 import io
+import os
+import time
 from typing import Dict, Any, List, Tuple
 
 
-def format_date_french(date_str: str) -> str:
-    """Formate une date en français à partir d'une string ISO (YYYY-MM-DD)"""
-    jours = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
-    mois = [
-        "",
-        "janvier",
-        "février",
-        "mars",
-        "avril",
-        "mai",
-        "juin",
-        "juillet",
-        "août",
-        "septembre",
-        "octobre",
-        "novembre",
-        "décembre",
+# Libellés français, construits une seule fois à l'import
+MOIS_NOMS = (
+    "",
+    "Janvier",
+    "Février",
+    "Mars",
+    "Avril",
+    "Mai",
+    "Juin",
+    "Juillet",
+    "Août",
+    "Septembre",
+    "Octobre",
+    "Novembre",
+    "Décembre",
+)
+MOIS_NOMS_MINUSCULES = tuple(nom.lower() for nom in MOIS_NOMS)
+JOURS_SEMAINE = ("lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche")
+
+# Styles de tableaux partagés entre les documents (Table.setStyle copie les
+# commandes, les TableStyle ne sont jamais modifiés)
+_EN_TETE_GRIS = [
+    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+]
+
+STYLE_TABLE_INFOS = TableStyle(
+    [
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ]
+)
+
+STYLE_TABLE_JOURS = TableStyle(
+    _EN_TETE_GRIS
+    + [
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ]
+)
+
+STYLE_TABLE_SEMAINES = TableStyle(
+    _EN_TETE_GRIS
+    + [
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
     ]
+)
+
+STYLE_TABLE_HEURES = TableStyle(
+    [
+        # En-tête
+        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+
+        # Corps du tableau
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+        ("GRID", (0, 0), (-1, -2), 1, colors.black),
+
+        # Ligne de séparation (avant-dernière ligne)
+        ("LINEBELOW", (0, -3), (-1, -3), 2, colors.black),
+        ("GRID", (0, -2), (-1, -2), 0, colors.white),  # Pas de grille pour la ligne vide
+
+        # Ligne de total (dernière ligne)
+        ("BACKGROUND", (0, -1), (-1, -1), colors.lightgrey),
+        ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+        ("FONTSIZE", (0, -1), (-1, -1), 11),
+        ("GRID", (0, -1), (-1, -1), 1, colors.black),
+    ]
+)
+
+STYLE_TABLE_DEDUCTIONS = TableStyle(
+    _EN_TETE_GRIS
+    + [
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+    ]
+)
+
+# Largeurs de colonnes
+COLONNES_INFOS = (80 * mm, 50 * mm)
+COLONNES_JOURS = (60 * mm, 80 * mm, 30 * mm)
+COLONNES_SEMAINES = (100 * mm, 40 * mm)
+COLONNES_HEURES = (80 * mm, 40 * mm, 40 * mm)
+COLONNES_DEDUCTIONS = (80 * mm, 40 * mm)
 
+
+@lru_cache(maxsize=2048)
+def format_date_french(date_str: str) -> str:
+    """Formate une date en français à partir d'une string ISO (YYYY-MM-DD)"""
     # Parser la date ISO sans problème de timezone
     parts = date_str.split('-')
     annee = int(parts[0])
     mois_num = int(parts[1])
     jour_num = int(parts[2])
 
-    # Créer l'objet date correctement
-    date = datetime(annee, mois_num, jour_num)
-
-    jour_semaine = jours[date.weekday()]
-    mois_nom = mois[mois_num]
+    jour_semaine = JOURS_SEMAINE[date(annee, mois_num, jour_num).weekday()]
+    mois_nom = MOIS_NOMS_MINUSCULES[mois_num]
 
     return f"{jour_semaine} {jour_num} {mois_nom} {annee}"
 
@@ -186,23 +276,7 @@ class PDFGenerator:
             story = []
 
             # Titre principal
-            mois_noms = [
-                "",
-                "Janvier",
-                "Février",
-                "Mars",
-                "Avril",
-                "Mai",
-                "Juin",
-                "Juillet",
-                "Août",
-                "Septembre",
-                "Octobre",
-                "Novembre",
-                "Décembre",
-            ]
-
-            titre = f"FEUILLE D'HEURES - {mois_noms[feuille_data['mois']]} {feuille_data['annee']}"
+            titre = f"FEUILLE D'HEURES - {MOIS_NOMS[feuille_data['mois']]} {feuille_data['annee']}"
             story.append(Paragraph(titre, self.styles["CustomTitle"]))
             story.append(Spacer(1, 20))
 
@@ -220,17 +294,8 @@ class PDFGenerator:
                 ["Total heures travaillées:", f"{round(feuille_data['total_heures'], 4)}h"],
             ]
 
-            table_infos = Table(infos_contrat, colWidths=[80 * mm, 50 * mm])
-            table_infos.setStyle(
-                TableStyle(
-                    [
-                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                        ("FONTSIZE", (0, 0), (-1, -1), 10),
-                        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                    ]
-                )
-            )
+            table_infos = Table(infos_contrat, colWidths=COLONNES_INFOS)
+            table_infos.setStyle(STYLE_TABLE_INFOS)
 
             story.append(table_infos)
             story.append(Spacer(1, 20))
@@ -264,21 +329,8 @@ class PDFGenerator:
 
                     data_jours.append([date_formatee, creneaux_text, f"{round(jour['heures'], 4)}h"])
 
-                table_jours = Table(data_jours, colWidths=[60 * mm, 80 * mm, 30 * mm])
-                table_jours.setStyle(
-                    TableStyle(
-                        [
-                            ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                            ("FONTSIZE", (0, 0), (-1, -1), 9),
-                            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                            ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                        ]
-                    )
-                )
+                table_jours = Table(data_jours, colWidths=COLONNES_JOURS)
+                table_jours.setStyle(STYLE_TABLE_JOURS)
 
                 story.append(table_jours)
 
@@ -302,22 +354,8 @@ class PDFGenerator:
             for semaine_label, heures in semaines_heures:
                 data_semaines.append([semaine_label, f"{round(heures, 4)}h"])
 
-            table_semaines = Table(data_semaines, colWidths=[100 * mm, 40 * mm])
-            table_semaines.setStyle(
-                TableStyle(
-                    [
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
-                        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                        ("FONTSIZE", (0, 0), (-1, -1), 10),
-                        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                        ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ]
-                )
-            )
+            table_semaines = Table(data_semaines, colWidths=COLONNES_SEMAINES)
+            table_semaines.setStyle(STYLE_TABLE_SEMAINES)
 
             story.append(table_semaines)
             story.append(Spacer(1, 20))
@@ -367,34 +405,8 @@ class PDFGenerator:
                 ],
             ]
 
-            table_heures = Table(data_heures, colWidths=[80 * mm, 40 * mm, 40 * mm])
-            table_heures.setStyle(
-                TableStyle(
-                    [
-                        # En-tête
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-
-                        # Corps du tableau
-                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
-                        ("FONTSIZE", (0, 0), (-1, -1), 10),
-                        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                        ("GRID", (0, 0), (-1, -2), 1, colors.black),
-
-                        # Ligne de séparation (avant-dernière ligne)
-                        ("LINEBELOW", (0, -3), (-1, -3), 2, colors.black),
-                        ("GRID", (0, -2), (-1, -2), 0, colors.white),  # Pas de grille pour la ligne vide
-
-                        # Ligne de total (dernière ligne)
-                        ("BACKGROUND", (0, -1), (-1, -1), colors.lightgrey),
-                        ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
-                        ("FONTSIZE", (0, -1), (-1, -1), 11),
-                        ("GRID", (0, -1), (-1, -1), 1, colors.black),
-                    ]
-                )
-            )
+            table_heures = Table(data_heures, colWidths=COLONNES_HEURES)
+            table_heures.setStyle(STYLE_TABLE_HEURES)
 
             story.append(table_heures)
             story.append(Spacer(1, 10))
@@ -418,21 +430,8 @@ class PDFGenerator:
                 ["Impôt sur le revenu", f"-{salaire_net['impot_mensuel']:.2f}€"],
             ]
 
-            table_deductions = Table(data_deductions, colWidths=[80 * mm, 40 * mm])
-            table_deductions.setStyle(
-                TableStyle(
-                    [
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
-                        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                        ("FONTSIZE", (0, 0), (-1, -1), 10),
-                        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                        ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                    ]
-                )
-            )
+            table_deductions = Table(data_deductions, colWidths=COLONNES_DEDUCTIONS)
+            table_deductions.setStyle(STYLE_TABLE_DEDUCTIONS)
 
             story.append(table_deductions)
             story.append(Spacer(1, 10))
@@ -472,4 +471,28 @@ class PDFGenerator:
 
 
 # Instance globale
-pdf_generator = PDFGenerator()
\ No newline at end of file
+pdf_generator = PDFGenerator()
+
+
+def generer_pdf_octets(feuille_data: Dict[str, Any]) -> bytes:
+    """Génère le PDF d'une feuille et retourne son contenu (processus de rendu)"""
+    return pdf_generator.generer_pdf_feuille(feuille_data).getvalue()
+
+
+def generer_pdf_fichier(feuille_data: Dict[str, Any], chemin: str) -> float:
+    """
+    Génère le PDF d'une feuille dans un fichier et retourne la durée du rendu en ms
+
+    Point d'entrée des processus de rendu (voir pdf_jobs) : le fichier est
+    écrit sous un nom temporaire puis renommé, il n'est jamais visible partiel.
+    """
+    debut = time.perf_counter()
+    buffer = pdf_generator.generer_pdf_feuille(feuille_data)
+
+    os.makedirs(os.path.dirname(chemin) or ".", exist_ok=True)
+    chemin_tmp = f"{chemin}.{os.getpid()}.tmp"
+    with open(chemin_tmp, "wb") as f:
+        f.write(buffer.getvalue())
+    os.replace(chemin_tmp, chemin)
+
+    return (time.perf_counter() - debut) * 1000
@@ -0,0 +1,350 @@
+"""
+File de rendu PDF en arrière-plan
+
+Les rendus sont exécutés dans un pool de processus local, hors des workers
+gunicorn ``sync``. Chaque tâche est enregistrée dans la table ``pdf_jobs`` :
+une tâche en attente survit au redémarrage du worker qui l'a créée et est
+reprise par le prochain pool démarré.
+
+Cycle de vie : ``pending`` -> ``running`` -> ``done`` | ``error``.
+"""
+
+import functools
+import json
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from .config import Config
+from .database import DatabaseManager, db_manager
+from .pdf_cache import PDFCache
+from .pdf_generator import generer_pdf_fichier
+
+STATUTS_ACTIFS = ("pending", "running")
+
+# Nombre de rendus récents utilisés pour les métriques de durée
+FENETRE_METRIQUES = 200
+
+# Reprises d'une tâche dont le processus de rendu est mort (mémoire, plantage)
+MAX_REPRISES = 1
+
+
+def _processus_actif(pid: Optional[int]) -> bool:
+    """Indique si un processus local existe encore"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class PDFJobQueue:
+    """File de tâches de rendu PDF adossée à SQLite"""
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        jobs_dir: str,
+        max_workers: int = 2,
+        retention_hours: int = 24,
+    ):
+        self.db = db
+        self.jobs_dir = jobs_dir
+        self.max_workers = max_workers
+        self.retention = timedelta(hours=retention_hours)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        # Tâches reprises après la perte du pool : job_id -> nombre de reprises
+        self._reprises: Dict[str, int] = {}
+
+    def output_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.pdf")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Crée le pool à la première utilisation dans chaque processus
+
+        Avec ``preload_app`` le module est importé avant le fork des workers
+        gunicorn : le pool ne doit donc pas être créé à l'import. Un pool
+        cassé (processus de rendu mort) est remplacé par un nouveau pool.
+        """
+        with self._lock:
+            if (
+                self._executor is not None
+                and self._pid == os.getpid()
+                and not getattr(self._executor, "_broken", False)
+            ):
+                return self._executor
+
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self._pid = os.getpid()
+            executor = self._executor
+
+        self._recover(executor)
+        return executor
+
+    def _reprendre(self, job_id: str, executor: ProcessPoolExecutor) -> None:
+        """Écarte un pool cassé et soumet de nouveau la tâche au pool suivant"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+        self.db.execute_update(
+            """UPDATE pdf_jobs SET status = 'pending', worker_pid = NULL
+               WHERE id = ? AND status = 'running'""",
+            (job_id,),
+        )
+        nouveau = self._get_executor()
+        # Déjà resoumise si le nouveau pool vient de reprendre les tâches
+        rows = self.db.execute_query(
+            "SELECT payload FROM pdf_jobs WHERE id = ? AND status = 'pending'",
+            (job_id,),
+        )
+        if rows:
+            self._submit(job_id, rows[0]["payload"], nouveau)
+
+    def executor(self) -> ProcessPoolExecutor:
+        """Pool de rendu partagé (utilisé aussi par les exports groupés)"""
+        return self._get_executor()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Arrête le pool de processus"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def enqueue(
+        self,
+        feuille_id: int,
+        user_id: int,
+        feuille_data: Dict[str, Any],
+        filename: str,
+    ) -> Dict[str, Any]:
+        """
+        Ajoute le rendu d'une feuille à la file et retourne la tâche
+
+        Une tâche existante pour le même contenu (en cours ou terminée) est
+        réutilisée au lieu d'un nouveau rendu.
+        """
+        self.purge_expired()
+        cache_key = PDFCache.compute_key(feuille_data)
+
+        rows = self.db.execute_query(
+            """SELECT id, status FROM pdf_jobs
+               WHERE user_id = ? AND feuille_id = ? AND cache_key = ?
+                 AND status IN ('pending', 'running', 'done')
+               ORDER BY created_at DESC LIMIT 1""",
+            (user_id, feuille_id, cache_key),
+        )
+        if rows and (
+            rows[0]["status"] != "done"
+            or os.path.exists(self.output_path(rows[0]["id"]))
+        ):
+            return self._job(rows[0]["id"])
+
+        job_id = uuid.uuid4().hex
+        payload = json.dumps(feuille_data, default=str)
+        self.db.execute_insert(
+            """INSERT INTO pdf_jobs (id, user_id, feuille_id, cache_key, filename,
+               status, payload, created_at) VALUES (?, ?, ?, ?, ?, 'pending', ?, ?)""",
+            (
+                job_id,
+                user_id,
+                feuille_id,
+                cache_key,
+                filename,
+                payload,
+                datetime.now().isoformat(),
+            ),
+        )
+
+        self._submit(job_id, payload, self._get_executor())
+        return self._job(job_id)
+
+    def _submit(self, job_id: str, payload: str, executor: ProcessPoolExecutor):
+        """Réserve une tâche en attente et l'envoie au pool"""
+        reservee = self.db.execute_update(
+            """UPDATE pdf_jobs SET status = 'running', worker_pid = ?, started_at = ?
+               WHERE id = ? AND status = 'pending'""",
+            (os.getpid(), datetime.now().isoformat(), job_id),
+        )
+        if not reservee:
+            # Déjà prise en charge par un autre worker
+            return
+
+        try:
+            future = executor.submit(
+                generer_pdf_fichier, json.loads(payload), self.output_path(job_id)
+            )
+        except BrokenProcessPool:
+            # Pool cassé par un rendu précédent : la tâche part dans un
+            # nouveau pool
+            self._reprendre(job_id, executor)
+            return
+        except Exception as e:
+            self._terminer(job_id, "error", error=str(e))
+            return
+        future.add_done_callback(functools.partial(self._on_done, job_id, executor))
+
+    def _on_done(self, job_id: str, executor: ProcessPoolExecutor, future) -> None:
+        try:
+            render_ms = future.result()
+        except BrokenProcessPool as e:
+            # Un processus de rendu est mort : toutes les tâches du pool
+            # échouent. La tâche est reprise dans un nouveau pool, au plus
+            # MAX_REPRISES fois (elle peut être la cause du plantage).
+            reprises = self._reprises.get(job_id, 0)
+            if reprises >= MAX_REPRISES:
+                self._reprises.pop(job_id, None)
+                self._terminer(job_id, "error", error=str(e))
+            else:
+                self._reprises[job_id] = reprises + 1
+                # Rappel exécuté sous le verrou du pool cassé : son arrêt et
+                # le nouvel envoi sont faits dans un autre thread
+                threading.Thread(
+                    target=self._reprendre, args=(job_id, executor), daemon=True
+                ).start()
+        except Exception as e:
+            self._reprises.pop(job_id, None)
+            self._terminer(job_id, "error", error=str(e))
+        else:
+            self._reprises.pop(job_id, None)
+            self._terminer(job_id, "done", render_ms=render_ms)
+
+    def _terminer(
+        self,
+        job_id: str,
+        status: str,
+        render_ms: Optional[float] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        self.db.execute_update(
+            """UPDATE pdf_jobs SET status = ?, render_ms = ?, error = ?, finished_at = ?
+               WHERE id = ?""",
+            (
+                status,
+                render_ms,
+                error[:500] if error else None,
+                datetime.now().isoformat(),
+                job_id,
+            ),
+        )
+
+    def _recover(self, executor: ProcessPoolExecutor) -> None:
+        """Reprend les tâches interrompues (worker arrêté pendant le rendu)"""
+        for row in self.db.execute_query(
+            "SELECT id, worker_pid FROM pdf_jobs WHERE status = 'running'"
+        ):
+            if row["worker_pid"] == os.getpid() or not _processus_actif(
+                row["worker_pid"]
+            ):
+                self.db.execute_update(
+                    """UPDATE pdf_jobs SET status = 'pending', worker_pid = NULL
+                       WHERE id = ? AND status = 'running' AND worker_pid IS ?""",
+                    (row["id"], row["worker_pid"]),
+                )
+
+        for row in self.db.execute_query(
+            "SELECT id, payload FROM pdf_jobs WHERE status = 'pending' ORDER BY created_at"
+        ):
+            self._submit(row["id"], row["payload"], executor)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'état d'une tâche (sans les données de la feuille)"""
+        rows = self.db.execute_query(
+            """SELECT id, user_id, feuille_id, filename, status, error, render_ms,
+                      created_at, started_at, finished_at
+               FROM pdf_jobs WHERE id = ?""",
+            (job_id,),
+        )
+        return dict(rows[0]) if rows else None
+
+    def _job(self, job_id: str) -> Dict[str, Any]:
+        """État d'une tâche qui vient d'être lue ou créée"""
+        job = self.get(job_id)
+        if job is None:
+            raise LookupError(f"Tâche PDF introuvable : {job_id}")
+        return job
+
+    def purge_expired(self) -> int:
+        """Supprime les tâches terminées depuis plus longtemps que la rétention"""
+        limite = (datetime.now() - self.retention).isoformat()
+        rows = self.db.execute_query(
+            """SELECT id FROM pdf_jobs
+               WHERE status IN ('done', 'error') AND finished_at < ?""",
+            (limite,),
+        )
+        for row in rows:
+            try:
+                os.remove(self.output_path(row["id"]))
+            except FileNotFoundError:
+                pass
+        if rows:
+            self.db.execute_delete(
+                """DELETE FROM pdf_jobs
+                   WHERE status IN ('done', 'error') AND finished_at < ?""",
+                (limite,),
+            )
+        return len(rows)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Profondeur de file et durées de rendu récentes"""
+        par_statut = {
+            row["status"]: row["total"]
+            for row in self.db.execute_query(
+                "SELECT status, COUNT(*) AS total FROM pdf_jobs GROUP BY status"
+            )
+        }
+        durees: List[float] = sorted(
+            row["render_ms"]
+            for row in self.db.execute_query(
+                """SELECT render_ms FROM pdf_jobs WHERE status = 'done'
+                   ORDER BY finished_at DESC LIMIT ?""",
+                (FENETRE_METRIQUES,),
+            )
+        )
+
+        rendu: Dict[str, Optional[float]] = {
+            "count": len(durees),
+            "avg": None,
+            "p95": None,
+            "max": None,
+        }
+        if durees:
+            rendu.update(
+                avg=round(sum(durees) / len(durees), 1),
+                p95=round(durees[min(len(durees) - 1, int(len(durees) * 0.95))], 1),
+                max=round(durees[-1], 1),
+            )
+
+        return {
+            "queue_depth": sum(par_statut.get(s, 0) for s in STATUTS_ACTIFS),
+            "by_status": par_statut,
+            "render_ms": rendu,
+            "workers": self.max_workers,
+        }
+
+
+# Instance globale de la file de rendu
+pdf_jobs = PDFJobQueue(
+    db_manager,
+    Config.PDF_JOBS_DIR,
+    max_workers=Config.PDF_JOB_WORKERS,
+    retention_hours=Config.PDF_JOB_RETENTION_HOURS,
+)
@@ -0,0 +1,168 @@
+"""
+Limitation de débit par seau à jetons (token bucket)
+
+Chaque clé (route + utilisateur ou IP) dispose d'un seau de ``max_requests``
+jetons, rechargé en continu à ``max_requests / window_seconds`` jetons par
+seconde. Une vérification lit et écrit un seul état : O(1) quel que soit le
+nombre de requêtes passées.
+
+Deux stockages sont disponibles :
+
+- ``memory`` : dictionnaire local au processus (serveur de développement,
+  gunicorn à un seul worker) ;
+- ``sqlite`` : fichier SQLite partagé par tous les workers gunicorn.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from .config import Config
+
+
+class RateLimitResult(NamedTuple):
+    """Résultat d'une vérification"""
+
+    allowed: bool
+    remaining: int
+    retry_after: float  # secondes avant qu'un jeton soit disponible
+
+
+def _consommer(
+    tokens: float, elapsed: float, capacity: int, refill_rate: float
+) -> tuple:
+    """Recharge le seau puis tente de consommer un jeton
+
+    Returns:
+        (jetons restants, RateLimitResult)
+    """
+    tokens = min(capacity, tokens + max(0.0, elapsed) * refill_rate)
+    if tokens >= 1:
+        tokens -= 1
+        return tokens, RateLimitResult(True, int(tokens), 0.0)
+    return tokens, RateLimitResult(False, 0, (1 - tokens) / refill_rate)
+
+
+class MemoryRateLimitBackend:
+    """Seaux en mémoire, bornés en nombre de clés (éviction LRU)"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(
+        self, key: str, capacity: int, refill_rate: float, now: Optional[float] = None
+    ) -> RateLimitResult:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens, result = _consommer(tokens, now - updated, capacity, refill_rate)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteRateLimitBackend:
+    """Seaux stockés dans un fichier SQLite partagé entre processus
+
+    Une ligne par clé, lue et mise à jour dans une transaction ``IMMEDIATE``.
+    Les seaux pleins depuis longtemps sont purgés périodiquement.
+    """
+
+    PURGE_INTERVAL = 1000  # vérifications entre deux purges
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._hits = 0
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS rate_limits (
+                       key TEXT PRIMARY KEY,
+                       tokens REAL NOT NULL,
+                       updated_at REAL NOT NULL,
+                       full_at REAL NOT NULL
+                   )""")
+
+    def _connection(self) -> sqlite3.Connection:
+        # Une connexion par thread et par processus (fork des workers gunicorn)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def hit(
+        self, key: str, capacity: int, refill_rate: float, now: Optional[float] = None
+    ) -> RateLimitResult:
+        # Horloge murale : partagée par tous les processus
+        now = time.time() if now is None else now
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens, result = _consommer(tokens, now - updated, capacity, refill_rate)
+            conn.execute(
+                """INSERT INTO rate_limits (key, tokens, updated_at, full_at)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens,
+                       updated_at = excluded.updated_at, full_at = excluded.full_at""",
+                (key, tokens, now, now + (capacity - tokens) / refill_rate),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        self._hits += 1
+        if self._hits % self.PURGE_INTERVAL == 0:
+            # Un seau plein équivaut à une clé absente
+            conn.execute("DELETE FROM rate_limits WHERE full_at < ?", (now,))
+        return result
+
+    def reset(self) -> None:
+        self._connection().execute("DELETE FROM rate_limits")
+
+
+class RateLimiter:
+    """Point d'entrée utilisé par le décorateur ``security.rate_limit``"""
+
+    def __init__(self, backend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+
+    def hit(self, key: str, max_requests: int, window_seconds: int) -> RateLimitResult:
+        if not self.enabled:
+            return RateLimitResult(True, max_requests, 0.0)
+        return self.backend.hit(key, max_requests, max_requests / window_seconds)
+
+
+def create_backend(name: str, storage_path: str):
+    """Crée le stockage demandé par la configuration"""
+    if name == "memory":
+        return MemoryRateLimitBackend()
+    if name == "sqlite":
+        return SQLiteRateLimitBackend(storage_path)
+    raise ValueError(f"Stockage de rate limiting inconnu : {name}")
+
+
+# Instance globale du limiteur
+rate_limiter = RateLimiter(
+    create_backend(Config.RATELIMIT_BACKEND, Config.RATELIMIT_STORAGE_PATH),
+    enabled=Config.RATELIMIT_ENABLED,
+)
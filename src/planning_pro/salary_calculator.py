@@ -3,7 +3,12 @@ Calculateur de salaire avec gestion des heures supplémentaires et complémentai
 selon le type de contrat de travail
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, NamedTuple, Optional, Any, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy est optionnel (extra "perf")
+    np = None  # type: ignore[assignment]
 
 # Configuration des seuils de majoration par type de contrat
 SALARY_CONFIG = [
@@ -78,18 +83,144 @@ SALARY_CONFIG = [
 ]
 
 
+class TrancheComplementaire(NamedTuple):
+    """Tranche d'heures complémentaires compilée"""
+
+    debut: float
+    fin: Optional[float]
+    majoration: float
+    multiplicateur: float  # 1 + majoration / 100
+    debut_effectif: float  # max(debut, heures contractuelles)
+    majoree: bool  # True pour les "complémentaires majorées"
+
+
+class TrancheSupplementaire(NamedTuple):
+    """Tranche d'heures supplémentaires compilée"""
+
+    debut: float
+    fin: Optional[float]
+    majoration: float
+    multiplicateur: float  # 1 + majoration / 100
+    debut_effectif: float  # max(debut, seuil des heures supplémentaires)
+
+
+class ContratCompile(NamedTuple):
+    """Configuration d'un contrat compilée en tables immuables"""
+
+    contrat: str
+    heures_contractuelles: float
+    seuil_heures_sup: float
+    complementaires: Tuple[TrancheComplementaire, ...]
+    supplementaires: Tuple[TrancheSupplementaire, ...]
+    config: Dict[str, Any]
+
+
+def compile_contract(config: Dict[str, Any]) -> ContratCompile:
+    """
+    Compile la configuration d'un contrat (format de SALARY_CONFIG)
+
+    Les bornes et multiplicateurs de chaque tranche sont calculés une fois,
+    le calcul du salaire n'a plus qu'à enchaîner des min/max.
+
+    Raises:
+        ValueError: Si la configuration est incomplète ou incohérente
+    """
+    try:
+        contrat = config["contrat"]
+        heures_contractuelles = config["heures_contractuelles"]
+        tranches_comp = config.get("heures_complementaires") or []
+        tranches_sup = config.get("heures_supplementaires") or []
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Configuration de contrat invalide : {e}") from e
+
+    if (
+        not isinstance(heures_contractuelles, (int, float))
+        or heures_contractuelles <= 0
+    ):
+        raise ValueError("heures_contractuelles doit être un nombre positif")
+
+    seuil_heures_sup = max(35, heures_contractuelles)
+    try:
+        complementaires = tuple(
+            TrancheComplementaire(
+                debut=comp["de"],
+                fin=comp["a"] or None,
+                majoration=comp["majoration"],
+                multiplicateur=1 + comp["majoration"] / 100,
+                debut_effectif=max(comp["de"], heures_contractuelles),
+                majoree=comp["type"] != "complémentaires",
+            )
+            for comp in tranches_comp
+        )
+        supplementaires = tuple(
+            TrancheSupplementaire(
+                debut=sup["de"],
+                fin=sup["a"] or None,
+                majoration=sup["majoration"],
+                multiplicateur=1 + sup["majoration"] / 100,
+                debut_effectif=max(sup["de"], seuil_heures_sup),
+            )
+            for sup in tranches_sup
+        )
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Tranche de contrat invalide : {e}") from e
+
+    return ContratCompile(
+        contrat=contrat,
+        heures_contractuelles=heures_contractuelles,
+        seuil_heures_sup=seuil_heures_sup,
+        complementaires=complementaires,
+        supplementaires=supplementaires,
+        config=config,
+    )
+
+
+# Colonnes retournées par SalaryCalculator.calculate_salary_batch
+BATCH_COLUMNS = (
+    "heures_normales",
+    "heures_complementaires",
+    "heures_complementaires_majorees",
+    "total_heures_supplementaires",
+    "salaire_normal",
+    "salaire_complementaire",
+    "salaire_complementaire_majore",
+    "salaire_supplementaire",
+    "salaire_brut_total",
+)
+
+
 class SalaryCalculator:
     """Calculateur de salaire avec gestion des heures supplémentaires et complémentaires"""
 
     def __init__(self):
-        self.config = SALARY_CONFIG
+        self.config = list(SALARY_CONFIG)
+        self._contrats: Dict[float, ContratCompile] = {
+            config["heures_contractuelles"]: compile_contract(config)
+            for config in self.config
+        }
+
+    def register_contract(self, config: Dict[str, Any]) -> ContratCompile:
+        """
+        Enregistre (ou remplace) la configuration d'un contrat à l'exécution
+
+        Args:
+            config: Configuration au format de SALARY_CONFIG
+
+        Returns:
+            Le contrat compilé
+        """
+        contrat = compile_contract(config)
+        heures = contrat.heures_contractuelles
+        self.config = [
+            c for c in self.config if c["heures_contractuelles"] != heures
+        ] + [config]
+        self._contrats[heures] = contrat
+        return contrat
 
     def get_contract_config(self, heures_contractuelles: float) -> Optional[Dict]:
         """Récupère la configuration pour un nombre d'heures contractuelles donné"""
-        for config in self.config:
-            if config["heures_contractuelles"] == heures_contractuelles:
-                return config
-        return None
+        contrat = self._contrats.get(heures_contractuelles)
+        return contrat.config if contrat else None
 
     def calculate_salary(
         self, total_heures: float, heures_contractuelles: float, taux_horaire: float
@@ -105,143 +236,141 @@ class SalaryCalculator:
         Returns:
             Dict contenant le détail du calcul de salaire
         """
-        config = self.get_contract_config(heures_contractuelles)
-        if not config:
+        contrat = self._contrats.get(heures_contractuelles)
+        if not contrat:
             # Configuration par défaut si le contrat n'est pas trouvé
             return self._calculate_default_salary(
                 total_heures, heures_contractuelles, taux_horaire
             )
 
-        # Initialiser les résultats
-        result = {
-            "contrat": config["contrat"],
-            "heures_contractuelles": heures_contractuelles,
-            "total_heures": total_heures,
-            "taux_horaire": taux_horaire,
-            "heures_normales": 0,
-            "heures_complementaires": 0,
-            "heures_complementaires_majorees": 0,
-            "heures_supplementaires": [],
-            "salaire_normal": 0,
-            "salaire_complementaire": 0,
-            "salaire_complementaire_majore": 0,
-            "salaire_supplementaire": 0,
-            "salaire_brut_total": 0,
-            "detail_supplementaires": [],
-        }
-
-        heures_restantes = total_heures
-
         # 1. Heures normales (contractuelles)
-        heures_normales = min(heures_restantes, heures_contractuelles)
-        result["heures_normales"] = heures_normales
-        result["salaire_normal"] = heures_normales * taux_horaire
-        heures_restantes -= heures_normales
+        heures_normales = min(total_heures, heures_contractuelles)
+        salaire_normal = heures_normales * taux_horaire
+        heures_restantes = total_heures - heures_normales
+
+        heures_comp = heures_comp_maj = 0.0
+        salaire_comp = salaire_comp_maj = salaire_sup = 0.0
+        supplementaires: List[Dict[str, Any]] = []
 
         if heures_restantes <= 0:
-            result["salaire_brut_total"] = result["salaire_normal"]
-            return result
+            return self._build_result(
+                contrat,
+                total_heures,
+                heures_contractuelles,
+                taux_horaire,
+                heures_normales,
+                salaire_normal,
+            )
 
         # 2. Heures complémentaires (pour les contrats < 35h)
-        if config["heures_complementaires"]:
-            for comp in config["heures_complementaires"]:
-                if heures_restantes <= 0:
-                    break
-
-                debut = comp["de"]
-                fin = comp["a"]
-                majoration = comp["majoration"]
-
-                # Calculer les heures dans cette tranche
-                max(0, debut - heures_contractuelles)
-                heures_tranche_fin = (
-                    fin - heures_contractuelles if fin else float("inf")
+        for tranche in contrat.complementaires:
+            if heures_restantes <= 0:
+                break
+            if total_heures <= tranche.debut:
+                continue
+
+            fin = min(total_heures, tranche.fin) if tranche.fin else total_heures
+            heures_dans_tranche = min(heures_restantes, fin - tranche.debut_effectif)
+            if heures_dans_tranche > 0:
+                salaire_tranche = heures_dans_tranche * (
+                    taux_horaire * tranche.multiplicateur
                 )
-
-                if total_heures > debut:
-                    heures_dans_tranche = min(
-                        heures_restantes,
-                        min(total_heures, fin if fin else total_heures)
-                        - max(
-                            debut,
-                            heures_contractuelles
-                            + result["heures_normales"]
-                            - heures_contractuelles,
-                        ),
-                    )
-
-                    if heures_dans_tranche > 0:
-                        taux_majore = taux_horaire * (1 + majoration / 100)
-
-                        if comp["type"] == "complémentaires":
-                            result["heures_complementaires"] += heures_dans_tranche
-                            result["salaire_complementaire"] += (
-                                heures_dans_tranche * taux_majore
-                            )
-                        else:  # complémentaires majorées
-                            result[
-                                "heures_complementaires_majorees"
-                            ] += heures_dans_tranche
-                            result["salaire_complementaire_majore"] += (
-                                heures_dans_tranche * taux_majore
-                            )
-
-                        heures_restantes -= heures_dans_tranche
+                if tranche.majoree:
+                    heures_comp_maj += heures_dans_tranche
+                    salaire_comp_maj += salaire_tranche
+                else:
+                    heures_comp += heures_dans_tranche
+                    salaire_comp += salaire_tranche
+                heures_restantes -= heures_dans_tranche
 
         # 3. Heures supplémentaires (au-delà des heures contractuelles pour >= 35h, ou au-delà de 35h pour < 35h)
-        seuil_heures_sup = max(35, heures_contractuelles)
-        if heures_restantes > 0 and total_heures > seuil_heures_sup:
-            heures_sup_base = max(0, total_heures - seuil_heures_sup)
-            heures_sup_restantes = heures_sup_base
+        if heures_restantes > 0 and total_heures > contrat.seuil_heures_sup:
+            heures_sup_restantes = total_heures - contrat.seuil_heures_sup
 
-            for sup in config["heures_supplementaires"]:
+            for tranche_sup in contrat.supplementaires:
                 if heures_sup_restantes <= 0:
                     break
+                if total_heures <= tranche_sup.debut:
+                    continue
 
-                debut = sup["de"]
-                fin = sup["a"]
-                majoration = sup["majoration"]
-
-                if total_heures > debut:
-                    heures_dans_tranche = min(
-                        heures_sup_restantes,
-                        (fin if fin else total_heures) - max(debut, seuil_heures_sup),
+                heures_dans_tranche = min(
+                    heures_sup_restantes,
+                    (tranche_sup.fin if tranche_sup.fin else total_heures)
+                    - tranche_sup.debut_effectif,
+                )
+                if heures_dans_tranche > 0:
+                    taux_majore = taux_horaire * tranche_sup.multiplicateur
+                    salaire_tranche = heures_dans_tranche * taux_majore
+                    supplementaires.append(
+                        {
+                            "de": tranche_sup.debut,
+                            "a": tranche_sup.fin,
+                            "heures": heures_dans_tranche,
+                            "majoration": tranche_sup.majoration,
+                            "taux_majore": taux_majore,
+                            "salaire": salaire_tranche,
+                        }
                     )
-
-                    if heures_dans_tranche > 0:
-                        taux_majore = taux_horaire * (1 + majoration / 100)
-                        salaire_tranche = heures_dans_tranche * taux_majore
-
-                        result["heures_supplementaires"].append(
-                            {
-                                "de": debut,
-                                "a": fin,
-                                "heures": heures_dans_tranche,
-                                "majoration": majoration,
-                                "taux_majore": taux_majore,
-                                "salaire": salaire_tranche,
-                            }
-                        )
-
-                        result["salaire_supplementaire"] += salaire_tranche
-                        heures_sup_restantes -= heures_dans_tranche
-
-        # Calcul du salaire brut total
-        result["salaire_brut_total"] = (
-            result["salaire_normal"]
-            + result["salaire_complementaire"]
-            + result["salaire_complementaire_majore"]
-            + result["salaire_supplementaire"]
+                    salaire_sup += salaire_tranche
+                    heures_sup_restantes -= heures_dans_tranche
+
+        result = self._build_result(
+            contrat,
+            total_heures,
+            heures_contractuelles,
+            taux_horaire,
+            heures_normales,
+            salaire_normal,
         )
-
-        # Détail des heures supplémentaires pour affichage
-        result["detail_supplementaires"] = result["heures_supplementaires"]
-        result["total_heures_supplementaires"] = sum(
-            h["heures"] for h in result["heures_supplementaires"]
+        result.update(
+            {
+                "heures_complementaires": heures_comp,
+                "heures_complementaires_majorees": heures_comp_maj,
+                "heures_supplementaires": supplementaires,
+                "salaire_complementaire": salaire_comp,
+                "salaire_complementaire_majore": salaire_comp_maj,
+                "salaire_supplementaire": salaire_sup,
+                # Calcul du salaire brut total
+                "salaire_brut_total": salaire_normal
+                + salaire_comp
+                + salaire_comp_maj
+                + salaire_sup,
+                # Détail des heures supplémentaires pour affichage
+                "detail_supplementaires": supplementaires,
+                "total_heures_supplementaires": sum(
+                    h["heures"] for h in supplementaires
+                ),
+            }
         )
-
         return result
 
+    @staticmethod
+    def _build_result(
+        contrat: ContratCompile,
+        total_heures: float,
+        heures_contractuelles: float,
+        taux_horaire: float,
+        heures_normales: float,
+        salaire_normal: float,
+    ) -> Dict[str, Any]:
+        """Résultat de base, sans heures complémentaires ni supplémentaires"""
+        return {
+            "contrat": contrat.contrat,
+            "heures_contractuelles": heures_contractuelles,
+            "total_heures": total_heures,
+            "taux_horaire": taux_horaire,
+            "heures_normales": heures_normales,
+            "heures_complementaires": 0,
+            "heures_complementaires_majorees": 0,
+            "heures_supplementaires": [],
+            "salaire_normal": salaire_normal,
+            "salaire_complementaire": 0,
+            "salaire_complementaire_majore": 0,
+            "salaire_supplementaire": 0,
+            "salaire_brut_total": salaire_normal,
+            "detail_supplementaires": [],
+        }
+
     def _calculate_default_salary(
         self, total_heures: float, heures_contractuelles: float, taux_horaire: float
     ) -> Dict[str, Any]:
@@ -272,6 +401,189 @@ class SalaryCalculator:
             "total_heures_supplementaires": heures_sup,
         }
 
+    def calculate_salary_batch(
+        self,
+        total_heures: Union[float, Sequence[float]],
+        heures_contractuelles: Union[float, Sequence[float]],
+        taux_horaire: Union[float, Sequence[float]],
+    ) -> Dict[str, Any]:
+        """
+        Calcule le salaire pour un lot de semaines en une seule passe vectorisée
+
+        Les trois arguments sont des tableaux de même longueur (ou des scalaires
+        diffusés). Les résultats sont identiques à ceux de ``calculate_salary``
+        appelé ligne par ligne : mêmes opérations flottantes, dans le même ordre.
+
+        Returns:
+            Dict de colonnes (``BATCH_COLUMNS``) : tableaux NumPy si numpy est
+            installé, sinon listes calculées avec ``calculate_salary``
+        """
+        if np is None:
+            return self._calculate_salary_batch_scalar(
+                total_heures, heures_contractuelles, taux_horaire
+            )
+
+        heures, contrats, taux = np.broadcast_arrays(
+            np.asarray(total_heures, dtype=float),
+            np.asarray(heures_contractuelles, dtype=float),
+            np.asarray(taux_horaire, dtype=float),
+        )
+        heures, contrats, taux = heures.ravel(), contrats.ravel(), taux.ravel()
+        result = {colonne: np.zeros(heures.shape) for colonne in BATCH_COLUMNS}
+
+        for contrat in np.unique(contrats):
+            masque = contrats == contrat
+            contrat_compile = self._contrats.get(float(contrat))
+            if contrat_compile:
+                colonnes = self._calculate_contract_batch(
+                    heures[masque], taux[masque], contrat_compile
+                )
+            else:
+                colonnes = self._calculate_default_batch(
+                    heures[masque], float(contrat), taux[masque]
+                )
+            for colonne, valeurs in colonnes.items():
+                result[colonne][masque] = valeurs
+
+        return result
+
+    def _calculate_contract_batch(
+        self, total_heures, taux_horaire, contrat: ContratCompile
+    ) -> Dict[str, Any]:
+        """Version vectorisée de calculate_salary pour un contrat configuré"""
+        zeros = np.zeros(total_heures.shape)
+
+        # 1. Heures normales (contractuelles)
+        heures_normales = np.minimum(total_heures, contrat.heures_contractuelles)
+        salaire_normal = heures_normales * taux_horaire
+        heures_restantes = total_heures - heures_normales
+
+        # 2. Heures complémentaires (pour les contrats < 35h)
+        heures_comp, salaire_comp = zeros, zeros
+        heures_comp_maj, salaire_comp_maj = zeros, zeros
+        for tranche in contrat.complementaires:
+            fin_tranche = (
+                np.minimum(total_heures, tranche.fin) if tranche.fin else total_heures
+            )
+            heures_dans_tranche = np.minimum(
+                heures_restantes, fin_tranche - tranche.debut_effectif
+            )
+            actif = (
+                (heures_restantes > 0)
+                & (total_heures > tranche.debut)
+                & (heures_dans_tranche > 0)
+            )
+            heures = np.where(actif, heures_dans_tranche, 0.0)
+            salaire = np.where(
+                actif,
+                heures_dans_tranche * (taux_horaire * tranche.multiplicateur),
+                0.0,
+            )
+
+            if tranche.majoree:
+                heures_comp_maj = heures_comp_maj + heures
+                salaire_comp_maj = salaire_comp_maj + salaire
+            else:
+                heures_comp = heures_comp + heures
+                salaire_comp = salaire_comp + salaire
+
+            heures_restantes = np.where(
+                actif, heures_restantes - heures_dans_tranche, heures_restantes
+            )
+
+        # 3. Heures supplémentaires
+        seuil_heures_sup = contrat.seuil_heures_sup
+        actif_sup = (heures_restantes > 0) & (total_heures > seuil_heures_sup)
+        heures_sup_restantes = np.maximum(0, total_heures - seuil_heures_sup)
+        heures_sup, salaire_sup = zeros, zeros
+        for tranche_sup in contrat.supplementaires:
+            heures_dans_tranche = np.minimum(
+                heures_sup_restantes,
+                (tranche_sup.fin if tranche_sup.fin else total_heures)
+                - tranche_sup.debut_effectif,
+            )
+            actif = (
+                actif_sup
+                & (heures_sup_restantes > 0)
+                & (total_heures > tranche_sup.debut)
+                & (heures_dans_tranche > 0)
+            )
+            heures_sup = heures_sup + np.where(actif, heures_dans_tranche, 0.0)
+            salaire_sup = salaire_sup + np.where(
+                actif,
+                heures_dans_tranche * (taux_horaire * tranche_sup.multiplicateur),
+                0.0,
+            )
+            heures_sup_restantes = np.where(
+                actif, heures_sup_restantes - heures_dans_tranche, heures_sup_restantes
+            )
+
+        return {
+            "heures_normales": heures_normales,
+            "heures_complementaires": heures_comp,
+            "heures_complementaires_majorees": heures_comp_maj,
+            "total_heures_supplementaires": heures_sup,
+            "salaire_normal": salaire_normal,
+            "salaire_complementaire": salaire_comp,
+            "salaire_complementaire_majore": salaire_comp_maj,
+            "salaire_supplementaire": salaire_sup,
+            "salaire_brut_total": salaire_normal
+            + salaire_comp
+            + salaire_comp_maj
+            + salaire_sup,
+        }
+
+    def _calculate_default_batch(
+        self, total_heures, heures_contractuelles: float, taux_horaire
+    ) -> Dict[str, Any]:
+        """Version vectorisée de _calculate_default_salary"""
+        zeros = np.zeros(total_heures.shape)
+        heures_normales = np.minimum(total_heures, heures_contractuelles)
+        heures_sup = np.maximum(0, total_heures - heures_contractuelles)
+
+        salaire_normal = heures_normales * taux_horaire
+        salaire_sup = heures_sup * taux_horaire * 1.25  # 25% de majoration par défaut
+
+        return {
+            "heures_normales": heures_normales,
+            "heures_complementaires": zeros,
+            "heures_complementaires_majorees": zeros,
+            "total_heures_supplementaires": heures_sup,
+            "salaire_normal": salaire_normal,
+            "salaire_complementaire": zeros,
+            "salaire_complementaire_majore": zeros,
+            "salaire_supplementaire": salaire_sup,
+            "salaire_brut_total": salaire_normal + salaire_sup,
+        }
+
+    def _calculate_salary_batch_scalar(
+        self, total_heures, heures_contractuelles, taux_horaire
+    ) -> Dict[str, List[float]]:
+        """Calcul par lot sans numpy : boucle sur calculate_salary"""
+
+        def as_list(valeurs, taille: int) -> List[float]:
+            if isinstance(valeurs, (int, float)):
+                return [valeurs] * taille
+            return list(valeurs)
+
+        tailles = [
+            len(v)
+            for v in (total_heures, heures_contractuelles, taux_horaire)
+            if not isinstance(v, (int, float))
+        ]
+        taille = max(tailles) if tailles else 1
+
+        result: Dict[str, List[float]] = {colonne: [] for colonne in BATCH_COLUMNS}
+        for heures, contrat, taux in zip(
+            as_list(total_heures, taille),
+            as_list(heures_contractuelles, taille),
+            as_list(taux_horaire, taille),
+        ):
+            ligne = self.calculate_salary(heures, contrat, taux)
+            for colonne in BATCH_COLUMNS:
+                result[colonne].append(ligne.get(colonne, 0))
+        return result
+
     def get_available_contracts(self) -> List[Dict[str, Any]]:
         """Retourne la liste des contrats disponibles"""
         return [
@@ -4,11 +4,16 @@ Module de sécurité pour l'application Planning Pro
 
 import re
 import html
+import math
 import logging
 from functools import wraps
 from datetime import datetime
 from typing import Dict, Any, Optional, Union
 from flask import request, jsonify
+from flask_login import current_user
+from werkzeug.exceptions import TooManyRequests
+
+from .rate_limiter import rate_limiter
 
 
 # Configuration du logging de sécurité
@@ -201,18 +206,34 @@ def require_json(f: Any) -> Any:
     return decorated_function
 
 
+def _rate_limit_identity() -> str:
+    """Identité limitée : l'utilisateur connecté, sinon l'adresse IP"""
+    if current_user and current_user.is_authenticated:
+        return f"user:{current_user.get_id()}"
+    return f"ip:{request.remote_addr}"
+
+
 def rate_limit(max_requests: int = 100, window_seconds: int = 3600) -> Any:
-    """Décorateur simple de limitation de taux (rate limiting)"""
+    """Décorateur de limitation de taux (seau à jetons par route et identité)
+
+    Au-delà de ``max_requests`` requêtes par ``window_seconds``, la requête
+    est refusée avec une erreur 429 et un en-tête ``Retry-After``.
+    """
 
     def decorator(f: Any) -> Any:
         @wraps(f)
         def decorated_function(*args: Any, **kwargs: Any) -> Any:
-            # Implémentation basique - en production, utiliser Redis ou memcached
-            request.remote_addr
-            datetime.now()
-
-            # Pour cette implémentation, on accepte toutes les requêtes
-            # En production, implémenter un vrai rate limiting
+            identity = _rate_limit_identity()
+            result = rate_limiter.hit(
+                f"{request.endpoint}:{identity}", max_requests, window_seconds
+            )
+            if not result.allowed:
+                retry_after = max(1, math.ceil(result.retry_after))
+                log_security_event(
+                    "RATE_LIMIT_EXCEEDED",
+                    f"{request.endpoint} limited for {identity} ({retry_after}s)",
+                )
+                raise TooManyRequests(retry_after=retry_after)
             return f(*args, **kwargs)
 
         return decorated_function
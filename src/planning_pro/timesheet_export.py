@@ -0,0 +1,220 @@
+"""
+Export comptable en flux des feuilles d'heures (NDJSON ou CSV)
+
+Les lignes sont lues avec un curseur SQLite parcouru par paquets, puis
+écrites au fil de l'eau : la mémoire utilisée ne dépend pas du nombre de
+feuilles exportées et le premier octet est envoyé dès le premier paquet.
+
+Chaque feuille produit une ligne ``feuille`` (en-tête et agrégats de paie)
+suivie d'une ligne ``creneau`` par créneau travaillé. Les agrégats périmés
+(autres règles de calcul) sont recalculés feuille par feuille pendant le
+parcours, sans écriture en base.
+"""
+
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+from .database import DatabaseManager
+from .models import (
+    CreneauTravail,
+    FeuilleDHeures,
+    JourTravaille,
+    version_regles_salaire,
+)
+
+FORMATS_FLUX = ("ndjson", "csv")
+
+TYPES_MIME = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Colonnes communes aux deux formats (vides lorsque sans objet)
+COLONNES_EXPORT = (
+    "type",
+    "user_id",
+    "email",
+    "nom",
+    "prenom",
+    "feuille_id",
+    "annee",
+    "mois",
+    "taux_horaire",
+    "heures_contractuelles",
+    "total_heures",
+    "salaire_brut_total",
+    "salaire_net",
+    "date",
+    "heure_debut",
+    "heure_fin",
+    "duree_minutes",
+)
+
+# Lignes lues par paquet depuis le curseur SQLite
+TAILLE_PAQUET = 500
+
+# Taille approximative des morceaux envoyés au client
+TAILLE_MORCEAU = 64 * 1024
+
+_CHAMPS_FEUILLE = COLONNES_EXPORT[1:13]
+_CHAMPS_AGREGATS = ("total_heures", "salaire_brut_total", "salaire_net")
+
+
+def _recalculer_agregats(rows: List[Any]) -> Dict[str, Any]:
+    """Agrégats d'une feuille recalculés à partir de ses lignes (non persistés)"""
+    jours: List[JourTravaille] = []
+    jour_courant_id = None
+    for row in rows:
+        if row["jour_id"] is None:
+            continue
+        if row["jour_id"] != jour_courant_id:
+            jour_courant_id = row["jour_id"]
+            jours.append(JourTravaille(date=row["date"]))
+        if row["heure_debut"] is not None:
+            jours[-1].ajouter_creneau(row["heure_debut"], row["heure_fin"])
+
+    entete = rows[0]
+    resume = FeuilleDHeures(
+        id=entete["feuille_id"],
+        mois=entete["mois"],
+        annee=entete["annee"],
+        jours_travailles=jours,
+        taux_horaire=entete["taux_horaire"],
+        user_id=entete["user_id"],
+        heures_contractuelles=entete["heures_contractuelles"],
+    ).to_summary()
+    return {champ: resume[champ] for champ in _CHAMPS_AGREGATS}
+
+
+def _lignes_feuille(rows: List[Any], version: str) -> Iterator[Dict[str, Any]]:
+    """Ligne ``feuille`` puis lignes ``creneau`` des lignes JOIN d'une feuille"""
+    entete = rows[0]
+    ligne = {"type": "feuille"}
+    ligne.update((champ, entete[champ]) for champ in _CHAMPS_FEUILLE)
+    if entete["agregats_version"] != version:
+        ligne.update(_recalculer_agregats(rows))
+    yield ligne
+
+    for row in rows:
+        if row["heure_debut"] is not None:
+            creneau = CreneauTravail(row["heure_debut"], row["heure_fin"])
+            yield {
+                "type": "creneau",
+                "user_id": row["user_id"],
+                "feuille_id": row["feuille_id"],
+                "date": row["date"],
+                "heure_debut": row["heure_debut"],
+                "heure_fin": row["heure_fin"],
+                "duree_minutes": creneau.duree_minutes(),
+            }
+
+
+def iterer_lignes(
+    db: DatabaseManager, user_id: Optional[int] = None, annee: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Parcourt feuilles, jours et créneaux avec une seule requête JOIN
+
+    Les lignes d'une feuille sont regroupées avant d'être émises : la mémoire
+    utilisée est bornée par la plus grande feuille.
+
+    Args:
+        db: Base à lire (la connexion est conservée pendant le parcours)
+        user_id: Limite l'export à un utilisateur (tous si None)
+        annee: Limite l'export à une année
+    """
+    conditions, params = [], []
+    if user_id is not None:
+        conditions.append("f.user_id = ?")
+        params.append(user_id)
+    if annee is not None:
+        conditions.append("f.annee = ?")
+        params.append(annee)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    version = version_regles_salaire()
+
+    with db.get_connection() as conn:
+        cursor = conn.execute(
+            f"""SELECT f.id AS feuille_id, f.user_id, u.email, u.nom, u.prenom,
+                       f.annee, f.mois, f.taux_horaire, f.heures_contractuelles,
+                       f.total_heures, f.salaire_brut_total, f.salaire_net,
+                       f.agregats_version, j.id AS jour_id, j.date,
+                       c.heure_debut, c.heure_fin
+                FROM feuilles_heures f
+                JOIN users u ON u.id = f.user_id
+                LEFT JOIN jours_travailles j ON j.feuille_heures_id = f.id
+                LEFT JOIN creneaux_feuille c ON c.jour_travaille_id = j.id
+                {where}
+                ORDER BY f.user_id, f.annee, f.mois, j.date, j.id, c.id""",
+            tuple(params),
+        )
+        try:
+            feuille: List[Any] = []
+            while True:
+                paquet = cursor.fetchmany(TAILLE_PAQUET)
+                if not paquet:
+                    break
+                for row in paquet:
+                    if feuille and row["feuille_id"] != feuille[0]["feuille_id"]:
+                        yield from _lignes_feuille(feuille, version)
+                        feuille = []
+                    feuille.append(row)
+            if feuille:
+                yield from _lignes_feuille(feuille, version)
+        finally:
+            # Client déconnecté : la requête est finalisée avant de rendre
+            # la connexion au pool
+            cursor.close()
+
+
+def _par_morceaux(textes: Iterator[str]) -> Iterator[bytes]:
+    """Regroupe de petites chaînes en morceaux d'environ TAILLE_MORCEAU"""
+    morceau, taille = [], 0
+    for texte in textes:
+        morceau.append(texte)
+        taille += len(texte)
+        if taille >= TAILLE_MORCEAU:
+            yield "".join(morceau).encode("utf-8")
+            morceau, taille = [], 0
+    if morceau:
+        yield "".join(morceau).encode("utf-8")
+
+
+def flux_ndjson(lignes: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """Un objet JSON par ligne"""
+    return _par_morceaux(
+        json.dumps(ligne, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for ligne in lignes
+    )
+
+
+def flux_csv(lignes: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """CSV avec en-tête, colonnes COLONNES_EXPORT"""
+    tampon = io.StringIO()
+    writer = csv.DictWriter(tampon, fieldnames=COLONNES_EXPORT, lineterminator="\n")
+
+    def textes() -> Iterator[str]:
+        writer.writeheader()
+        for ligne in lignes:
+            writer.writerow(ligne)
+            yield tampon.getvalue()
+            tampon.seek(0)
+            tampon.truncate(0)
+        yield tampon.getvalue()
+
+    return _par_morceaux(textes())
+
+
+def flux_export(
+    format_export: str,
+    db: DatabaseManager,
+    user_id: Optional[int] = None,
+    annee: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Flux d'octets de l'export au format demandé"""
+    lignes = iterer_lignes(db, user_id=user_id, annee=annee)
+    if format_export == "csv":
+        return flux_csv(lignes)
+    return flux_ndjson(lignes)
@@ -0,0 +1,86 @@
+"""
+Tests pour la compression des réponses
+"""
+
+import gzip
+import pytest
+from flask import Flask, Response, jsonify
+from src.planning_pro import compression
+from src.planning_pro.compression import register_compression, variantes_etag
+
+CORPS = {"lignes": ["09:00-12:00"] * 200}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    register_compression(app, min_size=1024, mimetypes=["application/json"])
+
+    @app.route("/grand")
+    def grand():
+        response = jsonify(CORPS)
+        response.set_etag("abc")
+        return response
+
+    @app.route("/conditionnel")
+    def conditionnel():
+        return Response(status=304)
+
+    @app.route("/petit")
+    def petit():
+        return jsonify({"ok": True})
+
+    @app.route("/pdf")
+    def pdf():
+        return Response(b"%PDF" * 1000, mimetype="application/pdf")
+
+    return app.test_client()
+
+
+class TestCompression:
+    """Tests pour le hook de compression"""
+
+    def test_gzip_above_threshold(self, client, monkeypatch):
+        """Une réponse JSON volumineuse est compressée et son ETag suffixé"""
+        monkeypatch.setattr(compression, "brotli", None)
+
+        r = client.get("/grand", headers={"Accept-Encoding": "gzip"})
+
+        assert r.headers["Content-Encoding"] == "gzip"
+        assert r.headers["ETag"] == '"abc-gzip"'
+        assert "Accept-Encoding" in r.headers["Vary"]
+        assert gzip.decompress(r.data) == client.get("/grand").data
+
+    def test_brotli_preferred(self, client):
+        """brotli est préféré à gzip lorsqu'il est installé"""
+        brotli = pytest.importorskip("brotli")
+
+        r = client.get("/grand", headers={"Accept-Encoding": "gzip, br"})
+
+        assert r.headers["Content-Encoding"] == "br"
+        assert brotli.decompress(r.data) == client.get("/grand").data
+
+    def test_skipped_responses(self, client):
+        """Petites réponses, types non listés et clients sans gzip non compressés"""
+        assert (
+            "Content-Encoding"
+            not in client.get("/petit", headers={"Accept-Encoding": "gzip"}).headers
+        )
+        assert (
+            "Content-Encoding"
+            not in client.get("/pdf", headers={"Accept-Encoding": "gzip"}).headers
+        )
+        r = client.get("/grand")
+        assert "Content-Encoding" not in r.headers
+        assert r.headers["ETag"] == '"abc"'
+
+    def test_not_modified_varies(self, client):
+        """Une réponse 304 porte le même Vary que la réponse compressée"""
+        r = client.get("/conditionnel", headers={"Accept-Encoding": "gzip"})
+
+        assert r.status_code == 304
+        assert "Accept-Encoding" in r.headers["Vary"]
+
+    def test_etag_variants(self):
+        """Les variantes couvrent chaque encodage"""
+        assert variantes_etag("abc") == ["abc", "abc-br", "abc-gzip"]
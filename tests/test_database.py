@@ -0,0 +1,287 @@
+"""
+Tests pour le gestionnaire de base de données
+"""
+import threading
+import pytest
+import sqlite3
+from src.planning_pro.database import (
+    FEUILLE_AGGREGATE_COLUMNS,
+    DatabaseManager,
+    build_pragmas,
+)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Gestionnaire sur une base temporaire"""
+    manager = DatabaseManager(str(tmp_path / "planning.db"), pool_size=2)
+    yield manager
+    manager.pool.close_all()
+
+
+class TestConnectionPool:
+    """Tests pour le pool de connexions"""
+
+    def test_connections_are_reused(self, manager):
+        """Les requêtes successives réutilisent la même connexion"""
+        opened_before = manager.get_pool_stats()["opened"]
+
+        for _ in range(30):
+            manager.execute_query("SELECT * FROM users")
+
+        stats = manager.get_pool_stats()
+        assert stats["opened"] == opened_before
+        assert stats["reused"] >= 30
+
+    def test_connection_recycled_after_max_uses(self, tmp_path):
+        """Une connexion est fermée après max_uses emprunts"""
+        manager = DatabaseManager(str(tmp_path / "planning.db"), pool_max_uses=3)
+
+        for _ in range(6):
+            manager.execute_query("SELECT 1")
+
+        assert manager.get_pool_stats()["recycled"] >= 2
+
+    def test_unhealthy_connection_is_discarded(self, manager):
+        """Une connexion fermée n'est pas prêtée de nouveau"""
+        with manager.get_connection() as conn:
+            pass
+        conn.close()
+
+        rows = manager.execute_query("SELECT 1 AS valeur")
+
+        assert rows[0]["valeur"] == 1
+        assert manager.get_pool_stats()["discarded"] == 1
+
+    def test_pool_size_is_bounded(self, manager):
+        """Le nombre de connexions inactives ne dépasse pas pool_size"""
+        barrier = threading.Barrier(4)
+
+        def worker():
+            with manager.get_connection() as conn:
+                barrier.wait()
+                conn.execute("SELECT 1")
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert manager.get_pool_stats()["idle"] == 2
+
+    def test_uncommitted_transaction_rolled_back_on_release(self, manager):
+        """Une transaction non validée est annulée au retour dans le pool"""
+        with manager.get_connection() as conn:
+            conn.execute(
+                "INSERT INTO users (email, password_hash, nom, prenom, created_at) "
+                "VALUES ('a@b.fr', 'x', 'Nom', 'Prenom', '2025-01-01')"
+            )
+
+        assert manager.execute_query("SELECT * FROM users") == []
+
+
+class TestTransaction:
+    """Tests pour l'unité de travail transactionnelle"""
+
+    def test_commit_and_rows_written(self, manager):
+        """Les écritures sont validées ensemble et comptabilisées"""
+        with manager.transaction() as uow:
+            planning_id = uow.insert(
+                "INSERT INTO plannings (mois, annee, taux_horaire, user_id, created_at) "
+                "VALUES (1, 2025, 15.0, 1, '2025-01-01')"
+            )
+            uow.executemany(
+                "INSERT INTO jours_travail (planning_id, date) VALUES (?, ?)",
+                [(planning_id, "2025-01-02"), (planning_id, "2025-01-03")],
+            )
+
+        assert uow.rows_written == 3
+        assert len(manager.execute_query("SELECT * FROM jours_travail")) == 2
+
+    def test_rollback_on_error(self, manager):
+        """Une exception annule toutes les écritures de la transaction"""
+        with pytest.raises(RuntimeError):
+            with manager.transaction() as uow:
+                uow.execute(
+                    "INSERT INTO jours_travail (planning_id, date) VALUES (1, '2025-01-02')"
+                )
+                raise RuntimeError("échec")
+
+        assert manager.execute_query("SELECT * FROM jours_travail") == []
+
+
+class TestPragmaProfiles:
+    """Tests pour les profils de PRAGMA SQLite"""
+
+    def test_production_profile_applied_per_connection(self, tmp_path):
+        """Le profil production active WAL et les réglages associés"""
+        manager = DatabaseManager(
+            str(tmp_path / "planning.db"), pragmas=build_pragmas("production")
+        )
+
+        with manager.get_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+
+    def test_overrides_and_unknown_profile(self):
+        """Les surcharges définies, y compris 0, remplacent les valeurs du profil"""
+        pragmas = build_pragmas(
+            "production", busy_timeout=0, cache_size=None, wal_autocheckpoint=0
+        )
+
+        assert pragmas["busy_timeout"] == 0
+        assert pragmas["wal_autocheckpoint"] == 0
+        assert pragmas["cache_size"] == -20000
+        assert build_pragmas("default") == {}
+        with pytest.raises(ValueError):
+            build_pragmas("inconnu")
+
+
+class TestMigrations:
+    """Tests pour l'ajout des colonnes aux bases existantes"""
+
+    def test_aggregate_columns_added_to_existing_table(self, tmp_path):
+        """Une table feuilles_heures antérieure reçoit les colonnes d'agrégats"""
+        path = str(tmp_path / "ancienne.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            """CREATE TABLE feuilles_heures (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, mois INTEGER NOT NULL,
+                annee INTEGER NOT NULL, taux_horaire REAL NOT NULL,
+                user_id INTEGER NOT NULL, heures_contractuelles REAL DEFAULT 35.0,
+                created_at TEXT NOT NULL, UNIQUE(mois, annee, user_id))"""
+        )
+        conn.execute(
+            "INSERT INTO feuilles_heures (mois, annee, taux_horaire, user_id, "
+            "created_at) VALUES (3, 2025, 12.0, 1, '2025-03-01')"
+        )
+        conn.commit()
+        conn.close()
+
+        manager = DatabaseManager(path, pool_size=1)
+        colonnes = {
+            row["name"]
+            for row in manager.execute_query("PRAGMA table_info(feuilles_heures)")
+        }
+        ligne = manager.execute_query("SELECT * FROM feuilles_heures")[0]
+
+        assert set(FEUILLE_AGGREGATE_COLUMNS) <= colonnes
+        assert ligne["mois"] == 3
+        assert ligne["agregats_version"] is None
+        assert ligne["version"] == 1
+        assert manager.execute_query("SELECT version FROM change_sequence")[0][0] == 1
+        manager.pool.close_all()
+
+
+class TestRowVersionTriggers:
+    """Tests pour les triggers de version des tables enfants"""
+
+    def _feuille(self, manager):
+        with manager.transaction() as uow:
+            feuille_id = uow.insert(
+                "INSERT INTO feuilles_heures (mois, annee, taux_horaire, user_id, "
+                "created_at, version) VALUES (3, 2025, 12.0, 1, '2025-03-01', ?)",
+                (uow.next_version(),),
+            )
+        return feuille_id
+
+    def _version(self, manager, feuille_id):
+        return manager.execute_query(
+            "SELECT version FROM feuilles_heures WHERE id = ?", (feuille_id,)
+        )[0]["version"]
+
+    def test_child_writes_bump_parent(self, manager):
+        """Chaque écriture de jour ou de créneau incrémente la version parente"""
+        feuille_id = self._feuille(manager)
+        versions = [self._version(manager, feuille_id)]
+
+        jour_id = manager.execute_insert(
+            "INSERT INTO jours_travailles (feuille_heures_id, date) VALUES (?, ?)",
+            (feuille_id, "2025-03-03"),
+        )
+        versions.append(self._version(manager, feuille_id))
+        creneau_id = manager.execute_insert(
+            "INSERT INTO creneaux_feuille (jour_travaille_id, heure_debut, heure_fin)"
+            " VALUES (?, '09:00', '12:00')",
+            (jour_id,),
+        )
+        versions.append(self._version(manager, feuille_id))
+        manager.execute_update(
+            "UPDATE creneaux_feuille SET heure_fin = '12:30' WHERE id = ?",
+            (creneau_id,),
+        )
+        versions.append(self._version(manager, feuille_id))
+        manager.execute_delete(
+            "DELETE FROM creneaux_feuille WHERE id = ?", (creneau_id,)
+        )
+        versions.append(self._version(manager, feuille_id))
+
+        assert versions == sorted(set(versions))
+        assert manager.execute_query(
+            "SELECT updated_at FROM feuilles_heures WHERE id = ?", (feuille_id,)
+        )[0]["updated_at"].endswith("Z")
+
+    def test_latest_row_still_bumped(self, manager):
+        """La ligne la plus récemment modifiée est elle aussi incrémentée"""
+        feuille_id = self._feuille(manager)
+        avant = self._version(manager, feuille_id)
+
+        manager.execute_insert(
+            "INSERT INTO jours_travailles (feuille_heures_id, date) VALUES (?, ?)",
+            (feuille_id, "2025-03-03"),
+        )
+
+        assert self._version(manager, feuille_id) > avant
+
+    def _sequence(self, manager):
+        return manager.execute_query(
+            "SELECT version, triggers_paused FROM change_sequence"
+        )[0]
+
+    def test_tracked_row_versioned_once(self, manager):
+        """Une ligne suivie n'est versionnée qu'une fois, au commit"""
+        feuille_id = self._feuille(manager)
+        avant = self._sequence(manager)["version"]
+
+        with manager.transaction() as uow:
+            uow.track_version("feuilles_heures", feuille_id)
+            uow.executemany(
+                "INSERT INTO jours_travailles (feuille_heures_id, date) VALUES (?, ?)",
+                [(feuille_id, f"2025-03-{jour:02d}") for jour in range(3, 8)],
+            )
+            uow.execute(
+                "INSERT INTO creneaux_feuille (jour_travaille_id, heure_debut,"
+                " heure_fin) SELECT id, '09:00', '12:00' FROM jours_travailles"
+            )
+
+        sequence = self._sequence(manager)
+        assert sequence["version"] == avant + 1
+        assert sequence["triggers_paused"] == 0
+        assert self._version(manager, feuille_id) == avant + 1
+        assert uow.row_versions[("feuilles_heures", feuille_id)][0] == avant + 1
+        assert uow.rows_written == 11  # 5 jours, 5 créneaux et la version
+
+    def test_pause_rolled_back(self, manager):
+        """Une transaction annulée ne laisse pas les triggers suspendus"""
+        feuille_id = self._feuille(manager)
+
+        with pytest.raises(RuntimeError):
+            with manager.transaction() as uow:
+                uow.pause_version_triggers()
+                uow.execute(
+                    "INSERT INTO jours_travailles (feuille_heures_id, date)"
+                    " VALUES (?, ?)",
+                    (feuille_id, "2025-03-03"),
+                )
+                raise RuntimeError("échec")
+
+        assert self._sequence(manager)["triggers_paused"] == 0
+        avant = self._version(manager, feuille_id)
+        manager.execute_insert(
+            "INSERT INTO jours_travailles (feuille_heures_id, date) VALUES (?, ?)",
+            (feuille_id, "2025-03-04"),
+        )
+        assert self._version(manager, feuille_id) > avant
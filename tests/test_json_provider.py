@@ -0,0 +1,71 @@
+"""
+Tests pour le fournisseur JSON de l'application
+"""
+
+import json
+from datetime import datetime
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from src.planning_pro import json_provider
+from src.planning_pro.json_provider import PlanningJSONProvider
+from src.planning_pro.models import FeuilleDHeures, JourTravaille
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    with app.app_context():
+        yield app
+
+
+def _feuille():
+    jour = JourTravaille(date="2025-03-03")
+    jour.ajouter_creneau("09:00", "17:30")
+    return FeuilleDHeures(
+        mois=3, annee=2025, jours_travailles=[jour], taux_horaire=12.5, user_id=1
+    )
+
+
+class TestPlanningJSONProvider:
+    """Tests pour la sérialisation rapide et son repli"""
+
+    @pytest.mark.parametrize("fast", [True, False])
+    def test_same_content_as_stdlib(self, app, fast):
+        """Le contenu est identique à celui du fournisseur par défaut"""
+        payload = {
+            "feuilles": [_feuille().to_dict()],
+            "date": datetime(2025, 3, 3, 12, 0),
+            "texte": "Février",
+        }
+        provider = PlanningJSONProvider(app, fast=fast)
+
+        attendu = json.loads(DefaultJSONProvider(app).response(payload).get_data())
+        response = provider.response(payload)
+
+        assert response.mimetype == "application/json"
+        assert json.loads(response.get_data()) == attendu
+        assert json.loads(provider.dumps(payload)) == attendu
+
+    def test_models_serialized_directly(self, app):
+        """Les modèles exposant __json__ sont acceptés tels quels"""
+        feuille = _feuille()
+        provider = PlanningJSONProvider(app)
+
+        assert json.loads(provider.dumps([feuille])) == [
+            json.loads(provider.dumps(feuille.to_dict()))
+        ]
+
+    def test_stdlib_fallback_without_orjson(self, app, monkeypatch):
+        """Sans orjson, la bibliothèque standard est utilisée"""
+        monkeypatch.setattr(json_provider, "_ORJSON_DISPONIBLE", False)
+        provider = PlanningJSONProvider(app)
+
+        assert not provider.fast
+        assert provider.dumps({"b": 1, "a": _feuille()}).startswith('{"a": {')
+
+    def test_unsupported_value_falls_back(self, app):
+        """Un entier hors limites d'orjson est sérialisé par la bibliothèque standard"""
+        provider = PlanningJSONProvider(app)
+
+        assert json.loads(provider.response({"n": 2**70}).get_data()) == {"n": 2**70}
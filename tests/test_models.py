@@ -1,9 +1,13 @@
 """
 Tests pour les modèles de données
 """
+import bcrypt
+import json
 import pytest
 from datetime import datetime
 from src.planning_pro.models import User, Planning, CreneauTravail, JourTravaille, FeuilleDHeures
+from src.planning_pro.models import decoder_curseur, encoder_curseur, version_regles_salaire
+from src.planning_pro.models import suppressions_depuis, version_courante
 from src.planning_pro.database import DatabaseManager
 
 
@@ -250,4 +254,834 @@ class TestJourTravaille:
             ]
         )
         
-        assert jour.calculate_total_hours() == 7.0
\ No newline at end of file
+        assert jour.calculate_total_hours() == 7.0
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Base temporaire utilisée par les modèles"""
+    from src.planning_pro import models
+
+    manager = DatabaseManager(str(tmp_path / "planning.db"))
+    monkeypatch.setattr(models, "db_manager", manager)
+    return manager
+
+
+def _creer_feuille(user_id, mois, annee=2025, nb_jours=20):
+    """Crée et sauvegarde une feuille d'heures de test"""
+    jours = []
+    for jour_num in range(1, nb_jours + 1):
+        jour = JourTravaille(date=f"{annee}-{mois:02d}-{jour_num:02d}")
+        jour.ajouter_creneau("09:00", "12:00")
+        jour.ajouter_creneau("13:00", "17:00")
+        jours.append(jour)
+    feuille = FeuilleDHeures(
+        mois=mois,
+        annee=annee,
+        jours_travailles=jours,
+        taux_horaire=15.0,
+        user_id=user_id,
+    )
+    feuille.save()
+    return feuille
+
+
+class TestBatchLoading:
+    """Tests pour le chargement groupé des plannings et feuilles"""
+
+    def test_feuilles_get_by_user_fixed_query_count(self, temp_db, monkeypatch):
+        """Le nombre de requêtes ne dépend pas du nombre de jours"""
+        for mois in range(1, 13):
+            _creer_feuille(user_id=1, mois=mois)
+
+        requetes = []
+        execute_query = temp_db.execute_query
+
+        def compter(query, params=()):
+            requetes.append(query)
+            return execute_query(query, params)
+
+        monkeypatch.setattr(temp_db, "execute_query", compter)
+        feuilles = FeuilleDHeures.get_by_user(1)
+
+        assert len(feuilles) == 12
+        assert len(requetes) == 2
+        assert [f.mois for f in feuilles] == list(range(12, 0, -1))
+        assert all(len(f.jours_travailles) == 20 for f in feuilles)
+        assert feuilles[0].calculer_total_heures() == 140.0
+
+    def test_planning_round_trip(self, temp_db):
+        """Un planning rechargé conserve ses jours et créneaux dans l'ordre"""
+        jours_travail = [
+            {
+                "date": "2025-01-15",
+                "creneaux": [
+                    {"heure_debut": "09:00", "heure_fin": "12:00"},
+                    {"heure_debut": "13:00", "heure_fin": "17:00"},
+                ],
+            },
+            {"date": "2025-01-16", "creneaux": []},
+        ]
+        planning = Planning(
+            mois=1,
+            annee=2025,
+            jours_travail=jours_travail,
+            taux_horaire=15.0,
+            user_id=1,
+        )
+        planning.save()
+
+        charge = Planning.get_by_id(planning.id)
+
+        assert charge.jours_travail == jours_travail
+        assert Planning.get_by_user(2) == []
+
+    def test_days_loaded_in_date_order(self, temp_db):
+        """Les jours saisis dans le désordre sont rechargés par date"""
+        dates = ["2025-03-12", "2025-03-03", "2025-03-07", "2025-03-03"]
+        jours = []
+        for numero, date in enumerate(dates):
+            jour = JourTravaille(date=date)
+            jour.ajouter_creneau(f"{8 + numero:02d}:00", "12:00")
+            jours.append(jour)
+        feuille = FeuilleDHeures(
+            mois=3, annee=2025, jours_travailles=jours, taux_horaire=15.0, user_id=1
+        )
+        feuille.save()
+        planning = Planning(
+            3,
+            2025,
+            [{"date": date, "creneaux": []} for date in dates],
+            15.0,
+            user_id=1,
+        )
+        planning.save()
+
+        charge = FeuilleDHeures.get_by_id(feuille.id)
+
+        # Même date : ordre de saisie conservé
+        ordre = [(j.date, j.creneaux[0].heure_debut) for j in charge.jours_travailles]
+        assert ordre == [
+            ("2025-03-03", "09:00"),
+            ("2025-03-03", "11:00"),
+            ("2025-03-07", "10:00"),
+            ("2025-03-12", "08:00"),
+        ]
+        assert [j["date"] for j in Planning.get_by_id(planning.id).jours_travail] == (
+            sorted(dates)
+        )
+
+
+class TestTransactionalSave:
+    """Tests pour la sauvegarde transactionnelle"""
+
+    def test_save_is_single_transaction(self, temp_db, monkeypatch):
+        """La sauvegarde d'un mois complet n'ouvre qu'une transaction"""
+        transactions = []
+        transaction = temp_db.transaction
+
+        def compter():
+            transactions.append(1)
+            return transaction()
+
+        monkeypatch.setattr(temp_db, "transaction", compter)
+        feuille = _creer_feuille(user_id=1, mois=3, nb_jours=28)
+
+        assert len(transactions) == 1
+        assert FeuilleDHeures.get_by_id(feuille.id).calculer_total_heures() == 196.0
+
+    def test_failed_update_leaves_previous_state(self, temp_db):
+        """Une erreur pendant la sauvegarde annule toute la transaction"""
+        feuille = _creer_feuille(user_id=1, mois=3, nb_jours=5)
+
+        feuille.jours_travailles.append(JourTravaille(date=None))
+        with pytest.raises(Exception):
+            feuille.save()
+
+        recharge = FeuilleDHeures.get_by_id(feuille.id)
+        assert len(recharge.jours_travailles) == 5
+        assert recharge.calculer_total_heures() == 35.0
+
+    def test_planning_update_replaces_slots(self, temp_db):
+        """La mise à jour d'un planning ne laisse pas de créneaux orphelins"""
+        planning = Planning(
+            mois=1,
+            annee=2025,
+            jours_travail=[
+                {
+                    "date": "2025-01-15",
+                    "creneaux": [{"heure_debut": "09:00", "heure_fin": "12:00"}],
+                }
+            ],
+            taux_horaire=15.0,
+            user_id=1,
+        )
+        planning.save()
+        planning.jours_travail = []
+        planning.save()
+
+        assert temp_db.execute_query("SELECT * FROM creneaux_travail") == []
+        assert Planning.get_by_id(planning.id).jours_travail == []
+
+
+class TestDiffSave:
+    """Tests pour la sauvegarde différentielle"""
+
+    def test_single_slot_edit_touches_one_row(self, temp_db):
+        """Modifier un créneau n'écrit qu'une seule ligne"""
+        feuille = _creer_feuille(user_id=1, mois=3, nb_jours=20)
+        ids_avant = temp_db.execute_query("SELECT id FROM jours_travailles")
+
+        feuille = FeuilleDHeures.get_by_id(feuille.id)
+        feuille.jours_travailles[4].creneaux[1] = CreneauTravail("13:00", "18:00")
+        feuille.save()
+
+        assert feuille.statistiques_sauvegarde == {
+            "insertions": 0,
+            "mises_a_jour": 1,
+            "suppressions": 0,
+            "lignes_ecrites": 3,  # Le créneau, les agrégats et la version
+        }
+        assert temp_db.execute_query("SELECT id FROM jours_travailles") == ids_avant
+        assert FeuilleDHeures.get_by_id(feuille.id).calculer_total_heures() == 141.0
+
+    def test_unchanged_save_writes_nothing(self, temp_db):
+        """Sauvegarder un objet inchangé n'écrit aucune ligne"""
+        feuille = _creer_feuille(user_id=1, mois=3, nb_jours=5)
+
+        feuille.save()
+
+        assert feuille.statistiques_sauvegarde["lignes_ecrites"] == 0
+
+    def test_added_and_removed_days(self, temp_db):
+        """Les jours ajoutés et retirés sont insérés et supprimés"""
+        planning = Planning(
+            mois=1,
+            annee=2025,
+            jours_travail=[
+                {
+                    "date": "2025-01-02",
+                    "creneaux": [{"heure_debut": "09:00", "heure_fin": "12:00"}],
+                },
+                {
+                    "date": "2025-01-03",
+                    "creneaux": [{"heure_debut": "09:00", "heure_fin": "12:00"}],
+                },
+            ],
+            taux_horaire=15.0,
+            user_id=1,
+        )
+        planning.save()
+
+        planning.jours_travail = [
+            planning.jours_travail[1],
+            {
+                "date": "2025-01-06",
+                "creneaux": [{"heure_debut": "14:00", "heure_fin": "18:00"}],
+            },
+        ]
+        planning.taux_horaire = 16.0
+        planning.save()
+
+        assert planning.statistiques_sauvegarde == {
+            "insertions": 2,
+            "mises_a_jour": 0,
+            "suppressions": 2,
+            "lignes_ecrites": 6,  # Dont l'en-tête et la version du planning
+        }
+        recharge = Planning.get_by_id(planning.id)
+        assert recharge.taux_horaire == 16.0
+        assert [jour["date"] for jour in recharge.jours_travail] == [
+            "2025-01-03",
+            "2025-01-06",
+        ]
+        assert len(temp_db.execute_query("SELECT * FROM creneaux_travail")) == 2
+
+
+class TestCreneauMinutes:
+    """Tests pour la représentation en minutes des créneaux"""
+
+    def test_minutes_match_strptime_duration(self):
+        """La durée entière correspond au calcul par datetime"""
+        from datetime import timedelta
+
+        for debut, fin in [
+            ("09:00", "12:00"),
+            ("09:30", "12:15"),
+            ("23:00", "02:00"),
+            ("08:00", "08:00"),
+            ("0:05", "23:59"),
+        ]:
+            creneau = CreneauTravail(debut, fin)
+            d = datetime.strptime(f"2025-01-15 {debut}", "%Y-%m-%d %H:%M")
+            f = datetime.strptime(f"2025-01-15 {fin}", "%Y-%m-%d %H:%M")
+            if f <= d:
+                f += timedelta(days=1)
+
+            assert creneau.calculer_heures("2025-01-15") == (f - d).total_seconds() / 3600
+
+    def test_setter_reparses_and_rejects_invalid(self):
+        """Modifier une heure recalcule les minutes, une heure invalide échoue"""
+        creneau = CreneauTravail("09:00", "12:00")
+        creneau.heure_debut = "10:30"
+
+        assert creneau.debut_minutes == 630
+        assert creneau.duree_minutes() == 90
+        for invalide in ("24:00", "12:60", "midi", "12h30", ""):
+            with pytest.raises(ValueError):
+                CreneauTravail(invalide, "12:00")
+
+    def test_slots(self):
+        """Les créneaux et jours n'ont pas de __dict__"""
+        jour = JourTravaille("2025-01-15")
+        jour.ajouter_creneau("09:00", "12:00")
+
+        assert not hasattr(jour, "__dict__")
+        assert not hasattr(jour.creneaux[0], "__dict__")
+        assert jour.to_dict()["heures"] == 3.0
+
+
+class TestDerivedCache:
+    """Tests pour le cache des valeurs dérivées des feuilles d'heures"""
+
+    def _feuille(self):
+        jours = []
+        for jour_num in range(1, 15):
+            jour = JourTravaille(date=f"2025-01-{jour_num:02d}")
+            jour.ajouter_creneau("09:00", "17:30")
+            jours.append(jour)
+        return FeuilleDHeures(
+            mois=1, annee=2025, jours_travailles=jours, taux_horaire=12.0, user_id=1
+        )
+
+    def test_to_dict_computes_salary_once(self, monkeypatch):
+        """Chaque semaine n'est calculée qu'une fois, même sur plusieurs appels"""
+        from src.planning_pro.salary_calculator import salary_calculator
+
+        appels = []
+        calculate_salary = salary_calculator.calculate_salary
+
+        def compter(*args):
+            appels.append(args)
+            return calculate_salary(*args)
+
+        monkeypatch.setattr(salary_calculator, "calculate_salary", compter)
+        feuille = self._feuille()
+
+        premier = feuille.to_dict()
+        second = feuille.to_dict()
+
+        assert len(appels) == 3  # 3 semaines calendaires
+        assert premier == second
+        assert premier["total_heures"] == 14 * 8.5
+
+    def test_mutation_invalidates_cache(self):
+        """Ajouter un créneau ou changer le taux recalcule les totaux"""
+        feuille = self._feuille()
+        brut = feuille.calculer_salaire()["salaire_brut_total"]
+
+        feuille.jours_travailles[0].ajouter_creneau("18:00", "20:00")
+        assert feuille.calculer_total_heures() == 14 * 8.5 + 2
+        assert feuille.calculer_salaire()["salaire_brut_total"] > brut
+
+        feuille.taux_horaire = 24.0
+        assert feuille.to_dict()["calcul_salaire"]["taux_horaire"] == 24.0
+
+        feuille.jours_travailles[1].creneaux[0].heure_fin = "18:30"
+        assert feuille.calculer_total_heures() == 14 * 8.5 + 3
+
+
+class TestFeuilleDelete:
+    """Tests pour la suppression d'une feuille et l'invalidation du cache PDF"""
+
+    def test_delete_removes_children_and_cache(self, temp_db, tmp_path, monkeypatch):
+        """Les jours, créneaux et PDF en cache sont supprimés"""
+        from src.planning_pro import models
+        from src.planning_pro.pdf_cache import PDFCache
+
+        cache = PDFCache(str(tmp_path / "pdf_cache"), max_bytes=10_000)
+        monkeypatch.setattr(models, "pdf_cache", cache)
+        feuille = _creer_feuille(user_id=1, mois=1)
+        feuille_id = feuille.id
+        cache.put(feuille_id, "cle", b"%PDF")
+
+        feuille.delete()
+
+        assert cache.get(feuille_id, "cle") is None
+        assert FeuilleDHeures.get_by_id(feuille_id) is None
+        assert temp_db.execute_query("SELECT * FROM jours_travailles") == []
+        assert temp_db.execute_query("SELECT * FROM creneaux_feuille") == []
+
+    def test_save_invalidates_cache(self, temp_db, tmp_path, monkeypatch):
+        """Une sauvegarde qui modifie la feuille invalide son PDF"""
+        from src.planning_pro import models
+        from src.planning_pro.pdf_cache import PDFCache
+
+        cache = PDFCache(str(tmp_path / "pdf_cache"), max_bytes=10_000)
+        monkeypatch.setattr(models, "pdf_cache", cache)
+        feuille = _creer_feuille(user_id=1, mois=1)
+        cache.put(feuille.id, "cle", b"%PDF")
+
+        feuille.save()  # Aucun changement : le PDF reste valide
+        assert cache.get(feuille.id, "cle") == b"%PDF"
+
+        feuille.taux_horaire = 16.0
+        feuille.save()
+        assert cache.get(feuille.id, "cle") is None
+
+
+class TestUserCache:
+    """Tests pour le cache d'identité des utilisateurs"""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        from src.planning_pro import models
+
+        horloge = [1000.0]
+        cache = models.IdentityCache(maxsize=2, ttl=30, clock=lambda: horloge[0])
+        cache.horloge = horloge
+        monkeypatch.setattr(models, "user_cache", cache)
+        return cache
+
+    def _creer_user(self, email="cache@example.com"):
+        user = User(email=email, password="", nom="Dupont", prenom="Jean")
+        user.password_hash = "hash"  # Évite le coût de bcrypt
+        user.save()
+        return user
+
+    def test_hit_without_query(self, temp_db, cache, monkeypatch):
+        """Le second chargement ne touche pas la base"""
+        user = self._creer_user()
+        User.get_cached(user.id)
+
+        monkeypatch.setattr(
+            temp_db, "execute_query", lambda *a: pytest.fail("requête inattendue")
+        )
+        charge = User.get_cached(user.id)
+
+        assert charge.email == user.email
+        assert charge is not User.get_cached(user.id)
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 1
+
+    def test_invalidated_on_save(self, temp_db, cache):
+        """Une sauvegarde invalide l'entrée du cache"""
+        user = self._creer_user()
+        User.get_cached(user.id)
+
+        user.nom = "Martin"
+        user.save()
+
+        assert User.get_cached(user.id).nom == "Martin"
+
+    def test_ttl_and_lru(self, temp_db, cache):
+        """Les entrées expirent après le TTL et la taille est bornée"""
+        users = [self._creer_user(f"u{i}@example.com") for i in range(3)]
+        for user in users:
+            User.get_cached(user.id)
+
+        assert cache.stats()["size"] == 2
+        assert cache.stats()["evictions"] == 1
+
+        cache.horloge[0] += 31
+        assert cache.get(users[2].id) is None
+
+
+class TestPasswordRehash:
+    """Tests pour le recalcul du hachage au coût cible"""
+
+    @pytest.fixture
+    def hasher(self, monkeypatch):
+        from src.planning_pro import models
+        from src.planning_pro.password_hashing import PasswordHasher
+
+        hasher = PasswordHasher(rounds=4, max_workers=1, max_pending=1)
+        monkeypatch.setattr(models, "password_hasher", hasher)
+        return hasher
+
+    def _creer_user(self, rounds):
+        user = User(
+            email="rehash@example.com", password="", nom="Dupont", prenom="Jean"
+        )
+        user.password_hash = bcrypt.hashpw(
+            b"secret123", bcrypt.gensalt(rounds=rounds)
+        ).decode("utf-8")
+        user.save()
+        return user
+
+    def test_rehash_on_successful_login(self, temp_db, hasher):
+        """Un hachage d'un autre coût est remplacé après connexion réussie"""
+        user = self._creer_user(rounds=5)
+
+        assert user.check_password("secret123")
+
+        stocke = User.get_by_id(user.id).password_hash
+        assert stocke.startswith("$2b$04$")
+        assert stocke == user.password_hash
+        assert User.get_by_id(user.id).check_password("secret123")
+
+    def test_no_rehash_on_failure_or_target_cost(self, temp_db, hasher):
+        """Ni échec de connexion ni coût déjà à la cible ne réécrivent le hachage"""
+        user = self._creer_user(rounds=5)
+        initial = user.password_hash
+
+        assert not user.check_password("mauvais")
+        assert User.get_by_id(user.id).password_hash == initial
+
+        hasher.rounds = 5
+        assert user.check_password("secret123")
+        assert User.get_by_id(user.id).password_hash == initial
+
+    def test_cost_distribution(self, temp_db):
+        """La répartition compte les utilisateurs par coût"""
+        self._creer_user(rounds=4)
+        inconnu = User(email="autre@example.com", password="", nom="A", prenom="B")
+        inconnu.password_hash = "hash"
+        inconnu.save()
+
+        assert User.password_cost_distribution() == {4: 1, None: 1}
+
+
+class TestPagination:
+    """Tests pour la pagination par curseur des listes"""
+
+    def test_keyset_pages_cover_all_feuilles(self, temp_db):
+        """Les pages successives couvrent toutes les feuilles sans doublon"""
+        for annee, mois in [(2024, 11), (2024, 12), (2025, 1), (2025, 2), (2025, 3)]:
+            _creer_feuille(1, mois, annee=annee, nb_jours=1)
+        _creer_feuille(2, 4, nb_jours=1)
+
+        pages, cursor = [], None
+        while True:
+            page = FeuilleDHeures.get_by_user(1, limit=2, cursor=cursor)
+            if not page:
+                break
+            pages.append([(f.annee, f.mois) for f in page])
+            cursor = encoder_curseur(page[-1].annee, page[-1].mois)
+
+        assert pages == [
+            [(2025, 3), (2025, 2)],
+            [(2025, 1), (2024, 12)],
+            [(2024, 11)],
+        ]
+        assert FeuilleDHeures.count_by_user(1) == 5
+        assert len(FeuilleDHeures.get_by_user(1)) == 5
+
+    def test_planning_cursor(self, temp_db):
+        """Le curseur exclut le planning de référence et les plus récents"""
+        for mois in (1, 2, 3):
+            Planning(mois, 2025, [], 15.0, user_id=1).save()
+
+        suite = Planning.get_by_user(1, limit=5, cursor="2025-02")
+
+        assert [p.mois for p in suite] == [1]
+        assert Planning.count_by_user(1) == 3
+
+    def test_pagination_uses_period_index(self, temp_db):
+        """La page est lue dans l'ordre de l'index, sans tri temporaire"""
+        plan = temp_db.execute_query(
+            "EXPLAIN QUERY PLAN SELECT * FROM feuilles_heures WHERE user_id = ?"
+            " AND (annee, mois) < (?, ?) ORDER BY annee DESC, mois DESC LIMIT ?",
+            (1, 2025, 1, 10),
+        )
+        details = " ".join(row["detail"] for row in plan)
+
+        assert "idx_feuilles_user_periode" in details
+        assert "TEMP B-TREE" not in details
+
+    def test_export_selection(self, temp_db):
+        """La sélection d'export ne lit que les feuilles demandées"""
+        for annee, mois in [(2025, 3), (2024, 12), (2025, 1)]:
+            _creer_feuille(1, mois, annee=annee, nb_jours=1)
+        autre = _creer_feuille(2, 2, annee=2025, nb_jours=1)
+
+        rows = FeuilleDHeures.select_rows(1, annee=2025)
+        feuilles = list(FeuilleDHeures.iter_from_rows(rows))
+
+        assert FeuilleDHeures.count_selection(1, annee=2025) == 2
+        assert [(f.annee, f.mois) for f in feuilles] == [(2025, 1), (2025, 3)]
+        assert all(len(f.jours_travailles) == 1 for f in feuilles)
+        # Les IDs d'un autre utilisateur sont ignorés
+        assert FeuilleDHeures.count_selection(1, ids=[autre.id]) == 0
+        assert FeuilleDHeures.count_selection(1, ids=[feuilles[0].id]) == 1
+
+    def test_invalid_cursor(self):
+        """Un curseur mal formé est refusé"""
+        with pytest.raises(ValueError):
+            decoder_curseur("2025-13")
+        with pytest.raises(ValueError, match="^curseur invalide$"):
+            decoder_curseur("abc")
+        with pytest.raises(ValueError, match="^curseur invalide$"):
+            decoder_curseur("2025-1x")
+        assert decoder_curseur("2025-01") == (2025, 1)
+
+
+class TestSummaryView:
+    """Tests pour la vue résumée des listes"""
+
+    def test_feuille_summary_matches_full_view(self, temp_db):
+        """Les chiffres résumés sont ceux de la vue complète"""
+        feuille = FeuilleDHeures.get_by_id(_creer_feuille(1, 3).id)
+
+        resume = feuille.to_summary()
+        complet = feuille.to_dict()
+
+        assert tuple(resume) == FeuilleDHeures.CHAMPS_RESUME
+        assert resume["total_heures"] == complet["total_heures"]
+        assert (
+            resume["salaire_brut_total"]
+            == complet["calcul_salaire"]["salaire_brut_total"]
+        )
+
+    def test_planning_summary_counts(self):
+        """Le résumé d'un planning compte ses jours et créneaux"""
+        jours = [
+            {
+                "date": "2025-03-03",
+                "creneaux": [{"heure_debut": "09:00", "heure_fin": "12:00"}],
+            },
+            {"date": "2025-03-04", "creneaux": []},
+        ]
+        resume = Planning(3, 2025, jours, 15.0, user_id=1).to_summary()
+
+        assert tuple(resume) == Planning.CHAMPS_RESUME
+        assert (resume["nb_jours"], resume["nb_creneaux"]) == (2, 1)
+
+
+class TestPersistedAggregates:
+    """Tests pour les agrégats persistés des feuilles d'heures"""
+
+    def test_save_persists_aggregates(self, temp_db):
+        """Les agrégats en base correspondent aux valeurs calculées"""
+        feuille = _creer_feuille(1, 3)
+        ligne = temp_db.execute_query(
+            "SELECT * FROM feuilles_heures WHERE id = ?", (feuille.id,)
+        )[0]
+
+        resume = feuille.to_summary()
+        assert ligne["total_heures"] == resume["total_heures"]
+        assert ligne["salaire_brut_total"] == resume["salaire_brut_total"]
+        assert ligne["salaire_net"] == resume["salaire_net"]
+        assert json.loads(ligne["semaines_heures"]) == feuille._regrouper_par_semaine()
+        assert ligne["agregats_version"] == version_regles_salaire()
+
+    def test_summaries_read_without_loading_days(self, temp_db, monkeypatch):
+        """Des agrégats à jour sont lus sans charger les jours ni recalculer"""
+        feuilles = [_creer_feuille(1, mois) for mois in (1, 2, 3)]
+        attendus = [f.to_summary() for f in reversed(feuilles)]
+        monkeypatch.setattr(
+            FeuilleDHeures, "from_rows", classmethod(lambda cls, rows: list(rows))
+        )
+
+        assert FeuilleDHeures.summaries_by_user(1) == attendus
+
+    def test_rules_change_recomputed_on_read_without_write(
+        self, temp_db, monkeypatch
+    ):
+        """Des agrégats d'une autre version sont recalculés, sans écriture"""
+        from src.planning_pro import models
+
+        feuille = _creer_feuille(1, 3)
+        temp_db.execute_update("UPDATE feuilles_heures SET total_heures = 0")
+        monkeypatch.setattr(models, "version_regles_salaire", lambda: "nouvelles")
+        version = version_courante()
+
+        resume = FeuilleDHeures.summaries_by_user(1)[0]
+
+        ligne = temp_db.execute_query(
+            "SELECT agregats_version, total_heures FROM feuilles_heures WHERE id = ?",
+            (feuille.id,),
+        )[0]
+        assert resume == feuille.to_summary()
+        assert ligne["agregats_version"] != "nouvelles"
+        assert ligne["total_heures"] == 0
+        assert version_courante() == version
+
+    def test_corrected_totals_bump_version(self, temp_db, monkeypatch):
+        """Des totaux corrigés donnent une nouvelle version, visible par la sync"""
+        from src.planning_pro import models
+
+        feuilles = [_creer_feuille(1, mois, nb_jours=2) for mois in (3, 4)]
+        temp_db.execute_update("UPDATE feuilles_heures SET total_heures = 0")
+        monkeypatch.setattr(models, "version_regles_salaire", lambda: "nouvelles")
+        since = version_courante()
+
+        assert FeuilleDHeures.changed_since(1, since, 10) == []
+        assert FeuilleDHeures.refresh_aggregates(user_id=1) == 2
+
+        modifiees = FeuilleDHeures.changed_since(1, since, 10, summary=True)
+        assert {f["id"] for f in modifiees} == {f.id for f in feuilles}
+        assert [f["total_heures"] for f in modifiees] == [14.0, 14.0]
+
+    def test_rules_tag_only_keeps_version(self, temp_db, monkeypatch):
+        """Un changement de règles sans effet sur les montants ne versionne pas"""
+        from src.planning_pro import models
+
+        feuille = _creer_feuille(1, 3, nb_jours=2)
+        monkeypatch.setattr(models, "version_regles_salaire", lambda: "nouvelles")
+
+        assert FeuilleDHeures.refresh_aggregates(user_id=1) == 1
+        assert FeuilleDHeures.get_by_id(feuille.id).version == feuille.version
+
+    def test_rules_version_ignores_runtime_contracts(self, monkeypatch):
+        """Un contrat enregistré dans un seul worker ne change pas la version"""
+        from src.planning_pro import salary_calculator as module
+
+        avant = version_regles_salaire()
+        calculateur = module.SalaryCalculator()
+        monkeypatch.setattr(module, "salary_calculator", calculateur)
+        config = dict(module.SALARY_CONFIG[0], heures_contractuelles=28.0)
+        calculateur.register_contract(config)
+
+        version_regles_salaire.cache_clear()
+        assert version_regles_salaire() == avant
+        assert version_regles_salaire.cache_info().hits == 0
+        assert version_regles_salaire() == avant
+        assert version_regles_salaire.cache_info().hits == 1
+
+    def test_unchanged_save_skips_aggregate_update(self, temp_db):
+        """Une sauvegarde sans modification n'écrit aucune ligne"""
+        feuille = FeuilleDHeures.get_by_id(_creer_feuille(1, 3).id)
+        feuille.save()
+
+        assert feuille.statistiques_sauvegarde["lignes_ecrites"] == 0
+
+
+class TestFingerprint:
+    """Tests pour les empreintes utilisées comme ETag"""
+
+    def test_changes_with_slots_only(self, temp_db):
+        """L'empreinte change avec les créneaux, pas sans modification"""
+        feuille = _creer_feuille(1, 3, nb_jours=2)
+        avant = FeuilleDHeures.fingerprint(feuille.id, 1)
+
+        feuille = FeuilleDHeures.get_by_id(feuille.id)
+        feuille.save()
+        assert FeuilleDHeures.fingerprint(feuille.id, 1) == avant
+
+        feuille.jours_travailles[0].creneaux[0].heure_fin = "12:30"
+        feuille.save()
+        assert FeuilleDHeures.fingerprint(feuille.id, 1) != avant
+
+    def test_owner_only(self, temp_db):
+        """Une feuille d'un autre utilisateur n'a pas d'empreinte"""
+        feuille = _creer_feuille(1, 3, nb_jours=1)
+
+        assert FeuilleDHeures.fingerprint(feuille.id, 2) is None
+        assert FeuilleDHeures.fingerprint_by_user(2) is None
+        assert FeuilleDHeures.fingerprint_by_user(1) is not None
+
+    def test_planning_list_fingerprint(self, temp_db):
+        """L'ajout d'un planning change l'empreinte de la liste"""
+        Planning(1, 2025, [], 15.0, user_id=1).save()
+        avant = Planning.fingerprint_by_user(1)
+
+        Planning(2, 2025, [], 15.0, user_id=1).save()
+
+        assert Planning.fingerprint_by_user(1) != avant
+
+
+class TestRowVersions:
+    """Tests pour les versions de ligne des plannings et feuilles"""
+
+    def test_versions_follow_changes(self, temp_db):
+        """Création, créneau et en-tête incrémentent la version ; sinon rien"""
+        feuille = _creer_feuille(1, 3, nb_jours=2)
+        versions = [feuille.version]
+
+        feuille = FeuilleDHeures.get_by_id(feuille.id)
+        assert feuille.version == versions[0]
+        feuille.save()
+        versions.append(feuille.version)
+
+        feuille.jours_travailles[0].creneaux[0].heure_fin = "12:30"
+        feuille.save()
+        versions.append(feuille.version)
+
+        feuille.taux_horaire = 16.0
+        feuille.save()
+        versions.append(feuille.version)
+
+        assert versions[0] == versions[1] < versions[2] < versions[3]
+        assert FeuilleDHeures.get_by_id(feuille.id).version == versions[3]
+        assert feuille.to_dict()["version"] == versions[3]
+
+    def test_save_bumps_sequence_once(self, temp_db):
+        """Une sauvegarde versionne la feuille une fois, quel que soit le détail"""
+        feuille = _creer_feuille(1, 3, nb_jours=10)
+        avant = temp_db.execute_query("SELECT version FROM change_sequence")[0][0]
+
+        for jour in feuille.jours_travailles:
+            jour.creneaux[0].heure_fin = "12:30"
+        feuille.save()
+
+        sequence = temp_db.execute_query("SELECT * FROM change_sequence")[0]
+        assert feuille.statistiques_sauvegarde["mises_a_jour"] == 10
+        assert sequence["version"] == avant + 1 == feuille.version
+        assert sequence["triggers_paused"] == 0
+
+    def test_versions_are_global(self, temp_db):
+        """Plannings et feuilles partagent une séquence croissante"""
+        planning = Planning(1, 2025, [], 15.0, user_id=1)
+        planning.save()
+        feuille = _creer_feuille(1, 3, nb_jours=1)
+
+        assert 0 < planning.version < feuille.version
+        assert Planning.get_by_user(1)[0].updated_at is not None
+
+    def test_fingerprint_is_index_lookup(self, temp_db):
+        """L'empreinte d'une liste est lue dans l'index, sans la table"""
+        plan = temp_db.execute_query(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*), MAX(version) FROM feuilles_heures"
+            " WHERE user_id = ?",
+            (1,),
+        )
+        details = " ".join(row["detail"] for row in plan)
+
+        assert "COVERING INDEX idx_feuilles_user_version" in details
+
+
+class TestIncrementalSync:
+    """Tests pour la lecture des changements depuis une version"""
+
+    def test_changed_since(self, temp_db):
+        """Seules les feuilles modifiées après ``since`` sont retournées"""
+        feuilles = [_creer_feuille(1, mois, nb_jours=1) for mois in (1, 2, 3)]
+        _creer_feuille(2, 1, nb_jours=1)
+        since = version_courante()
+
+        feuilles[0].jours_travailles[0].creneaux[0].heure_fin = "12:30"
+        feuilles[0].save()
+        feuilles[2].taux_horaire = 16.0
+        feuilles[2].save()
+
+        modifiees = FeuilleDHeures.changed_since(1, since, 10)
+        resumes = FeuilleDHeures.changed_since(1, since, 10, summary=True)
+
+        assert [f.id for f in modifiees] == [feuilles[0].id, feuilles[2].id]
+        assert resumes == [f.to_summary() for f in modifiees]
+        assert [f.id for f in FeuilleDHeures.changed_since(1, 0, 2)] == [
+            feuilles[1].id,
+            feuilles[0].id,
+        ]
+
+    def test_deletions_leave_tombstones(self, temp_db):
+        """Une suppression est transmise avec une version postérieure"""
+        feuille = _creer_feuille(1, 3, nb_jours=1)
+        planning = Planning(1, 2025, [], 15.0, user_id=1)
+        planning.save()
+        since = version_courante()
+        feuille_id = feuille.id
+
+        feuille.delete()
+        temp_db.execute_delete("DELETE FROM plannings WHERE id = ?", (planning.id,))
+
+        suppressions = suppressions_depuis(1, since, 10)
+        assert [(s["table"], s["id"]) for s in suppressions] == [
+            ("feuilles_heures", feuille_id),
+            ("plannings", planning.id),
+        ]
+        assert suppressions[0]["version"] > since
+        assert suppressions_depuis(1, since, 10, tables=["plannings"]) == [
+            suppressions[1]
+        ]
+        assert suppressions_depuis(2, since, 10) == []
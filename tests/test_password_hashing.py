@@ -0,0 +1,64 @@
+"""
+Tests pour le pool de hachage des mots de passe
+"""
+
+import threading
+
+import pytest
+from src.planning_pro.password_hashing import (
+    PasswordHasher,
+    PasswordHashingSaturated,
+)
+
+
+class TestPasswordHasher:
+    """Tests pour le hachage bcrypt borné"""
+
+    def test_hash_and_check(self):
+        """Un hachage se vérifie avec le bon mot de passe uniquement"""
+        hasher = PasswordHasher(rounds=4, max_workers=2, max_pending=2)
+        password_hash = hasher.hash("secret123")
+
+        assert hasher.check("secret123", password_hash)
+        assert not hasher.check("mauvais", password_hash)
+
+    def test_configured_cost_factor(self):
+        """Le coût configuré est inscrit dans le hachage"""
+        hasher = PasswordHasher(rounds=5, max_workers=1, max_pending=0)
+
+        assert hasher.hash("secret123").startswith("$2b$05$")
+
+    def test_saturated_pool_fails_fast(self):
+        """Au-delà de max_workers + max_pending, le rejet est immédiat"""
+        hasher = PasswordHasher(rounds=4, max_workers=1, max_pending=0)
+        liberer = threading.Event()
+        occupe = threading.Thread(target=hasher._run, args=(liberer.wait,))
+        occupe.start()
+        try:
+            while hasher._slots._value:
+                liberer.wait(0.001)
+            with pytest.raises(PasswordHashingSaturated):
+                hasher.hash("secret123")
+            assert hasher.rejected == 1
+        finally:
+            liberer.set()
+            occupe.join()
+
+        # Le créneau est libéré à la fin du calcul
+        assert hasher.check("secret123", hasher.hash("secret123"))
+
+    def test_timeout_raises_saturated(self):
+        """Un calcul trop long produit une erreur de saturation, pas une 500"""
+        hasher = PasswordHasher(rounds=4, max_workers=1, max_pending=0, timeout=0.01)
+        liberer = threading.Event()
+        try:
+            with pytest.raises(PasswordHashingSaturated):
+                hasher._run(liberer.wait)
+            assert hasher.rejected == 1
+        finally:
+            liberer.set()
+
+        # Le créneau est libéré à la fin du calcul abandonné
+        while not hasher._slots._value:
+            liberer.wait(0.001)
+        assert hasher.check("secret123", hasher.hash("secret123"))
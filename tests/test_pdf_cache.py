@@ -0,0 +1,68 @@
+"""
+Tests pour le cache disque des PDF
+"""
+import os
+import time
+import pytest
+from src.planning_pro.pdf_cache import PDFCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Cache temporaire limité à 1 Ko"""
+    return PDFCache(str(tmp_path / "pdf_cache"), max_bytes=1024)
+
+
+class TestPDFCache:
+    """Tests pour le cache LRU des PDF"""
+
+    def test_key_ignores_created_at(self):
+        """La date de création n'influence pas la clé"""
+        data = {"id": 1, "mois": 3, "total_heures": 35.0}
+
+        key = PDFCache.compute_key({**data, "created_at": "2025-01-01T10:00:00"})
+
+        assert key == PDFCache.compute_key({**data, "created_at": "2025-02-01"})
+        assert key != PDFCache.compute_key({**data, "total_heures": 36.0})
+
+    def test_put_and_get(self, cache):
+        """Un PDF enregistré est relu à l'identique"""
+        assert cache.get(1, "abc") is None
+
+        cache.put(1, "abc", b"%PDF-contenu")
+
+        assert cache.get(1, "abc") == b"%PDF-contenu"
+        assert cache.stats == {"hits": 1, "misses": 1, "evictions": 0}
+
+    def test_lru_eviction(self, cache):
+        """Les entrées les moins récemment utilisées sont évincées"""
+        cache.put(1, "a", b"x" * 400)
+        cache.put(2, "b", b"x" * 400)
+        ancien = time.time() - 60
+        os.utime(cache._path(1, "a"), (ancien, ancien))
+        os.utime(cache._path(2, "b"), (ancien - 60, ancien - 60))
+        cache.get(2, "b")  # L'entrée 2 redevient la plus récente
+
+        cache.put(3, "c", b"x" * 400)
+
+        assert cache.get(1, "a") is None
+        assert cache.get(2, "b") is not None
+        assert cache.get(3, "c") is not None
+
+    def test_invalidate(self, cache):
+        """Toutes les versions d'une feuille sont supprimées"""
+        cache.put(1, "a", b"v1")
+        cache.put(1, "b", b"v2")
+        cache.put(12, "c", b"autre")
+
+        assert cache.invalidate(1) == 2
+        assert cache.get(12, "c") == b"autre"
+
+    def test_disabled(self, tmp_path):
+        """Avec max_bytes à 0, rien n'est écrit"""
+        cache = PDFCache(str(tmp_path / "pdf_cache"), max_bytes=0)
+
+        cache.put(1, "a", b"pdf")
+
+        assert cache.get(1, "a") is None
+        assert not os.path.exists(cache.cache_dir)
@@ -0,0 +1,87 @@
+"""
+Tests pour l'export groupé des feuilles d'heures
+"""
+
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.planning_pro.models import FeuilleDHeures, JourTravaille
+from src.planning_pro.pdf_cache import PDFCache
+from src.planning_pro.pdf_export import flux_pdf_fusionne, flux_zip, rendre_pdfs
+
+
+@pytest.fixture
+def executor():
+    """Pool léger (threads) pour les tests"""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PDFCache(str(tmp_path / "pdf_cache"), max_bytes=10 * 1024 * 1024)
+
+
+def _elements(nb_mois):
+    elements = []
+    for mois in range(1, nb_mois + 1):
+        jour = JourTravaille(date=f"2025-{mois:02d}-03")
+        jour.ajouter_creneau("09:00", "17:00")
+        feuille = FeuilleDHeures(
+            mois=mois,
+            annee=2025,
+            jours_travailles=[jour],
+            taux_horaire=15.0,
+            user_id=1,
+        )
+        elements.append((mois, feuille.to_dict()))
+    return elements
+
+
+class TestBulkExport:
+    """Tests pour le rendu parallèle et les flux d'export"""
+
+    def test_rendu_ordonne_et_mis_en_cache(self, executor, cache):
+        """Les PDF sont produits dans l'ordre et alimentent le cache"""
+        elements = _elements(5)
+
+        pdfs = list(rendre_pdfs(elements, executor, fenetre=2, cache=cache))
+
+        assert len(pdfs) == 5
+        assert all(pdf.startswith(b"%PDF-") for pdf in pdfs)
+        for (feuille_id, data), pdf in zip(elements, pdfs):
+            assert cache.get(feuille_id, cache.compute_key(data)) == pdf
+
+    def test_zip_streame(self, executor, cache):
+        """L'archive est envoyée en plusieurs morceaux et reste valide"""
+        elements = _elements(3)
+        noms = [f"feuille_{mois}.pdf" for mois, _ in elements]
+
+        morceaux = list(
+            flux_zip(zip(noms, rendre_pdfs(elements, executor, cache=cache)))
+        )
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(morceaux)))
+
+        assert len([m for m in morceaux if m]) > 3
+        assert archive.namelist() == noms
+        assert archive.testzip() is None
+
+    def test_pdf_fusionne(self, executor, cache):
+        """Le PDF fusionné contient les pages de toutes les feuilles"""
+        pypdf = pytest.importorskip("pypdf")
+        elements = _elements(3)
+        pdfs = list(rendre_pdfs(elements, executor, cache=cache))
+        pages = sum(len(pypdf.PdfReader(io.BytesIO(pdf)).pages) for pdf in pdfs)
+
+        fusion = b"".join(flux_pdf_fusionne(pdfs))
+
+        assert len(pypdf.PdfReader(io.BytesIO(fusion)).pages) == pages
+
+    def test_pdf_fusionne_borne(self, executor, cache):
+        """Au-delà de max_feuilles, la fusion est refusée"""
+        pytest.importorskip("pypdf")
+        pdfs = list(rendre_pdfs(_elements(3), executor, cache=cache))
+
+        with pytest.raises(ValueError):
+            b"".join(flux_pdf_fusionne(pdfs, max_feuilles=2))
@@ -0,0 +1,78 @@
+"""
+Tests pour la génération des PDF de feuilles d'heures
+"""
+
+import io
+
+import pytest
+from src.planning_pro.models import FeuilleDHeures, JourTravaille
+from src.planning_pro import pdf_generator
+from src.planning_pro.pdf_generator import format_date_french, generer_pdf_octets
+
+
+def _feuille_data(mois):
+    jours = []
+    for jour_num in (3, 4, 10):
+        jour = JourTravaille(date=f"2025-{mois:02d}-{jour_num:02d}")
+        jour.ajouter_creneau("09:00", "12:00")
+        jour.ajouter_creneau("13:00", "17:30")
+        jours.append(jour)
+    return FeuilleDHeures(
+        mois=mois,
+        annee=2025,
+        jours_travailles=jours,
+        taux_horaire=15.0,
+        user_id=1,
+    ).to_dict()
+
+
+class TestFormatDateFrench:
+    """Tests pour le libellé des dates en français"""
+
+    def test_libelle(self):
+        """Jour de la semaine, jour, mois en minuscules et année"""
+        assert format_date_french("2025-03-03") == "lundi 3 mars 2025"
+        assert format_date_french("2024-12-25") == "mercredi 25 décembre 2024"
+        assert format_date_french("2025-02-01") == "samedi 1 février 2025"
+
+    def test_cache(self):
+        """Un second appel pour la même date est servi par le cache"""
+        format_date_french.cache_clear()
+
+        premier = format_date_french("2025-08-15")
+        second = format_date_french("2025-08-15")
+
+        assert premier == second == "vendredi 15 août 2025"
+        info = format_date_french.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+
+class TestGenererPdf:
+    """Tests pour le rendu avec les styles partagés au niveau du module"""
+
+    def test_rendus_successifs(self):
+        """Deux rendus successifs produisent chacun un PDF valide"""
+        commandes = len(pdf_generator.STYLE_TABLE_JOURS.getCommands())
+
+        premier = generer_pdf_octets(_feuille_data(3))
+        second = generer_pdf_octets(_feuille_data(4))
+
+        for pdf in (premier, second):
+            assert pdf.startswith(b"%PDF")
+            assert pdf.rstrip().endswith(b"%%EOF")
+        # Les styles partagés ne sont pas modifiés par le rendu
+        assert len(pdf_generator.STYLE_TABLE_JOURS.getCommands()) == commandes
+
+    def test_contenu_des_rendus(self):
+        """Chaque PDF contient les dates de sa propre feuille"""
+        pypdf = pytest.importorskip("pypdf")
+
+        textes = []
+        for mois in (3, 4):
+            pdf = generer_pdf_octets(_feuille_data(mois))
+            reader = pypdf.PdfReader(io.BytesIO(pdf))
+            textes.append(" ".join(page.extract_text() for page in reader.pages))
+
+        assert "lundi 3 mars 2025" in textes[0]
+        assert "avril" not in textes[0]
+        assert "jeudi 3 avril 2025" in textes[1]
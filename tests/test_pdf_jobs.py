@@ -0,0 +1,122 @@
+"""
+Tests pour la file de rendu PDF en arrière-plan
+"""
+
+import json
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from src.planning_pro.database import DatabaseManager
+from src.planning_pro.models import FeuilleDHeures, JourTravaille
+from src.planning_pro.pdf_jobs import PDFJobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """File de rendu sur une base et un répertoire temporaires"""
+    manager = DatabaseManager(str(tmp_path / "planning.db"))
+    queue = PDFJobQueue(manager, str(tmp_path / "jobs"), max_workers=1)
+    yield queue
+    queue.shutdown()
+    manager.pool.close_all()
+
+
+def _feuille_data(mois=3):
+    jours = []
+    for jour_num in range(1, 6):
+        jour = JourTravaille(date=f"2025-{mois:02d}-{jour_num:02d}")
+        jour.ajouter_creneau("09:00", "12:00")
+        jour.ajouter_creneau("13:00", "17:00")
+        jours.append(jour)
+    feuille = FeuilleDHeures(
+        mois=mois, annee=2025, jours_travailles=jours, taux_horaire=15.0, user_id=1
+    )
+    return feuille.to_dict()
+
+
+def _attendre(queue, job_id, timeout=30):
+    fin = time.time() + timeout
+    while time.time() < fin:
+        job = queue.get(job_id)
+        if job["status"] in ("done", "error"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("Rendu non terminé")
+
+
+class TestPDFJobQueue:
+    """Tests pour la file de rendu PDF"""
+
+    def test_job_rendered_in_pool(self, queue):
+        """Une tâche est rendue hors processus puis marquée terminée"""
+        job = queue.enqueue(1, 1, _feuille_data(), "feuille.pdf")
+        assert job["status"] in ("pending", "running")
+
+        job = _attendre(queue, job["id"])
+
+        assert job["status"] == "done"
+        assert job["render_ms"] > 0
+        with open(queue.output_path(job["id"]), "rb") as f:
+            assert f.read(5) == b"%PDF-"
+
+        metrics = queue.metrics()
+        assert metrics["queue_depth"] == 0
+        assert metrics["render_ms"]["count"] == 1
+
+    def test_same_content_reuses_job(self, queue):
+        """Un second envoi du même contenu ne relance pas de rendu"""
+        premier = queue.enqueue(1, 1, _feuille_data(), "feuille.pdf")
+        _attendre(queue, premier["id"])
+
+        second = queue.enqueue(1, 1, _feuille_data(), "feuille.pdf")
+        autre = queue.enqueue(1, 1, _feuille_data(mois=4), "feuille.pdf")
+
+        assert second["id"] == premier["id"]
+        assert autre["id"] != premier["id"]
+
+    def test_interrupted_job_recovered(self, queue):
+        """Une tâche dont le worker a disparu est reprise au démarrage du pool"""
+        queue.db.execute_insert(
+            """INSERT INTO pdf_jobs (id, user_id, feuille_id, cache_key, filename,
+               status, payload, worker_pid, created_at)
+               VALUES ('orpheline', 1, 1, 'cle', 'f.pdf', 'running', ?, ?, ?)""",
+            (json.dumps(_feuille_data()), 2**22 + 1, "2025-01-01"),
+        )
+
+        queue._get_executor()
+
+        assert _attendre(queue, "orpheline")["status"] == "done"
+
+    def test_broken_pool_replaced(self, queue):
+        """Un pool cassé par un processus mort est remplacé au prochain envoi"""
+        casse = queue.executor()
+        with pytest.raises(BrokenProcessPool):
+            casse.submit(os._exit, 1).result(timeout=30)
+
+        job = queue.enqueue(1, 1, _feuille_data(), "feuille.pdf")
+
+        assert _attendre(queue, job["id"])["status"] == "done"
+        assert queue.executor() is not casse
+
+    def test_job_in_broken_pool_resubmitted(self, queue):
+        """Une tâche perdue avec son pool est rendue dans le pool suivant"""
+        casse = queue.executor()
+        plantage = casse.submit(os._exit, 1)
+        job = queue.enqueue(1, 1, _feuille_data(), "feuille.pdf")
+        with pytest.raises(BrokenProcessPool):
+            plantage.result(timeout=30)
+
+        assert _attendre(queue, job["id"])["status"] == "done"
+
+    def test_purge_expired(self, queue):
+        """Les tâches terminées au-delà de la rétention sont supprimées"""
+        queue.db.execute_insert(
+            """INSERT INTO pdf_jobs (id, user_id, feuille_id, cache_key, filename,
+               status, payload, created_at, finished_at)
+               VALUES ('ancienne', 1, 1, 'cle', 'f.pdf', 'done', '{}', ?, ?)""",
+            ("2020-01-01", "2020-01-01"),
+        )
+
+        assert queue.purge_expired() == 1
+        assert queue.get("ancienne") is None
@@ -0,0 +1,110 @@
+"""
+Tests pour la limitation de débit
+"""
+
+import pytest
+from flask import Flask
+from flask_login import LoginManager
+from src.planning_pro import security
+from src.planning_pro.rate_limiter import (
+    MemoryRateLimitBackend,
+    RateLimiter,
+    SQLiteRateLimitBackend,
+    create_backend,
+)
+
+
+class TestTokenBucket:
+    """Tests pour les stockages du seau à jetons"""
+
+    @pytest.fixture(params=["memory", "sqlite"])
+    def backend(self, request, tmp_path):
+        return create_backend(request.param, str(tmp_path / "ratelimit.db"))
+
+    def test_blocks_after_capacity(self, backend):
+        """Au-delà de la capacité, la requête est refusée avec un délai"""
+        results = [backend.hit("cle", 3, 3 / 60, now=1000.0) for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert results[2].remaining == 0
+        assert results[3].retry_after == pytest.approx(20.0)
+
+    def test_refill_over_time(self, backend):
+        """Les jetons se rechargent proportionnellement au temps écoulé"""
+        for _ in range(3):
+            backend.hit("cle", 3, 3 / 60, now=1000.0)
+
+        assert not backend.hit("cle", 3, 3 / 60, now=1010.0).allowed
+        assert backend.hit("cle", 3, 3 / 60, now=1020.0).allowed
+
+    def test_keys_are_independent(self, backend):
+        """Chaque identité dispose de son propre seau"""
+        backend.hit("a", 1, 1 / 60, now=1000.0)
+
+        assert not backend.hit("a", 1, 1 / 60, now=1000.0).allowed
+        assert backend.hit("b", 1, 1 / 60, now=1000.0).allowed
+
+    def test_sqlite_shared_between_workers(self, tmp_path):
+        """Deux instances sur le même fichier partagent les compteurs"""
+        path = str(tmp_path / "ratelimit.db")
+        worker_1 = SQLiteRateLimitBackend(path)
+        worker_2 = SQLiteRateLimitBackend(path)
+
+        worker_1.hit("cle", 2, 2 / 60, now=1000.0)
+        worker_2.hit("cle", 2, 2 / 60, now=1000.0)
+
+        assert not worker_1.hit("cle", 2, 2 / 60, now=1000.0).allowed
+
+    def test_memory_bounded(self):
+        """Le stockage mémoire évince les clés les plus anciennes"""
+        backend = MemoryRateLimitBackend(max_keys=2)
+        for cle in ("a", "b", "c"):
+            backend.hit(cle, 1, 1.0, now=1000.0)
+
+        assert backend.hit("a", 1, 1.0, now=1000.0).allowed
+
+
+class TestRateLimitDecorator:
+    """Tests pour le décorateur security.rate_limit"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(
+            security, "rate_limiter", RateLimiter(MemoryRateLimitBackend())
+        )
+        app = Flask(__name__)
+        app.secret_key = "test"
+        login_manager = LoginManager(app)
+        login_manager.user_loader(lambda user_id: None)
+
+        @app.route("/limitee")
+        @security.rate_limit(max_requests=2, window_seconds=60)
+        def limitee():
+            return "ok"
+
+        return app.test_client()
+
+    def test_decorator_enforces_limit(self, client):
+        """La troisième requête reçoit un 429 avec Retry-After"""
+        assert client.get("/limitee").status_code == 200
+        assert client.get("/limitee").status_code == 200
+
+        response = client.get("/limitee")
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "30"
+
+    def test_limit_per_ip(self, client):
+        """Une autre adresse IP n'est pas affectée"""
+        for _ in range(3):
+            client.get("/limitee")
+
+        response = client.get("/limitee", environ_base={"REMOTE_ADDR": "10.0.0.2"})
+
+        assert response.status_code == 200
+
+    def test_disabled(self, monkeypatch, client):
+        """RATELIMIT_ENABLED=false laisse passer toutes les requêtes"""
+        security.rate_limiter.enabled = False
+
+        assert all(client.get("/limitee").status_code == 200 for _ in range(5))
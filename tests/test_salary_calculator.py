@@ -347,4 +347,115 @@ class TestSalaryCalculatorIntegration:
             # Vérifications de base
             assert brut_result['salaire_brut'] > 0
             assert net_result['salaire_net'] > 0
-            assert net_result['salaire_net'] < brut_result['salaire_brut']
\ No newline at end of file
+            assert net_result['salaire_net'] < brut_result['salaire_brut']
+
+
+class TestCalculateSalaryBatch:
+    """Tests pour le calcul de salaire vectorisé par lot"""
+
+    HEURES = [0, 12.5, 20, 22.75, 24, 26, 30, 33.5, 35, 37.25, 39, 42, 44.5, 48, 55]
+    CONTRATS = [20, 25, 30, 35, 39, 28]
+
+    def _lignes(self):
+        return [
+            (heures, contrat, taux)
+            for heures in self.HEURES
+            for contrat in self.CONTRATS
+            for taux in (11.88, 15.0)
+        ]
+
+    def test_batch_matches_scalar(self):
+        """Chaque colonne est identique au calcul ligne par ligne"""
+        pytest.importorskip("numpy")
+        from src.planning_pro.salary_calculator import (
+            BATCH_COLUMNS,
+            salary_calculator,
+        )
+
+        lignes = self._lignes()
+        heures, contrats, taux = zip(*lignes)
+        batch = salary_calculator.calculate_salary_batch(heures, contrats, taux)
+
+        for i, (h, c, t) in enumerate(lignes):
+            attendu = salary_calculator.calculate_salary(h, c, t)
+            for colonne in BATCH_COLUMNS:
+                assert batch[colonne][i] == attendu.get(colonne, 0), (h, c, colonne)
+
+    def test_batch_broadcasts_scalars(self):
+        """Le contrat et le taux peuvent être communs à tout le lot"""
+        pytest.importorskip("numpy")
+        from src.planning_pro.salary_calculator import salary_calculator
+
+        batch = salary_calculator.calculate_salary_batch([35, 40, 48], 35, 15.0)
+
+        assert list(batch["total_heures_supplementaires"]) == [0, 5, 13]
+        assert batch["salaire_brut_total"][0] == 525.0
+
+    def test_batch_without_numpy(self, monkeypatch):
+        """Sans numpy, le calcul par lot retombe sur la boucle scalaire"""
+        from src.planning_pro import salary_calculator as module
+
+        monkeypatch.setattr(module, "np", None)
+        calculator = module.salary_calculator
+        batch = calculator.calculate_salary_batch([30, 40], [25, 35], 12.0)
+
+        attendu = calculator.calculate_salary(40, 35, 12.0)
+        assert isinstance(batch["salaire_brut_total"], list)
+        assert batch["salaire_brut_total"][1] == attendu["salaire_brut_total"]
+
+
+class TestCompiledContracts:
+    """Tests pour les tables de contrats compilées"""
+
+    CONTRAT_28H = {
+        "contrat": "28h",
+        "heures_contractuelles": 28,
+        "heures_complementaires": [
+            {"de": 28, "a": 30.8, "type": "complémentaires", "majoration": 10},
+            {
+                "de": 30.8,
+                "a": 35,
+                "type": "complémentaires majorées",
+                "majoration": 25,
+            },
+        ],
+        "heures_supplementaires": [
+            {"de": 35, "a": 43, "majoration": 25},
+            {"de": 43, "a": None, "majoration": 50},
+        ],
+    }
+
+    def test_tiers_precomputed(self):
+        """Les multiplicateurs et bornes effectives sont précalculés"""
+        from src.planning_pro.salary_calculator import compile_contract
+
+        contrat = compile_contract(self.CONTRAT_28H)
+
+        assert contrat.seuil_heures_sup == 35
+        assert contrat.complementaires[0].multiplicateur == 1.1
+        assert contrat.complementaires[1].majoree is True
+        assert contrat.supplementaires[1].fin is None
+
+    def test_register_contract(self):
+        """Un contrat enregistré à l'exécution est utilisé par le calcul"""
+        from src.planning_pro.salary_calculator import SalaryCalculator
+
+        calc = SalaryCalculator()
+        calc.register_contract(self.CONTRAT_28H)
+        result = calc.calculate_salary(45, 28, 10.0)
+
+        assert result["contrat"] == "28h"
+        assert result["heures_complementaires"] == pytest.approx(2.8)
+        assert result["heures_complementaires_majorees"] == pytest.approx(4.2)
+        assert result["total_heures_supplementaires"] == 10
+        assert calc.get_contract_config(28.0) is self.CONTRAT_28H
+        assert {"contrat": "28h", "heures_contractuelles": 28} in (
+            calc.get_available_contracts()
+        )
+
+    def test_register_invalid_contract(self):
+        """Une configuration incomplète est refusée"""
+        from src.planning_pro.salary_calculator import SalaryCalculator
+
+        with pytest.raises(ValueError):
+            SalaryCalculator().register_contract({"contrat": "10h"})
@@ -0,0 +1,119 @@
+"""
+Tests pour l'export comptable en flux
+"""
+
+import csv
+import io
+import json
+import pytest
+from src.planning_pro import timesheet_export
+from src.planning_pro.database import DatabaseManager
+from src.planning_pro.models import FeuilleDHeures, JourTravaille, User
+from src.planning_pro.timesheet_export import COLONNES_EXPORT, flux_export
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Base temporaire avec deux utilisateurs et leurs feuilles"""
+    from src.planning_pro import models
+
+    manager = DatabaseManager(str(tmp_path / "planning.db"), pool_size=2)
+    monkeypatch.setattr(models, "db_manager", manager)
+
+    for email in ("a@example.com", "b@example.com"):
+        user = User(email=email, password="", nom="Dupont", prenom="Jean")
+        user.password_hash = "hash"
+        user.save()
+        for mois in (1, 2):
+            jours = []
+            for num in (6, 7):
+                jour = JourTravaille(date=f"2025-{mois:02d}-{num:02d}")
+                jour.ajouter_creneau("09:00", "12:00")
+                jour.ajouter_creneau("22:00", "02:00")
+                jours.append(jour)
+            FeuilleDHeures(
+                mois=mois,
+                annee=2025,
+                jours_travailles=jours,
+                taux_horaire=15.0,
+                user_id=user.id,
+            ).save()
+    yield manager
+    manager.pool.close_all()
+
+
+def _ndjson(octets):
+    return [json.loads(ligne) for ligne in octets.decode("utf-8").splitlines()]
+
+
+class TestStreamingExport:
+    """Tests pour l'export NDJSON / CSV des feuilles et créneaux"""
+
+    def test_ndjson_sheets_then_slots(self, db):
+        """Chaque feuille est suivie de ses créneaux, avec ses agrégats"""
+        lignes = _ndjson(b"".join(flux_export("ndjson", db, user_id=1)))
+
+        assert [l["type"] for l in lignes] == ["feuille"] + ["creneau"] * 4 + [
+            "feuille"
+        ] + ["creneau"] * 4
+        feuille = FeuilleDHeures.get_by_id(lignes[0]["feuille_id"])
+        assert lignes[0]["email"] == "a@example.com"
+        assert lignes[0]["total_heures"] == feuille.calculer_total_heures() == 14.0
+        assert lignes[0]["salaire_net"] == feuille.to_summary()["salaire_net"]
+        assert lignes[2]["duree_minutes"] == 240  # 22:00 - 02:00
+        assert {l["user_id"] for l in lignes} == {1}
+
+    def test_all_users_and_year_filter(self, db):
+        """Sans utilisateur, toutes les feuilles sont exportées"""
+        lignes = _ndjson(b"".join(flux_export("ndjson", db, annee=2025)))
+        feuilles = [l for l in lignes if l["type"] == "feuille"]
+
+        assert [(l["user_id"], l["mois"]) for l in feuilles] == [
+            (1, 1),
+            (1, 2),
+            (2, 1),
+            (2, 2),
+        ]
+        assert b"".join(flux_export("ndjson", db, annee=2024)) == b""
+
+    def test_csv_columns(self, db):
+        """Le CSV a un en-tête et une ligne par feuille ou créneau"""
+        texte = b"".join(flux_export("csv", db, user_id=2)).decode("utf-8")
+        lignes = list(csv.DictReader(io.StringIO(texte)))
+
+        assert tuple(lignes[0]) == COLONNES_EXPORT
+        assert len(lignes) == 10
+        assert lignes[1]["heure_debut"] == "09:00"
+        assert lignes[1]["salaire_brut_total"] == ""
+
+    def test_stream_is_incremental(self, db, monkeypatch):
+        """Les lignes sont produites par paquets, la connexion rendue à l'arrêt"""
+        monkeypatch.setattr(timesheet_export, "TAILLE_PAQUET", 2)
+        lignes = timesheet_export.iterer_lignes(db)
+        libres = db.get_pool_stats()["idle"]
+
+        assert next(lignes)["type"] == "feuille"
+        assert db.get_pool_stats()["idle"] == libres - 1
+        lignes.close()
+        assert db.get_pool_stats()["idle"] == libres
+
+    def test_stale_aggregates_recomputed_without_write(self, db, monkeypatch):
+        """Des agrégats périmés sont recalculés dans le flux, sans écriture"""
+        from src.planning_pro import models
+
+        db.execute_update("UPDATE feuilles_heures SET total_heures = 0")
+        monkeypatch.setattr(models, "version_regles_salaire", lambda: "nouvelles")
+        monkeypatch.setattr(
+            timesheet_export, "version_regles_salaire", lambda: "nouvelles"
+        )
+
+        lignes = _ndjson(b"".join(flux_export("ndjson", db, user_id=1)))
+
+        assert [l["total_heures"] for l in lignes if l["type"] == "feuille"] == [
+            14.0,
+            14.0,
+        ]
+        assert {
+            row["total_heures"]
+            for row in db.execute_query("SELECT total_heures FROM feuilles_heures")
+        } == {0}